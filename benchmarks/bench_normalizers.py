@@ -0,0 +1,70 @@
+# benchmarks/bench_normalizers.py
+"""Per-row cost of the create-csv normalizers: reference (pco_workflows.utils) vs fast
+(pco_workflows.normalize). Run from the repo root: python benchmarks/bench_normalizers.py"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pco_workflows import normalize, utils  # noqa: E402
+
+GRADES = ["", "Kindergarten", "First Grade", "Second", "3rd", "4th Grade", "Fifth", "Sixth", "7th",
+          "Eighth Grade", "Ninth", "10th", "Eleventh", "Twelfth", "Pre-K", "Graduated", "College"]
+
+def make_rows(count, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        rows.append({
+            "Birth Month and Day": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}" if rng.random() < 0.9 else "",
+            "Age": str(rng.randint(1, 95)) if rng.random() < 0.8 else "",
+            "Wedding Month and Day": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}" if rng.random() < 0.4 else "",
+            "School Grade": rng.choice(GRADES),
+            "Cell Phone": f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+            "Home Phone": f"{rng.randint(200, 999)}.{rng.randint(200, 999)}.{rng.randint(0, 9999):04d}" if rng.random() < 0.5 else "",
+            "Work Phone": "",
+            "Emergency Phone": f"{rng.randint(2000000000, 9999999999)}",
+            "Baptized": rng.choice(["Yes", "No", ""]),
+            "Member Status": rng.choice(["Yes", "No", ""]),
+        })
+    return rows
+
+def run_row_set(module, rows):
+    for row in rows:
+        module.format_birthdate(row["Birth Month and Day"], row["Age"], 2025)
+        module.format_anniversary(row["Wedding Month and Day"])
+        module.map_grade(row["School Grade"])
+        module.format_phone(row["Cell Phone"])
+        module.format_phone(row["Home Phone"])
+        module.format_phone(row["Work Phone"])
+        module.format_phone(row["Emergency Phone"])
+        module.yes_no_to_true_false(row["Baptized"])
+        module.get_status_and_membership(row["Member Status"])
+
+def time_per_row(module, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_row_set(module, rows)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    before = time_per_row(utils, rows, args.repeat)
+    after = time_per_row(normalize, rows, args.repeat)
+    print(f"rows: {args.rows}, best of {args.repeat}")
+    print(f"utils (reference): {before * 1e6:8.2f} us/row")
+    print(f"normalize (fast):  {after * 1e6:8.2f} us/row")
+    print(f"speedup:           {before / after:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_startup.py
+"""CLI startup cost: wall time of `run.py --help` and a tiny offline create-csv, next to a bare
+interpreter, plus the slowest imports from `python -X importtime` and whether requests loaded.
+Run from the repo root: python benchmarks/bench_startup.py"""
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PY = os.path.join(REPO_ROOT, "run.py")
+
+def scenarios(workdir):
+    input_file = os.path.join(workdir, "input.csv")
+    with open(input_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["First Name", "Last Name", "Cell Phone"])
+        writer.writerow(["Ada", "Lovelace", "5551234567"])
+    return {
+        "python -c pass": [sys.executable, "-c", "pass"],
+        "run.py --help": [sys.executable, RUN_PY, "--help"],
+        "run.py create-csv": [sys.executable, RUN_PY, "create-csv", "--input", input_file,
+                              "--output", os.path.join(workdir, "output.csv")],
+    }
+
+def wall_ms(command, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def import_profile(command):
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    result = subprocess.run([command[0], "-X", "importtime", *command[1:]], check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append((int(self_us), int(cumulative_us), name))
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per command")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="Fail if a command's startup beyond the bare interpreter exceeds this")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        commands = scenarios(workdir)
+        baseline = wall_ms(commands.pop("python -c pass"), args.repeat)
+        print(f"{'python -c pass':<20} {baseline:7.1f} ms (median of {args.repeat})")
+        for name, command in commands.items():
+            median = wall_ms(command, args.repeat)
+            modules = import_profile(command)
+            loaded = {module.strip() for _, _, module in modules}
+            overhead = median - baseline
+            over_budget = overhead > args.budget_ms
+            failed |= over_budget
+            print(f"{name:<20} {median:7.1f} ms  (+{overhead:.1f} ms over the interpreter"
+                  f"{', OVER BUDGET' if over_budget else ''}); requests imported: {'requests' in loaded}")
+            for self_us, cumulative_us, module in sorted(modules, key=lambda m: m[0], reverse=True)[:args.top]:
+                print(f"    {self_us / 1000:6.1f} ms self {cumulative_us / 1000:7.1f} ms cumulative  {module.strip()}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# benchmarks/bench_workflows.py
+"""End-to-end cost of the API-bound workflows against a local FakePCOServer, by tenant size.
+
+Each (workflow, size) runs in a fresh interpreter against a freshly seeded server and reports
+requests/sec, client-side p50/p95/p99 request latency, peak RSS and wall time. Results are
+written as JSON; pass --baseline to compare against an earlier run and fail on regressions.
+Run from the repo root: python benchmarks/bench_workflows.py --sizes 1000,10000"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pco_workflows.testing import FakePCOServer  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+FIELD_NAME = "Authorized Pickups"
+WORKFLOWS = ("get-field-data", "parse-authorized-pickups", "create-csv", "delete-field", "delete-all")
+# Lower is better for these; rps is the only higher-is-better metric
+LOWER_IS_BETTER = ("wall_seconds", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb", "wire_kib")
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def write_input_csv(path, size):
+    # The create-csv source export, with enough variety to exercise every normalizer
+    from bench_normalizers import make_rows
+    rows = make_rows(size)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        for i, row in enumerate(rows):
+            row = {"First Name": f"First{i}", "Last Name": f"Last{i // 3}", "Address": f"{i // 3} Main Street",
+                   "City": "Springfield", "State": "IL", "Zip Code": "62701", "E-Mail": f"p{i}@example.com", **row}
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+
+def run_workflow(name, size, workdir, concurrency):
+    if name == "get-field-data":
+        from pco_workflows.workflows.get_field_data import get_field_definition_data
+        get_field_definition_data(FIELD_NAME, workers=concurrency)
+    elif name == "parse-authorized-pickups":
+        from pco_workflows.workflows.parse_authorized_pickups import parse_all_authorized_pickups
+        parse_all_authorized_pickups(concurrency=concurrency)
+    elif name == "create-csv":
+        from pco_workflows.workflows.create_csv import create_import_csv
+        input_file = os.path.join(workdir, "input.csv")
+        write_input_csv(input_file, size)
+        create_import_csv(input_file, os.path.join(workdir, "output.csv"), workers=concurrency)
+    elif name == "delete-field":
+        from pco_workflows.workflows.delete_field import delete_field_data
+        delete_field_data(FIELD_NAME, concurrency=concurrency, journal_path=os.path.join(workdir, "field.journal"))
+    elif name == "delete-all":
+        from pco_workflows.workflows.delete_all import delete_all_people
+        delete_all_people([], concurrency=concurrency, journal_path=os.path.join(workdir, "all.journal"))
+    else:
+        raise ValueError(f"Unknown workflow: {name}")
+
+def child_main(name, size, api_root, concurrency, conn):
+    # Runs in a spawned interpreter so peak RSS belongs to this workflow alone
+    from pco_workflows.api.client import BaseClient
+    from pco_workflows.metrics import get_metrics
+
+    os.environ.update({"PCO_API_ROOT": api_root, "PCO_APPLICATION_ID": "bench", "PCO_SECRET": "bench"})
+    latencies = []
+    create_session = BaseClient._create_session
+
+    def timed_session(self):
+        session = create_session(self)
+        session.hooks["response"].append(lambda resp, *args, **kwargs: latencies.append(resp.elapsed.total_seconds()))
+        return session
+
+    BaseClient._create_session = timed_session
+    sys.stdin = io.StringIO("y\n" * 10)  # The delete workflows ask for confirmation
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()) as stderr:
+        os.chdir(workdir)  # Caches and journals the workflows write land in the temp dir
+        start = time.perf_counter()
+        run_workflow(name, size, workdir, concurrency)
+        wall = time.perf_counter() - start
+    latencies.sort()
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    conn.send({
+        "wall_seconds": round(wall, 4),
+        "requests": len(latencies),
+        "rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "peak_rss_mb": round(rss, 1),
+        "wire_kib": round(get_metrics().to_dict()["totals"]["wire_bytes"] / 1024, 1),
+        "errors": [line for line in stderr.getvalue().splitlines() if line][:5],
+    })
+    conn.close()
+
+def seed_server(server, size):
+    server.seed_people(size, field_definitions=(FIELD_NAME,))
+    server.add("field_definitions", {"name": f"{FIELD_NAME} Parsed", "slug": "authorized_pickups_parsed",
+                                     "data_type": "text"})
+
+def bench_one(name, size, args):
+    with FakePCOServer(latency=args.latency, rate_limit=args.rate_limit, rate_period=20) as server:
+        if name != "create-csv":
+            seed_server(server, size)
+        ctx = multiprocessing.get_context("spawn")
+        parent, child = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=child_main, args=(name, size, server.url, args.concurrency, child))
+        process.start()
+        child.close()
+        result = parent.recv()
+        process.join()
+        result["server_requests"] = len(server.request_log)
+    return result
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in LOWER_IS_BETTER + ("rps",):
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > threshold if metric in LOWER_IS_BETTER else -change > threshold
+            if worse:
+                regressions.append(f"{key} {metric}: {before} -> {after} ({change:+.1%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated people counts (default: %(default)s)")
+    parser.add_argument("--workflows", default=",".join(WORKFLOWS), help="Comma-separated subset of: %(default)s")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Injected server latency per request, seconds")
+    parser.add_argument("--rate-limit", type=int, default=1_000_000, help="Fake server requests per 20s window")
+    parser.add_argument("--output", default="bench-workflows.json")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    workflows = [w for w in args.workflows.split(",") if w]
+    results = {}
+    print(f"{'workflow':<26}{'people':>8}{'wall s':>10}{'reqs':>9}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'RSS MB':>9}{'wire KiB':>11}")
+    for size in sizes:
+        for name in workflows:
+            result = bench_one(name, size, args)
+            results[f"{name}@{size}"] = result
+            print(f"{name:<26}{size:>8}{result['wall_seconds']:>10.2f}{result['requests']:>9}{result['rps']:>10.1f}"
+                  f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['peak_rss_mb']:>9.1f}"
+                  f"{result['wire_kib']:>11.1f}")
+            for error in result["errors"]:
+                print(f"  ! {error}")
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "concurrency": args.concurrency,
+                 "latency": args.latency, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
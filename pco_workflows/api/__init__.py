@@ -1,3 +1,27 @@
-from .client import BaseClient
-from .publishing import PublishingClient
-from .people import PeopleClient
+import importlib
+
+# Exports resolve on first use, so importing a light submodule (api.bulk, api.fields) for a
+# constant doesn't pull in requests and every client along with the package
+_EXPORTS = {
+    "BaseClient": ".client",
+    "AsyncBaseClient": ".client",
+    "FieldRegistry": ".fields",
+    "HttpCache": ".http_cache",
+    "set_default_http_cache": ".http_cache",
+    "PublishingClient": ".publishing",
+    "AsyncPublishingClient": ".publishing",
+    "PeopleClient": ".people",
+    "AsyncPeopleClient": ".people",
+    "RateLimiter": ".rate_limit",
+    "get_default_rate_limiter": ".rate_limit",
+    "RetryPolicy": ".retry",
+}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -1,11 +1,18 @@
+import hashlib
 import os
-from requests.auth import HTTPBasicAuth
-from dotenv import load_dotenv
+from functools import lru_cache
 
-# Load .env from project root if present (non-overriding for precedence with system env vars)
-load_dotenv(override=False)
+@lru_cache(maxsize=None)
+def load_env():
+    # Load .env from project root if present (non-overriding for precedence with system env vars).
+    # Done on first use rather than at import so commands that never authenticate skip it.
+    from dotenv import load_dotenv
+    load_dotenv(override=False)
 
 def get_auth():
+    # Imported here so the on-disk caches can fingerprint credentials without loading requests
+    from requests.auth import HTTPBasicAuth
+    load_env()
     app_id = os.environ.get("PCO_APPLICATION_ID")
     secret = os.environ.get("PCO_SECRET")
     if not app_id or not secret:
@@ -13,4 +20,12 @@ def get_auth():
     return HTTPBasicAuth(app_id, secret)
 
 def get_headers():
-    return {"Content-Type": "application/json"}
+    # Pages of JSON compress several-fold; gzip is asked for explicitly rather than left to
+    # whatever the HTTP library happens to advertise
+    return {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+
+def credential_fingerprint():
+    # Every PCO org is served from the same api_root, so anything cached on disk is keyed by this
+    # too. A hash rather than the application ID itself, which would otherwise end up in the files.
+    load_env()
+    return hashlib.sha256((os.environ.get("PCO_APPLICATION_ID") or "").encode()).hexdigest()[:16]
@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_CONCURRENCY = 4
+
+
+class Journal:
+    """Append-only on-disk record of completed IDs, fsynced per entry so a crash loses nothing.
+
+    An entry may carry a value (e.g. the PCO ID created for an import row), written as
+    ``id<TAB>value`` and available from ``values`` after a resume.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.resume = resume
+        self.completed = set()
+        self.values = {}
+        if resume and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    item_id, _, value = line.rstrip("\n").partition("\t")
+                    if item_id:
+                        self.completed.add(item_id)
+                        if value:
+                            self.values[item_id] = value
+        # Opened on first write so an aborted run never clobbers an earlier journal
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(self.path, "a" if self.resume else "w", encoding="utf-8")
+
+    def record(self, item_id, value=None):
+        item_id = str(item_id)
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(f"{item_id}\t{value}\n" if value is not None else f"{item_id}\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.completed.add(item_id)
+            if value is not None:
+                self.values[item_id] = str(value)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BulkResult:
+    def __init__(self, total, skipped=0, verb="Processed"):
+        self.total = total
+        self.skipped = skipped
+        self.verb = verb
+        self.succeeded = 0
+        self.errors = {}
+        self.elapsed = 0.0
+        self.retry_stats = {}
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    @property
+    def rate(self):
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        text = (f"{self.verb} {self.succeeded}/{self.total}, failed {self.failed}, "
+                f"skipped {self.skipped} already completed, in {self.elapsed:.1f}s ({self.rate:.1f}/s)")
+        if self.retry_stats:
+            text += f"; retries: {self.retry_stats.get('retries', 0)}, gave up: {self.retry_stats.get('gave_up', 0)}"
+        return text
+
+
+class BulkRunner:
+    """Applies ``operation`` to many items concurrently through one client, sharing its rate limiter.
+
+    Each success is journaled under ``key(item)`` (with the operation's return value) as it
+    completes, so an interrupted run can be resumed by passing the same journal with
+    ``resume=True``. A failed item is recorded and the run carries on rather than aborting.
+    """
+
+    verb = "Processed"
+
+    def __init__(self, client, operation, concurrency=DEFAULT_CONCURRENCY, journal=None, on_progress=None, key=str,
+                 verb=None):
+        self.client = client
+        # Leads the summary line; subclasses set their own class default
+        if verb is not None:
+            self.verb = verb
+        self.operation = operation
+        self.concurrency = concurrency
+        self.journal = journal
+        self.on_progress = on_progress
+        self.key = key
+
+    def pending(self, items):
+        completed = self.journal.completed if self.journal else set()
+        return [item for item in items if str(self.key(item)) not in completed]
+
+    def _run_one(self, item):
+        value = self.operation(item)
+        if self.journal:
+            self.journal.record(self.key(item), value)
+        return value
+
+    def run(self, items, skipped=0):
+        items = list(items)
+        result = BulkResult(len(items), skipped=skipped, verb=self.verb)
+        start = time.monotonic()
+        remaining = iter(items)
+        in_flight = {}
+        done_count = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            def submit_next():
+                for item in remaining:
+                    in_flight[executor.submit(self._run_one, item)] = item
+                    return
+
+            # Bounded submission keeps memory flat for very large item lists
+            for _ in range(self.concurrency * 2):
+                submit_next()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = self.key(in_flight.pop(future))
+                    done_count += 1
+                    error = future.exception()
+                    value = None
+                    if error is None:
+                        result.succeeded += 1
+                        value = future.result()
+                    else:
+                        result.errors[key] = error
+                    if self.on_progress:
+                        self.on_progress(done_count, result.total, key, error, value)
+                    submit_next()
+        result.elapsed = time.monotonic() - start
+        result.retry_stats = self.client.retry_stats
+        return result
+
+
+class BulkDeleter(BulkRunner):
+    verb = "Deleted"
+
+    def __init__(self, client, url_template, **kwargs):
+        super().__init__(client, self._delete, **kwargs)
+        self.url_template = url_template
+
+    def _delete(self, item_id):
+        self.client.delete(self.url_template.format(id=item_id))
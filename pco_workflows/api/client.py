@@ -1,57 +1,530 @@
+import asyncio
+import json
+import os
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import islice
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
-from .auth import get_auth, get_headers
+from pco_workflows.metrics import get_metrics
+from .auth import credential_fingerprint, get_auth, get_headers, load_env
+from .http_cache import HttpCache, get_default_http_cache
+from .rate_limit import get_default_rate_limiter
+from .retry import RetryPolicy
+from .single_flight import AsyncSingleFlight, SingleFlight
+
+DEFAULT_API_ROOT = "https://api.planningcenteronline.com"
+DEFAULT_POOL_SIZE = 10
+# (connect, read) seconds; without a timeout one hung connection stalls a bulk run forever
+DEFAULT_TIMEOUT = (10, 60)
+# Sent when a 304 arrives with no cached body to reuse, so no cache on the way answers again
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+def with_include(params, include):
+    if not include:
+        return params
+    params = dict(params or {"per_page": 100})
+    params["include"] = include if isinstance(include, str) else ",".join(include)
+    return params
+
+def with_fields(params, fields):
+    # JSON:API sparse fieldsets: {"Person": ["first_name", "emails"]} -> fields[Person]=first_name,emails.
+    # Relationship names count as fields too, so list any relationship an include has to resolve
+    # through; an empty list asks for IDs only.
+    if not fields:
+        return params
+    params = dict(params or {"per_page": 100})
+    for resource_type, names in fields.items():
+        params[f"fields[{resource_type}]"] = names if isinstance(names, str) else ",".join(names)
+    return params
+
+def wire_bytes(resp):
+    # Bytes read off the socket, i.e. before gzip decoding; falls back to the body for
+    # responses that did not come from urllib3 (replayed cassettes, test doubles)
+    raw = getattr(resp, "raw", None)
+    tell = getattr(raw, "tell", None)
+    return tell() if callable(tell) else len(resp.content)
+
+def attach_included(data, extract_key="data"):
+    # Resolves a JSON:API document's sideloaded "included" records onto their parents as
+    # record["included"][relationship_name] (a record, or a list for to-many relationships)
+    records = data.get(extract_key, [])
+    included = data.get("included")
+    if not included:
+        return records
+    index = {(r["type"], r["id"]): r for r in included}
+    for record in records if isinstance(records, list) else [records]:
+        resolved = {}
+        for name, relationship in (record.get("relationships") or {}).items():
+            linkage = (relationship or {}).get("data")
+            if isinstance(linkage, list):
+                resolved[name] = [index[(link["type"], link["id"])] for link in linkage
+                                  if (link["type"], link["id"]) in index]
+            elif isinstance(linkage, dict) and (linkage["type"], linkage["id"]) in index:
+                resolved[name] = index[(linkage["type"], linkage["id"])]
+        record["included"] = resolved
+    return records
 
 class BaseClient:
-    def __init__(self, base):
+    def __init__(self, base, pool_size=DEFAULT_POOL_SIZE, rate_limiter=None, retry_policy=None, api_root=None,
+                 metrics=None, http_cache=None, single_flight=True, timeout=DEFAULT_TIMEOUT):
         self.base = base
+        self.pool_size = pool_size
+        # Passed to every request; a timed-out attempt goes through the retry policy like any other failure
+        self.timeout = timeout
+        self.metrics = metrics or get_metrics()
+        load_env()
+        # PCO_API_ROOT points every client at another server, e.g. pco_workflows.testing.FakePCOServer
+        self.api_root = (api_root or os.environ.get("PCO_API_ROOT") or DEFAULT_API_ROOT).rstrip("/")
+        # Tells tenants apart in on-disk caches, since they all share api_root
+        self.credentials = credential_fingerprint()
+        self.rate_limiter = rate_limiter or get_default_rate_limiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # An HttpCache or a path to one; None uses the process default (see set_default_http_cache), False none
+        if isinstance(http_cache, str):
+            http_cache = HttpCache(http_cache)
+        self.http_cache = get_default_http_cache() if http_cache is None else http_cache or None
+        # Identical GETs issued while one is in flight share its response
+        self.single_flight = SingleFlight() if single_flight else None
+        self._session = None
+
+    @property
+    def session(self):
+        # Created lazily so constructing a client never touches credentials or sockets
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.auth = get_auth()
+        session.headers.update(get_headers())
+        return session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def _full_url(self, url):
         if url.startswith('http'):
             return url
-        return f"https://api.planningcenteronline.com/{self.base}/{url.lstrip('/')}"
+        return f"{self.api_root}/{self.base}/{url.lstrip('/')}"
+
+    @property
+    def retry_stats(self):
+        return dict(self.retry_policy.stats)
+
+    @property
+    def single_flight_stats(self):
+        return self.single_flight.stats if self.single_flight is not None else {"hits": 0, "misses": 0}
 
     def _handle_response(self, resp, method):
         try:
-            resp.raise_for_status()
-            if method == 'delete' and resp.status_code == 204:
+            # A 404 on DELETE means the record is already gone, which is what the caller wanted
+            if method == 'delete' and resp.status_code in (204, 404):
                 return None
-            return resp.json()
+            resp.raise_for_status()
+            start = time.perf_counter()
+            data = resp.json()
+            self.metrics.record_parse(method, resp.url, time.perf_counter() - start)
+            return data
         except RequestException as e:
             error_msg = f"API {method.upper()} failed for {resp.url}: {e}"
             if resp.text:
                 error_msg += f" - Response: {resp.text}"
             raise RuntimeError(error_msg)
 
+    def _retry_delay(self, method, attempt, resp=None, exc=None):
+        # Seconds to wait before resending, or None when the outcome should be returned/raised as is
+        policy = self.retry_policy
+        if exc is not None:
+            retryable = policy.should_retry_exception(method, exc)
+        else:
+            retryable = policy.should_retry_status(method, resp.status_code)
+        if retryable and policy.can_retry(attempt):
+            policy.record("retries")
+            # On 429 the rate limiter is already holding every caller until Retry-After
+            if resp is not None and resp.status_code == 429:
+                return 0.0
+            return policy.backoff(attempt)
+        if retryable or (exc is not None and attempt):
+            policy.record("gave_up")
+        elif attempt and (resp.status_code < 400 or (method == 'delete' and resp.status_code == 404)):
+            # Only a retry that ended in success recovered anything; a 4xx after it is just a failure
+            policy.record("recovered")
+        return None
+
+    def _record(self, method, url, start, resp=None, exc=None):
+        # Latency covers the whole exchange including the body, which requests reads eagerly
+        elapsed = time.perf_counter() - start
+        if resp is None:
+            self.metrics.record_request(method, url, type(exc).__name__, elapsed, 0, 0)
+        else:
+            self.metrics.record_request(method, url, resp.status_code, elapsed, len(resp.content), wire_bytes(resp))
+
+    def _request(self, method, url, **kwargs):
+        full_url = self._full_url(url)
+        data = self._handle_response(self._send(method, full_url, **kwargs), method)
+        if method != 'get' and self.http_cache is not None:
+            self.http_cache.invalidate(full_url)
+        return data
+
+    def _send(self, method, full_url, **kwargs):
+        # The final response once retries are exhausted or unnecessary; raises if it never arrived
+        metrics = self.metrics
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            self.rate_limiter.acquire()
+            waited = time.perf_counter() - start
+            if waited > 0.001:
+                metrics.record_wait(method, full_url, waited)
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(method.upper(), full_url, timeout=self.timeout, **kwargs)
+            except RequestException as e:
+                self._record(method, full_url, start, exc=e)
+                delay = self._retry_delay(method, attempt, exc=e)
+                if delay is None:
+                    raise
+            else:
+                self._record(method, full_url, start, resp=resp)
+                self.rate_limiter.update_from_response(resp)
+                delay = self._retry_delay(method, attempt, resp=resp)
+                if delay is None:
+                    return resp
+            metrics.record_retry(method, full_url)
+            time.sleep(delay)
+            attempt += 1
+
+    def _cached(self, full_url, entry):
+        start = time.perf_counter()
+        data = json.loads(entry.body)
+        self.metrics.record_parse('get', full_url, time.perf_counter() - start)
+        return data
+
     def get(self, url, params=None):
+        if self.single_flight is None:
+            return self._get(url, params)
         full_url = self._full_url(url)
-        resp = requests.get(full_url, auth=get_auth(), headers=get_headers(), params=params)
-        return self._handle_response(resp, 'get')
+        result, shared = self.single_flight.do(HttpCache.key(full_url, params), self._get, url, params)
+        if shared:
+            self.metrics.record_coalesced('get', full_url)
+        return result
 
-    def post(self, url, data):
+    def _get(self, url, params=None):
+        cache = self.http_cache
         full_url = self._full_url(url)
-        resp = requests.post(full_url, auth=get_auth(), headers=get_headers(), json=data)
-        return self._handle_response(resp, 'post')
+        ttl = cache.ttl_for(full_url) if cache is not None else None
+        if ttl is None:
+            return self._request('get', url, params=params)
+        key = cache.key(full_url, params, self.credentials)
+        entry = cache.lookup(key)
+        if entry is not None and cache.is_fresh(entry, ttl):
+            self.metrics.record_cache('get', full_url, "hit")
+            return self._cached(full_url, entry)
+        resp = self._send('get', full_url, params=params, headers=cache.validators(entry))
+        if resp.status_code == 304 and entry is None:
+            # Nothing on hand to reuse (e.g. the entry went between lookup and send), so ask for the body
+            resp = self._send('get', full_url, params=params, headers=NO_CACHE)
+        return self._store_cached(cache, key, entry, ttl, full_url, resp)
+
+    def _store_cached(self, cache, key, entry, ttl, full_url, resp):
+        if resp.status_code == 304 and entry is not None:
+            cache.touch(key)
+            self.metrics.record_cache('get', full_url, "revalidated")
+            return self._cached(full_url, entry)
+        data = self._handle_response(resp, 'get')
+        self.metrics.record_cache('get', full_url, "miss")
+        cache.store(key, full_url, resp.headers, resp.content, ttl)
+        return data
+
+    def post(self, url, data):
+        return self._request('post', url, json=data)
 
     def patch(self, url, data):
-        full_url = self._full_url(url)
-        resp = requests.patch(full_url, auth=get_auth(), headers=get_headers(), json=data)
-        return self._handle_response(resp, 'patch')
+        return self._request('patch', url, json=data)
 
     def delete(self, url):
-        full_url = self._full_url(url)
-        resp = requests.delete(full_url, auth=get_auth(), headers=get_headers())
-        self._handle_response(resp, 'delete')
+        self._request('delete', url)
 
-    def paginate_get(self, url, params=None, extract_key="data"):
-        results = []
+    def _iter_pages(self, url, params):
         current_url = url
-        current_params = params or {"per_page": 100}
+        current_params = params
         while current_url:
             data = self.get(current_url, params=current_params)
-            results.extend(data.get(extract_key, []))
+            yield data
+            current_url = data.get("links", {}).get("next")
+            current_params = None  # Next URL includes params
+
+    def iter_paginate(self, url, params=None, extract_key="data", max_workers=None, ordered=True, include=None,
+                      fields=None):
+        params = with_fields(with_include(params, include), fields)
+        if max_workers and max_workers > 1:
+            yield from self.iter_paginate_parallel(url, params=params, extract_key=extract_key,
+                                                   max_workers=max_workers, ordered=ordered)
+            return
+        for data in self._iter_pages(url, params or {"per_page": 100}):
+            yield from attach_included(data, extract_key)
+
+    def iter_paginate_parallel(self, url, params=None, extract_key="data", max_workers=4, ordered=True):
+        params = dict(params or {})
+        per_page = int(params.setdefault("per_page", 100))
+        start = int(params.pop("offset", 0))
+        first = self.get(url, params={**params, "offset": start})
+        yield from attach_included(first, extract_key)
+        total = first.get("meta", {}).get("total_count")
+        if total is None:
+            # No total to plan offsets from; fall back to following links.next
+            next_url = first.get("links", {}).get("next")
+            for data in self._iter_pages(next_url, None):
+                yield from attach_included(data, extract_key)
+            return
+
+        offsets = iter(range(start + per_page, int(total), per_page))
+        # Keep a bounded window in flight so memory stays flat no matter how far the consumer lags
+        window = max_workers * 2
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = deque()
+        try:
+            for offset in islice(offsets, window):
+                pending.append(executor.submit(self.get, url, {**params, "offset": offset}))
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    future = done.pop()
+                    pending.remove(future)
+                data = future.result()
+                if not data.get(extract_key):
+                    # Records were deleted since total_count was read; later offsets are past the end too
+                    offsets = iter(())
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(executor.submit(self.get, url, {**params, "offset": offset}))
+                yield from attach_included(data, extract_key)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def paginate_get(self, url, params=None, extract_key="data", max_workers=None, ordered=True, include=None,
+                     fields=None):
+        return list(self.iter_paginate(url, params=params, extract_key=extract_key,
+                                       max_workers=max_workers, ordered=ordered, include=include, fields=fields))
+
+
+class AsyncBaseClient:
+    """asyncio counterpart of BaseClient.
+
+    Requests run on the same pooled requests.Session as the sync client, dispatched to a
+    thread pool sized to the connection pool, while rate-limit waits and retry backoff
+    are awaited on the event loop so they never tie up a worker thread.
+    """
+
+    def __init__(self, base, pool_size=DEFAULT_POOL_SIZE, rate_limiter=None, retry_policy=None, api_root=None,
+                 metrics=None, http_cache=None, single_flight=True, timeout=DEFAULT_TIMEOUT):
+        self.base = base
+        self.pool_size = pool_size
+        self._client = BaseClient(base, pool_size=pool_size, rate_limiter=rate_limiter, retry_policy=retry_policy,
+                                  api_root=api_root, metrics=metrics, http_cache=http_cache, single_flight=False,
+                                  timeout=timeout)
+        self.single_flight = AsyncSingleFlight() if single_flight else None
+        self._executor = None
+
+    @property
+    def rate_limiter(self):
+        return self._client.rate_limiter
+
+    @property
+    def retry_policy(self):
+        return self._client.retry_policy
+
+    @property
+    def retry_stats(self):
+        return self._client.retry_stats
+
+    @property
+    def single_flight_stats(self):
+        return self.single_flight.stats if self.single_flight is not None else {"hits": 0, "misses": 0}
+
+    @property
+    def metrics(self):
+        return self._client.metrics
+
+    @property
+    def http_cache(self):
+        return self._client.http_cache
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="pco-http")
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._client.close()
+
+    async def aclose(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _request(self, method, url, **kwargs):
+        client = self._client
+        full_url = client._full_url(url)
+        data = client._handle_response(await self._send(method, full_url, **kwargs), method)
+        if method != 'get' and client.http_cache is not None:
+            client.http_cache.invalidate(full_url)
+        return data
+
+    async def _send(self, method, full_url, **kwargs):
+        client = self._client
+        # Touch the session on the loop thread so it is created exactly once
+        send = partial(client.session.request, method.upper(), full_url, timeout=client.timeout, **kwargs)
+        loop = asyncio.get_running_loop()
+        metrics = client.metrics
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            await client.rate_limiter.acquire_async()
+            waited = time.perf_counter() - start
+            if waited > 0.001:
+                metrics.record_wait(method, full_url, waited)
+            start = time.perf_counter()
+            try:
+                resp = await loop.run_in_executor(self.executor, send)
+            except RequestException as e:
+                client._record(method, full_url, start, exc=e)
+                delay = client._retry_delay(method, attempt, exc=e)
+                if delay is None:
+                    raise
+            else:
+                client._record(method, full_url, start, resp=resp)
+                client.rate_limiter.update_from_response(resp)
+                delay = client._retry_delay(method, attempt, resp=resp)
+                if delay is None:
+                    return resp
+            metrics.record_retry(method, full_url)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, url, params=None):
+        if self.single_flight is None:
+            return await self._get(url, params)
+        full_url = self._client._full_url(url)
+        result, shared = await self.single_flight.do(HttpCache.key(full_url, params), self._get, url, params)
+        if shared:
+            self.metrics.record_coalesced('get', full_url)
+        return result
+
+    async def _get(self, url, params=None):
+        client = self._client
+        cache = client.http_cache
+        full_url = client._full_url(url)
+        ttl = cache.ttl_for(full_url) if cache is not None else None
+        if ttl is None:
+            return await self._request('get', url, params=params)
+        # SQLite lookups are sub-millisecond, so they run on the loop rather than in the executor
+        key = cache.key(full_url, params, client.credentials)
+        entry = cache.lookup(key)
+        if entry is not None and cache.is_fresh(entry, ttl):
+            client.metrics.record_cache('get', full_url, "hit")
+            return client._cached(full_url, entry)
+        resp = await self._send('get', full_url, params=params, headers=cache.validators(entry))
+        if resp.status_code == 304 and entry is None:
+            resp = await self._send('get', full_url, params=params, headers=NO_CACHE)
+        return client._store_cached(cache, key, entry, ttl, full_url, resp)
+
+    async def post(self, url, data):
+        return await self._request('post', url, json=data)
+
+    async def patch(self, url, data):
+        return await self._request('patch', url, json=data)
+
+    async def delete(self, url):
+        await self._request('delete', url)
+
+    async def _iter_pages(self, url, params):
+        current_url = url
+        current_params = params
+        while current_url:
+            data = await self.get(current_url, params=current_params)
+            yield data
             current_url = data.get("links", {}).get("next")
             current_params = None  # Next URL includes params
-            time.sleep(0.2)  # Rate limit: ~5 req/sec
-        return results
+
+    async def iter_paginate(self, url, params=None, extract_key="data", max_workers=None, ordered=True, include=None,
+                            fields=None):
+        params = with_fields(with_include(params, include), fields)
+        if max_workers and max_workers > 1:
+            async for record in self.iter_paginate_parallel(url, params=params, extract_key=extract_key,
+                                                            max_workers=max_workers, ordered=ordered):
+                yield record
+            return
+        async for data in self._iter_pages(url, params or {"per_page": 100}):
+            for record in attach_included(data, extract_key):
+                yield record
+
+    async def iter_paginate_parallel(self, url, params=None, extract_key="data", max_workers=4, ordered=True):
+        params = dict(params or {})
+        per_page = int(params.setdefault("per_page", 100))
+        start = int(params.pop("offset", 0))
+        first = await self.get(url, params={**params, "offset": start})
+        for record in attach_included(first, extract_key):
+            yield record
+        total = first.get("meta", {}).get("total_count")
+        if total is None:
+            async for data in self._iter_pages(first.get("links", {}).get("next"), None):
+                for record in attach_included(data, extract_key):
+                    yield record
+            return
+
+        offsets = iter(range(start + per_page, int(total), per_page))
+        window = max_workers * 2
+        pending = deque(asyncio.ensure_future(self.get(url, {**params, "offset": offset}))
+                        for offset in islice(offsets, window))
+        try:
+            while pending:
+                if ordered:
+                    task = pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    task = done.pop()
+                    pending.remove(task)
+                data = await task
+                if not data.get(extract_key):
+                    offsets = iter(())
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(asyncio.ensure_future(self.get(url, {**params, "offset": offset})))
+                for record in attach_included(data, extract_key):
+                    yield record
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def paginate_get(self, url, params=None, extract_key="data", max_workers=None, ordered=True, include=None,
+                           fields=None):
+        return [record async for record in self.iter_paginate(url, params=params, extract_key=extract_key,
+                                                              max_workers=max_workers, ordered=ordered,
+                                                              include=include, fields=fields)]
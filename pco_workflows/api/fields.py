@@ -0,0 +1,259 @@
+# pco_workflows/api/fields.py
+# One lookup table for every field a person can have: the built-in attributes plus the
+# tenant's custom field definitions, indexed case-insensitively by name and slug, and by ID.
+# Custom definitions are cached on disk so later runs skip the download; once the cache is
+# older than its TTL a one-record probe (newest updated_at plus total_count) decides
+# whether it is still current before anything is re-downloaded. A name the cached copy doesn't
+# know triggers one fresh download before it is reported missing.
+import json
+import os
+import time
+from functools import partial
+
+DEFAULT_FIELD_CACHE = "pco_fields.json"
+DEFAULT_FIELD_CACHE_TTL = 3600
+
+BUILT_IN_FIELDS = [
+    {
+        "id": None,
+        "attributes": {
+            "name": "First Name",
+            "slug": "first_name",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Middle Name",
+            "slug": "middle_name",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Last Name",
+            "slug": "last_name",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Nickname",
+            "slug": "nickname",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Birthdate",
+            "slug": "birthdate",
+            "data_type": "date",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Anniversary",
+            "slug": "anniversary",
+            "data_type": "date",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Gender",
+            "slug": "gender",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Grade",
+            "slug": "grade",
+            "data_type": "integer",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Child",
+            "slug": "child",
+            "data_type": "boolean",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Graduation Year",
+            "slug": "graduation_year",
+            "data_type": "integer",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Medical Notes",
+            "slug": "medical_notes",
+            "data_type": "text",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Membership",
+            "slug": "membership",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Status",
+            "slug": "status",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "School Type",
+            "slug": "school_type",
+            "data_type": "string",
+            "sequence": None
+        }
+    },
+    {
+        "id": None,
+        "attributes": {
+            "name": "Passed Background Check",
+            "slug": "passed_background_check",
+            "data_type": "boolean",
+            "sequence": None
+        }
+    },
+    # Add more if needed, but these are the main editable ones
+]
+
+def get_built_in_field_slugs():
+    return [f['attributes']['slug'] for f in BUILT_IN_FIELDS]
+
+_BUILT_IN_FIELDS_BY_NAME = {f['attributes']['name'].lower(): f for f in BUILT_IN_FIELDS}
+
+def get_built_in_field_by_name(field_name):
+    return _BUILT_IN_FIELDS_BY_NAME.get(field_name.lower())
+
+class FieldRegistry:
+    def __init__(self, custom_definitions=(), built_in_definitions=BUILT_IN_FIELDS, reload=None):
+        # reload returns an up-to-date registry; resolve() calls it once on a miss, since a
+        # registry from a still-fresh cache can predate a field an admin just added
+        self._reload = reload
+        self.built_in = list(built_in_definitions)
+        self.custom = list(custom_definitions)
+        self._by_name = {}
+        self._by_slug = {}
+        self._by_id = {}
+        # Custom definitions go in first so a built-in with the same name wins, as before
+        for definition in self.custom + self.built_in:
+            attributes = definition["attributes"]
+            self._by_name[attributes["name"].lower()] = definition
+            if attributes.get("slug"):
+                self._by_slug[attributes["slug"].lower()] = definition
+            if definition.get("id") is not None:
+                self._by_id[str(definition["id"])] = definition
+        self._built_in_ids = {id(d) for d in self.built_in}
+
+    def __len__(self):
+        return len(self.built_in) + len(self.custom)
+
+    def is_built_in(self, definition):
+        return id(definition) in self._built_in_ids
+
+    def get(self, name_or_slug):
+        key = name_or_slug.strip().lower()
+        return self._by_name.get(key) or self._by_slug.get(key)
+
+    def by_id(self, field_id):
+        return self._by_id.get(str(field_id))
+
+    def resolve(self, name_or_slug):
+        definition = self.get(name_or_slug)
+        if definition is None and self._reload is not None:
+            reload, self._reload = self._reload, None
+            self.__dict__.update(reload().__dict__)
+            definition = self.get(name_or_slug)
+        if definition is None:
+            raise ValueError(f"Field definition '{name_or_slug}' not found.")
+        return definition
+
+    def id_for(self, name_or_slug):
+        # The custom field definition ID, for field_data lookups; built-ins have none
+        definition = self.resolve(name_or_slug)
+        if definition.get("id") is None:
+            raise ValueError(f"Field definition '{name_or_slug}' not found.")
+        return definition["id"]
+
+    @classmethod
+    def load(cls, client, built_in_definitions=BUILT_IN_FIELDS, cache_path=DEFAULT_FIELD_CACHE, ttl=DEFAULT_FIELD_CACHE_TTL,
+             refresh=False):
+        """Builds the registry for ``client`` (a sync client rooted at people/v2), using the cache when current."""
+        cached = None if refresh else _read_cache(cache_path, client.api_root, client.credentials)
+        now = time.time()
+        if cached and now - cached["fetched_at"] < ttl:
+            reload = partial(cls.load, client, built_in_definitions, cache_path=cache_path, ttl=ttl, refresh=True)
+            return cls(cached["definitions"], built_in_definitions, reload=reload)
+        signature = _fetch_signature(client)
+        if cached and cached["signature"] == signature:
+            definitions = cached["definitions"]
+        else:
+            definitions = client.paginate_get("field_definitions")
+        if cache_path:
+            _write_cache(cache_path, {"api_root": client.api_root, "credentials": client.credentials,
+                                      "fetched_at": now, "signature": signature, "definitions": definitions})
+        return cls(definitions, built_in_definitions)
+
+def _fetch_signature(client):
+    # Any edit bumps the newest updated_at; a deletion changes the count
+    data = client.get("field_definitions", params={"order": "-updated_at", "per_page": 1})
+    newest = data.get("data") or []
+    return {
+        "total_count": (data.get("meta") or {}).get("total_count"),
+        "updated_at": newest[0]["attributes"].get("updated_at") if newest else None,
+    }
+
+def _read_cache(path, api_root, credentials):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # A cache written for another server or another org's credentials is as good as none; the
+    # org matters as much as the server, since every org shares the same api_root
+    if cached.get("api_root") != api_root or cached.get("credentials") != credentials:
+        return None
+    return cached
+
+def _write_cache(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
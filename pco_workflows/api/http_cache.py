@@ -0,0 +1,175 @@
+# pco_workflows/api/http_cache.py
+# On-disk cache of GET responses for read endpoints that rarely change. A cached response is
+# served as is while its endpoint's TTL lasts, then revalidated with If-None-Match /
+# If-Modified-Since so an unchanged resource costs a bodiless 304 instead of a download.
+# Entries are evicted least recently used first once the cache outgrows its size bound.
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlencode, urlsplit
+from pco_workflows.metrics import endpoint_for
+
+DEFAULT_HTTP_CACHE = "pco_http_cache.sqlite3"
+DEFAULT_HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Endpoint (as metrics names it) -> seconds a response is reused without asking the server.
+# 0 revalidates on every use; endpoints not listed are never cached.
+DEFAULT_CACHE_POLICIES = {
+    "people/v2/field_definitions": 0,
+    "people/v2/field_definitions/{id}": 0,
+    "people/v2/people/{id}": 0,
+    "people/v2/households/{id}": 0,
+    "publishing/v2/channels": 600,
+    "publishing/v2/channels/{id}": 600,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+CREATE INDEX IF NOT EXISTS responses_path ON responses (path);
+"""
+
+CachedResponse = namedtuple("CachedResponse", "key etag last_modified body stored_at")
+
+
+class HttpCache:
+    """SQLite-backed GET response cache, safe to share between threads and clients."""
+
+    def __init__(self, path=DEFAULT_HTTP_CACHE, max_bytes=DEFAULT_HTTP_CACHE_MAX_BYTES, policies=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.policies = dict(DEFAULT_CACHE_POLICIES if policies is None else policies)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # Losing the last few entries in a crash only costs a refetch, so skip the fsync per commit
+        self.conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;" + SCHEMA)
+        self._size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def ttl_for(self, url):
+        # None when the endpoint is not cached at all
+        return self.policies.get(endpoint_for(url))
+
+    @staticmethod
+    def key(url, params=None, scope=None):
+        # scope is the client's credential fingerprint: every org reads the same URLs, and one
+        # org's cached response must never be served to, or revalidated for, another
+        if params:
+            query = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+            url = f"{url}{'&' if '?' in url else '?'}{query}"
+        return f"{scope} {url}" if scope else url
+
+    def lookup(self, key):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT key, etag, last_modified, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CachedResponse(*row)
+
+    @staticmethod
+    def is_fresh(entry, ttl):
+        return time.time() - entry.stored_at < ttl
+
+    @staticmethod
+    def validators(entry):
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key, url, headers, body, ttl):
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        # Without a validator or a TTL the entry could never be reused
+        if not (etag or last_modified or ttl) or len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self.conn:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, urlsplit(url).path, etag, last_modified, body, len(body), now, now),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            self._evict()
+
+    def touch(self, key):
+        # A 304 confirmed the entry, so its TTL starts over
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def invalidate(self, url):
+        # A write may change anything an app's cached reads include (a PATCH to field_data shows
+        # up in people/{id}?include=field_data), so it drops every entry under that app
+        if not self._size:
+            return
+        app = "/".join(urlsplit(url).path.split("/")[:3])
+        with self._lock, self.conn:
+            removed = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses WHERE path >= ? AND path < ?", (app + "/", app + "0")
+            ).fetchone()[0]
+            if removed:
+                self.conn.execute("DELETE FROM responses WHERE path >= ? AND path < ?", (app + "/", app + "0"))
+                self._size -= removed
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM responses")
+            self._size = 0
+
+    def _evict(self):
+        # Caller holds the lock and the transaction
+        if self._size <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            evicted.append((key,))
+            self._size -= size
+            if self._size <= self.max_bytes:
+                break
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+
+_default_settings = None
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def set_default_http_cache(path, **kwargs):
+    # Clients created without an explicit http_cache share one cache at path; None turns it off.
+    # The file is only opened when the first client asks for it.
+    global _default_settings, _default_cache
+    with _default_lock:
+        if _default_cache is not None:
+            _default_cache.close()
+        _default_cache = None
+        _default_settings = (path, kwargs) if path else None
+
+
+def get_default_http_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None and _default_settings is not None:
+            path, kwargs = _default_settings
+            _default_cache = HttpCache(path, **kwargs)
+        return _default_cache
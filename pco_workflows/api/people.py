@@ -1,160 +1,36 @@
-from .client import BaseClient
-
-BUILT_IN_FIELDS = [
-    {
-        "id": None,
-        "attributes": {
-            "name": "First Name",
-            "slug": "first_name",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Middle Name",
-            "slug": "middle_name",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Last Name",
-            "slug": "last_name",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Nickname",
-            "slug": "nickname",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Birthdate",
-            "slug": "birthdate",
-            "data_type": "date",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Anniversary",
-            "slug": "anniversary",
-            "data_type": "date",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Gender",
-            "slug": "gender",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Grade",
-            "slug": "grade",
-            "data_type": "integer",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Child",
-            "slug": "child",
-            "data_type": "boolean",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Graduation Year",
-            "slug": "graduation_year",
-            "data_type": "integer",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Medical Notes",
-            "slug": "medical_notes",
-            "data_type": "text",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Membership",
-            "slug": "membership",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Status",
-            "slug": "status",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "School Type",
-            "slug": "school_type",
-            "data_type": "string",
-            "sequence": None
-        }
-    },
-    {
-        "id": None,
-        "attributes": {
-            "name": "Passed Background Check",
-            "slug": "passed_background_check",
-            "data_type": "boolean",
-            "sequence": None
-        }
-    },
-    # Add more if needed, but these are the main editable ones
-]
-
-def get_built_in_field_slugs():
-    return [f['attributes']['slug'] for f in BUILT_IN_FIELDS]
-
-def get_built_in_field_by_name(field_name):
-    for f in BUILT_IN_FIELDS:
-        if f['attributes']['name'].lower() == field_name.lower():
-            return f
-    return None
+import asyncio
+from functools import partial
+from .client import AsyncBaseClient, BaseClient, attach_included, with_fields, with_include
+from .fields import (  # noqa: F401 (built-in field helpers are re-exported)
+    BUILT_IN_FIELDS, DEFAULT_FIELD_CACHE, DEFAULT_FIELD_CACHE_TTL, FieldRegistry, get_built_in_field_by_name,
+    get_built_in_field_slugs,
+)
+
+PERSON_DETAIL_INCLUDES = ("emails", "phone_numbers", "households", "field_data")
+# Sparse fieldsets for the utilities below: only what they read comes over the wire
+PERSON_ID_FIELDS = {"Person": ()}
+PERSON_CONTACT_FIELDS = {"Person": ("emails", "phone_numbers"), "Email": ("address",), "PhoneNumber": ("number",)}
 
 class PeopleClient(BaseClient):
-    def __init__(self):
-        super().__init__("people/v2")
+    def __init__(self, field_cache=DEFAULT_FIELD_CACHE, field_cache_ttl=DEFAULT_FIELD_CACHE_TTL, **kwargs):
+        super().__init__("people/v2", **kwargs)
+        self.field_cache = field_cache
+        self.field_cache_ttl = field_cache_ttl
+        self._field_registry = None
+
+    def field_registry(self, refresh=False):
+        # Loaded once per client; the on-disk cache spares later runs the download as well
+        if self._field_registry is None or refresh:
+            self._field_registry = FieldRegistry.load(self, BUILT_IN_FIELDS, cache_path=self.field_cache,
+                                                      ttl=self.field_cache_ttl, refresh=refresh)
+        return self._field_registry
 
     def get_people(self, params=None):
         return self.paginate_get("people", params=params)
 
+    def iter_people(self, params=None, **kwargs):
+        return self.iter_paginate("people", params=params, **kwargs)
+
     def get_person(self, person_id, params=None):
         return self.get(f"people/{person_id}", params=params).get("data")
 
@@ -185,6 +61,9 @@ class PeopleClient(BaseClient):
     def get_field_data(self, params=None):
         return self.paginate_get("field_data", params=params)
 
+    def iter_field_data(self, params=None, **kwargs):
+        return self.iter_paginate("field_data", params=params, **kwargs)
+
     def get_field_datum(self, field_data_id, params=None):
         return self.get(f"field_data/{field_data_id}", params=params).get("data")
 
@@ -204,27 +83,145 @@ class PeopleClient(BaseClient):
         return self.paginate_get("anniversaries", params=params)
 
     # Utilities
-    def get_all_people_ids(self):
-        people = self.get_people()
-        return [p["id"] for p in people]
+    def get_all_people_ids(self, **kwargs):
+        return list(self.iter_all_people_ids(**kwargs))
+
+    def iter_all_people_ids(self, **kwargs):
+        kwargs.setdefault("fields", PERSON_ID_FIELDS)
+        for person in self.iter_people(**kwargs):
+            yield person["id"]
 
     def get_field_definition_id(self, field_name):
-        defs = self.get_field_definitions({"where[name]": field_name})
-        if not defs:
-            raise ValueError(f"Field definition '{field_name}' not found.")
-        return defs[0]["id"]
+        return self.field_registry().id_for(field_name)
 
     def get_field_data_by_definition(self, field_definition_id):
         return self.get_field_data({"where[field_definition_id]": field_definition_id})
 
+    def iter_field_data_by_definition(self, field_definition_id, **kwargs):
+        return self.iter_field_data({"where[field_definition_id]": field_definition_id}, **kwargs)
+
+    def iter_people_with_details(self, params=None, include=PERSON_DETAIL_INCLUDES, **kwargs):
+        return self.iter_people(params, include=include, **kwargs)
+
+    def find_person(self, search_name, include=None, fields=None):
+        params = with_fields(with_include({"where[search_name]": search_name, "per_page": 1}, include), fields)
+        people = attach_included(self.get("people", params=params))
+        return people[0] if people else None
+
     def search_person_by_name(self, search_name):
-        people = self.get_people({"where[search_name]": search_name, "per_page": 1})
-        if not people:
+        person = self.find_person(search_name, include=("emails", "phone_numbers"), fields=PERSON_CONTACT_FIELDS)
+        if not person:
             return "", ""
-        person_id = people[0]["id"]
-        emails = self.get_emails_for_person(person_id)
+        emails = person.get("included", {}).get("emails", [])
         email = emails[0]["attributes"]["address"] if emails else ""
-        phones = self.get_phone_numbers_for_person(person_id)
+        phones = person.get("included", {}).get("phone_numbers", [])
         phone = phones[0]["attributes"]["number"] if phones else ""
         return email, phone
 
+class AsyncPeopleClient(AsyncBaseClient):
+    def __init__(self, field_cache=DEFAULT_FIELD_CACHE, field_cache_ttl=DEFAULT_FIELD_CACHE_TTL, **kwargs):
+        super().__init__("people/v2", **kwargs)
+        self.field_cache = field_cache
+        self.field_cache_ttl = field_cache_ttl
+        self._field_registry = None
+
+    async def field_registry(self, refresh=False):
+        if self._field_registry is None or refresh:
+            # The inner sync client shares this client's session, rate limiter and metrics
+            load = partial(FieldRegistry.load, self._client, BUILT_IN_FIELDS, cache_path=self.field_cache,
+                           ttl=self.field_cache_ttl, refresh=refresh)
+            self._field_registry = await asyncio.get_running_loop().run_in_executor(self.executor, load)
+        return self._field_registry
+
+    async def get_people(self, params=None):
+        return await self.paginate_get("people", params=params)
+
+    def iter_people(self, params=None, **kwargs):
+        return self.iter_paginate("people", params=params, **kwargs)
+
+    async def get_person(self, person_id, params=None):
+        return (await self.get(f"people/{person_id}", params=params)).get("data")
+
+    async def get_addresses_for_person(self, person_id, params=None):
+        return await self.paginate_get(f"people/{person_id}/addresses", params=params)
+
+    async def get_address(self, address_id, params=None):
+        return (await self.get(f"addresses/{address_id}", params=params)).get("data")
+
+    async def get_emails_for_person(self, person_id, params=None):
+        return await self.paginate_get(f"people/{person_id}/emails", params=params)
+
+    async def get_email(self, email_id, params=None):
+        return (await self.get(f"emails/{email_id}", params=params)).get("data")
+
+    async def get_phone_numbers_for_person(self, person_id, params=None):
+        return await self.paginate_get(f"people/{person_id}/phone_numbers", params=params)
+
+    async def get_phone_number(self, phone_id, params=None):
+        return (await self.get(f"phone_numbers/{phone_id}", params=params)).get("data")
+
+    async def get_field_definitions(self, params=None):
+        return await self.paginate_get("field_definitions", params=params)
+
+    async def get_field_definition(self, field_id, params=None):
+        return (await self.get(f"field_definitions/{field_id}", params=params)).get("data")
+
+    async def get_field_data(self, params=None):
+        return await self.paginate_get("field_data", params=params)
+
+    def iter_field_data(self, params=None, **kwargs):
+        return self.iter_paginate("field_data", params=params, **kwargs)
+
+    async def get_field_datum(self, field_data_id, params=None):
+        return (await self.get(f"field_data/{field_data_id}", params=params)).get("data")
+
+    async def get_field_data_for_person(self, person_id, params=None):
+        return await self.paginate_get(f"people/{person_id}/field_data", params=params)
+
+    async def get_households(self, params=None):
+        return await self.paginate_get("households", params=params)
+
+    async def get_household(self, household_id, params=None):
+        return (await self.get(f"households/{household_id}", params=params)).get("data")
+
+    async def get_birthdays(self, params=None):
+        return await self.paginate_get("birthdays", params=params)
+
+    async def get_anniversaries(self, params=None):
+        return await self.paginate_get("anniversaries", params=params)
+
+    # Utilities
+    async def get_all_people_ids(self, **kwargs):
+        return [person_id async for person_id in self.iter_all_people_ids(**kwargs)]
+
+    async def iter_all_people_ids(self, **kwargs):
+        kwargs.setdefault("fields", PERSON_ID_FIELDS)
+        async for person in self.iter_people(**kwargs):
+            yield person["id"]
+
+    async def get_field_definition_id(self, field_name):
+        return (await self.field_registry()).id_for(field_name)
+
+    async def get_field_data_by_definition(self, field_definition_id):
+        return await self.get_field_data({"where[field_definition_id]": field_definition_id})
+
+    def iter_field_data_by_definition(self, field_definition_id, **kwargs):
+        return self.iter_field_data({"where[field_definition_id]": field_definition_id}, **kwargs)
+
+    def iter_people_with_details(self, params=None, include=PERSON_DETAIL_INCLUDES, **kwargs):
+        return self.iter_people(params, include=include, **kwargs)
+
+    async def find_person(self, search_name, include=None, fields=None):
+        params = with_fields(with_include({"where[search_name]": search_name, "per_page": 1}, include), fields)
+        people = attach_included(await self.get("people", params=params))
+        return people[0] if people else None
+
+    async def search_person_by_name(self, search_name):
+        person = await self.find_person(search_name, include=("emails", "phone_numbers"), fields=PERSON_CONTACT_FIELDS)
+        if not person:
+            return "", ""
+        emails = person.get("included", {}).get("emails", [])
+        email = emails[0]["attributes"]["address"] if emails else ""
+        phones = person.get("included", {}).get("phone_numbers", [])
+        phone = phones[0]["attributes"]["number"] if phones else ""
+        return email, phone
@@ -1,8 +1,34 @@
-from .client import BaseClient
+from .client import AsyncBaseClient, BaseClient
+
+def _resolve_channel_id(channel_id, channel_name, channel_ids):
+    if channel_name:
+        found = channel_ids().get(channel_name)
+        if found is None:
+            raise ValueError(f"No channel found with name '{channel_name}'")
+        return found
+    if channel_id not in (None, ""):
+        return str(channel_id)
+    first = next(iter(channel_ids().values()), None)
+    if first is None:
+        raise ValueError("No channels found.")
+    return first
 
 class PublishingClient(BaseClient):
-    def __init__(self):
-        super().__init__("publishing/v2")
+    def __init__(self, **kwargs):
+        super().__init__("publishing/v2", **kwargs)
+        self._channel_ids = None
+
+    def channel_ids(self, refresh=False):
+        # name -> ID for every channel in name order, fetched once per client so bulk workflows
+        # can resolve any number of rows without another request
+        if self._channel_ids is None or refresh:
+            channels = self.get_channels({"order": "name", "per_page": 100})
+            self._channel_ids = {c["attributes"]["name"]: c["id"] for c in channels}
+        return self._channel_ids
+
+    def resolve_channel_id(self, channel_id=None, channel_name=None):
+        # A name wins over an ID; with neither, the first channel by name is used
+        return _resolve_channel_id(channel_id, channel_name, self.channel_ids)
 
     def get_channels(self, params=None):
         return self.paginate_get("channels", params=params)
@@ -69,3 +95,84 @@ class PublishingClient(BaseClient):
 
     def delete_episode_resource(self, resource_id):
         self.delete(f"episode_resources/{resource_id}")
+
+class AsyncPublishingClient(AsyncBaseClient):
+    def __init__(self, **kwargs):
+        super().__init__("publishing/v2", **kwargs)
+        self._channel_ids = None
+
+    async def channel_ids(self, refresh=False):
+        if self._channel_ids is None or refresh:
+            channels = await self.get_channels({"order": "name", "per_page": 100})
+            self._channel_ids = {c["attributes"]["name"]: c["id"] for c in channels}
+        return self._channel_ids
+
+    async def resolve_channel_id(self, channel_id=None, channel_name=None):
+        channel_ids = await self.channel_ids() if channel_name or channel_id in (None, "") else {}
+        return _resolve_channel_id(channel_id, channel_name, lambda: channel_ids)
+
+    async def get_channels(self, params=None):
+        return await self.paginate_get("channels", params=params)
+
+    async def get_channel(self, channel_id, params=None):
+        return (await self.get(f"channels/{channel_id}", params=params)).get("data")
+
+    async def get_channel_id_by_name(self, name):
+        channels = await self.get_channels({"where[name]": name, "per_page": 1})
+        if not channels:
+            raise ValueError(f"No channel found with name '{name}'")
+        return channels[0]["id"]
+
+    async def get_first_channel_id(self):
+        channels = await self.get_channels({"order": "name", "per_page": 1})
+        if not channels:
+            raise ValueError("No channels found.")
+        return channels[0]["id"]
+
+    async def create_episode(self, attributes=None):
+        payload = {
+            "data": { "attributes": attributes }
+        }
+        return (await self.post("episodes", payload)).get("data")
+
+    async def get_episodes(self, channel_id, params=None):
+        return await self.paginate_get(f"channels/{channel_id}/episodes", params=params)
+
+    async def get_episode(self, episode_id, params=None):
+        return (await self.get(f"episodes/{episode_id}", params=params)).get("data")
+
+    async def update_episode(self, episode_id, attributes):
+        payload = {
+            "data": {
+                "attributes": attributes
+            }
+        }
+        return (await self.patch(f"episodes/{episode_id}", payload)).get("data")
+
+    async def delete_episode(self, episode_id):
+        await self.delete(f"episodes/{episode_id}")
+
+    async def get_episode_resources(self, episode_id, params=None):
+        return await self.paginate_get(f"episodes/{episode_id}/episode_resources", params=params)
+
+    async def get_episode_resource(self, resource_id, params=None):
+        return (await self.get(f"episode_resources/{resource_id}", params=params)).get("data")
+
+    async def create_episode_resource(self, episode_id, attributes):
+        payload = {
+            "data": {
+                "attributes": attributes
+            }
+        }
+        return (await self.post(f"episodes/{episode_id}/episode_resources", payload)).get("data")
+
+    async def update_episode_resource(self, resource_id, attributes):
+        payload = {
+            "data": {
+                "attributes": attributes
+            }
+        }
+        return (await self.patch(f"episode_resources/{resource_id}", payload)).get("data")
+
+    async def delete_episode_resource(self, resource_id):
+        await self.delete(f"episode_resources/{resource_id}")
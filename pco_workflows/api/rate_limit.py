@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+
+# PCO's documented default budget: 100 requests per 20 second window
+DEFAULT_LIMIT = 100
+DEFAULT_PERIOD = 20.0
+
+LIMIT_HEADER = "X-PCO-API-Request-Rate-Limit"
+COUNT_HEADER = "X-PCO-API-Request-Rate-Count"
+PERIOD_HEADER = "X-PCO-API-Request-Rate-Period"
+
+
+def _parse_number(value, cast):
+    if value is None:
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_retry_after(value):
+    seconds = _parse_number(value, float)
+    if seconds is None or seconds < 0:
+        return None
+    return seconds
+
+
+class RateLimiter:
+    """Token bucket shared by every client verb, tuned from PCO's rate-limit headers.
+
+    Tokens refill continuously at ``limit / period`` per second. Response headers
+    clamp the bucket to what the server says is left in the current window, and a
+    429 ``Retry-After`` blocks all callers until the window reopens. ``acquire``
+    is safe to call from threads; ``acquire_async`` from asyncio tasks.
+    """
+
+    def __init__(self, limit=DEFAULT_LIMIT, period=DEFAULT_PERIOD):
+        self.limit = limit
+        self.period = float(period)
+        self._tokens = float(limit)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.limit / self.period
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(float(self.limit), self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _reserve(self):
+        # Returns 0 once a token has been taken, otherwise how long to wait before trying again
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def _record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+
+    def acquire(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            self._record_wait(wait)
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            self._record_wait(wait)
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds):
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+
+    def update_from_headers(self, headers):
+        limit = _parse_number(headers.get(LIMIT_HEADER), int)
+        count = _parse_number(headers.get(COUNT_HEADER), int)
+        period = _parse_number(headers.get(PERIOD_HEADER), float)
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit and limit > 0:
+                self.limit = limit
+            if period and period > 0:
+                self.period = period
+            if count is not None:
+                # Other processes may share the same credentials, so never assume more than the server reports
+                remaining = max(self.limit - count, 0)
+                self._tokens = min(self._tokens, float(remaining))
+
+    def update_from_response(self, resp):
+        self.update_from_headers(resp.headers)
+        if resp.status_code == 429:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            self.block_for(retry_after if retry_after is not None else self.period)
+
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+
+def get_default_rate_limiter():
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
@@ -0,0 +1,56 @@
+import random
+import threading
+from urllib3.exceptions import NewConnectionError
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+# PATCH only ever sets attributes to fixed values, so replaying it is harmless; POST creates records
+IDEMPOTENT_METHODS = frozenset({"get", "patch", "delete"})
+
+
+def _request_not_sent(exc):
+    # True when the failure happened before the server could have seen the request
+    if isinstance(exc, ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient PCO failures.
+
+    429s are always retried because PCO rejects them before doing any work. 5xx
+    responses and dropped connections are only retried for idempotent verbs; a POST
+    is retried on a connection error only if the request provably never left.
+    """
+
+    def __init__(self, max_attempts=5, backoff_base=0.5, backoff_max=30.0,
+                 retry_statuses=RETRYABLE_STATUSES, idempotent_methods=IDEMPOTENT_METHODS):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+        self._lock = threading.Lock()
+        self.stats = {"retries": 0, "recovered": 0, "gave_up": 0}
+
+    def can_retry(self, attempt):
+        return attempt + 1 < self.max_attempts
+
+    def should_retry_status(self, method, status_code):
+        if status_code == 429:
+            return True
+        return status_code in self.retry_statuses and method in self.idempotent_methods
+
+    def should_retry_exception(self, method, exc):
+        if not isinstance(exc, (ConnectionError, ReadTimeout)):
+            return False
+        return method in self.idempotent_methods or _request_not_sent(exc)
+
+    def backoff(self, attempt):
+        # "Full jitter": spreads concurrent workers out instead of retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def record(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
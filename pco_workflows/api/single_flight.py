@@ -0,0 +1,91 @@
+# pco_workflows/api/single_flight.py
+# Collapses identical concurrent GETs into one request. The first caller for a key runs it;
+# callers arriving while it is in flight wait for that result instead of sending their own.
+# Each waiter gets its own deep copy, because callers mutate what they get back (attach_included).
+# do() returns (result, shared), shared being True when the result came from another caller.
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Thread-safe single-flight group. ``hits`` counts calls that shared another call's result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> [future, waiters]
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = [Future(), 0]
+                self.misses += 1
+                leader = True
+            else:
+                call[1] += 1
+                self.hits += 1
+                leader = False
+        if not leader:
+            return copy.deepcopy(call[0].result()), True
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._finish(key, call, exception=e)
+            raise
+        self._finish(key, call, result=result)
+        return result, False
+
+    def _finish(self, key, call, result=None, exception=None):
+        with self._lock:
+            del self._calls[key]
+            waiters = call[1]
+        if exception is not None:
+            call[0].set_exception(exception)
+        elif waiters:
+            # Snapshot before the leader's caller can start mutating its copy
+            call[0].set_result(copy.deepcopy(result))
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight for one event loop."""
+
+    def __init__(self):
+        self._calls = {}  # key -> [future, waiters]
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    async def do(self, key, fn, *args):
+        call = self._calls.get(key)
+        if call is not None:
+            call[1] += 1
+            self.hits += 1
+            # Shielded so a cancelled waiter doesn't cancel the request everyone else awaits
+            return copy.deepcopy(await asyncio.shield(call[0])), True
+        call = self._calls[key] = [asyncio.get_running_loop().create_future(), 0]
+        self.misses += 1
+        try:
+            result = await fn(*args)
+        except BaseException as e:
+            del self._calls[key]
+            if call[1]:
+                if isinstance(e, asyncio.CancelledError):
+                    call[0].cancel()
+                else:
+                    call[0].set_exception(e)
+            raise
+        del self._calls[key]
+        if call[1]:
+            call[0].set_result(copy.deepcopy(result))
+        return result, False
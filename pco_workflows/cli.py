@@ -1,28 +1,88 @@
+# Workflows (and with them requests and the API clients) are imported inside each command,
+# so `--help` and offline commands like create-csv start without loading them. Only light
+# modules are imported here for option defaults; tests/test_cli.py keeps it that way.
 import click
-from pco_workflows.workflows.parse_authorized_pickups import parse_authorized_pickups
-from pco_workflows.workflows.create_csv import create_import_csv
-from pco_workflows.workflows.create_episode import create_publishing_episode
-from pco_workflows.workflows.delete_all import delete_all_people
-from pco_workflows.workflows.delete_field import delete_field_data
-from pco_workflows.workflows.get_field_data import get_field_definition_data
-from pco_workflows.workflows.list_fields import list_field_definitions
+from pco_workflows.api.bulk import DEFAULT_CONCURRENCY
+from pco_workflows.api.http_cache import set_default_http_cache
+from pco_workflows.export import EXPORT_FORMATS
+from pco_workflows.metrics import get_metrics
+from pco_workflows.mirror import DEFAULT_MIRROR_PATH
+
+def _emit(text, path):
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text if text.endswith("\n") else text + "\n")
+    else:
+        click.echo(text, err=True)
 
 @click.group()
-def cli():
-    pass
+@click.option("--metrics", "metrics_format", type=click.Choice(["summary", "json", "prometheus"]), default=None, help="Report per-endpoint requests, bytes, latency, retries, rate-limit waits and phase timings when the command ends.")
+@click.option("--metrics-file", default=None, help="Write the --metrics report to this file instead of stderr.")
+@click.option("--profile", "profile_file", default=None, help="Run the command under cProfile, save the stats to this file and print the top functions.")
+@click.option("--http-cache", "http_cache", default=None, metavar="PATH", help="Cache slow-changing reads (field definitions, channels, single people and households) in this file, revalidated with ETags. Off unless given.")
+@click.pass_context
+def cli(ctx, metrics_format, metrics_file, profile_file, http_cache):
+    # Opened by the first client that needs it, so offline commands never create the file
+    set_default_http_cache(http_cache)
+    ctx.call_on_close(lambda: set_default_http_cache(None))
+    if metrics_format:
+        metrics = get_metrics()
+        metrics.reset()
+        ctx.call_on_close(lambda: _emit(metrics.render(metrics_format), metrics_file))
+    if profile_file:
+        import cProfile
+        import io
+        import pstats
+        profiler = cProfile.Profile()
+
+        def report_profile():
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+            click.echo(out.getvalue(), err=True)
+            click.echo(f"Profile saved to {profile_file} (view with: python -m pstats {profile_file})", err=True)
+
+        # Registered after the metrics report so the profile stops before it is rendered
+        ctx.call_on_close(report_profile)
+        profiler.enable()
 
 @cli.command(name="parse-authorized-pickups")
-@click.option("--person", required=True, help="Name of the specific person to process authorized pickups for.")
-def cli_parse_authorized_pickups(person):
-    """Parse authorized pickups for a specific person."""
-    parse_authorized_pickups(person)
+@click.option("--person", default=None, help="Name of the specific person to process authorized pickups for.")
+@click.option("--all", "all_people", is_flag=True, help="Process every person with 'Authorized Pickups' data in one batch.")
+@click.option("--concurrency", default=DEFAULT_CONCURRENCY, show_default=True, type=click.IntRange(min=1), help="People to process concurrently in --all mode.")
+@click.option("--index-file", default=None, help="JSON file to load and save the name -> (email, phone) lookup index (--all mode).")
+@click.option("--index-max-age", default=24 * 3600, show_default=True, type=click.IntRange(min=0), help="Seconds a saved lookup is reused before the name is searched again (0 searches every name).")
+def cli_parse_authorized_pickups(person, all_people, concurrency, index_file, index_max_age):
+    """Parse authorized pickups for a specific person, or everyone with --all."""
+    if bool(person) == all_people:
+        raise click.UsageError("Provide exactly one of --person or --all.")
+    from pco_workflows.workflows.parse_authorized_pickups import parse_all_authorized_pickups, parse_authorized_pickups
+    if all_people:
+        parse_all_authorized_pickups(concurrency=concurrency, index_file=index_file, index_max_age=index_max_age)
+    else:
+        parse_authorized_pickups(person)
 
 @cli.command(name="create-csv")
 @click.option("--input", required=True, help="Input CSV file path.")
 @click.option("--output", required=True, help="Output CSV file path.")
-def cli_create_csv(input, output):
+@click.option("--workers", default=1, show_default=True, type=click.IntRange(min=1), help="Worker processes used to transform chunks of rows.")
+@click.option("--chunk-size", default=5000, show_default=True, type=click.IntRange(min=1), help="Rows per chunk handed to a worker.")
+@click.option("--households", type=click.Choice(["last-name", "cluster"]), default="last-name", show_default=True, help="Group households by consecutive last names (last-name) or by shared address/phone/email (cluster).")
+def cli_create_csv(input, output, workers, chunk_size, households):
     """Transform input CSV for import."""
-    create_import_csv(input, output)
+    from pco_workflows.workflows.create_csv import create_import_csv
+    create_import_csv(input, output, workers=workers, chunk_size=chunk_size, households=households)
+
+@cli.command(name="import-csv")
+@click.option("--input", required=True, help="CSV file produced by create-csv.")
+@click.option("--concurrency", default=DEFAULT_CONCURRENCY, show_default=True, type=click.IntRange(min=1), help="Rows to import concurrently (all share one rate budget).")
+@click.option("--resume", is_flag=True, help="Skip rows and households already recorded in the journal by a previous run.")
+@click.option("--journal", default=None, help="Journal file recording imported rows (default: import-csv.journal).")
+def cli_import_csv(input, concurrency, resume, journal):
+    """Create or update people from a create-csv output file via the API."""
+    from pco_workflows.workflows.import_csv import import_people_csv
+    import_people_csv(input, concurrency=concurrency, resume=resume, journal_path=journal)
 
 @cli.command(name="create-episode")
 @click.option("--title", required=True, help="Episode title.")
@@ -39,34 +99,90 @@ def cli_create_csv(input, output):
 @click.option("--library-video-url", default=None, help="Library video URL (optional).")
 def cli_create_episode(title, channel_id, channel_name, art, series_id, description, sermon_audio, stream_type, video_url, published_to_library_at, library_audio_url, library_video_url):
     """Create a publishing episode with optional attributes and channel search."""
+    from pco_workflows.workflows.create_episode import create_publishing_episode
     create_publishing_episode(
         title, channel_id=channel_id, channel_name=channel_name, art=art, series_id=series_id,
         description=description, sermon_audio=sermon_audio, stream_type=stream_type, video_url=video_url,
         published_to_library_at=published_to_library_at, library_audio_url=library_audio_url, library_video_url=library_video_url
     )
 
+@cli.command(name="create-episodes")
+@click.option("--manifest", required=True, type=click.Path(exists=True, dir_okay=False), help="CSV or NDJSON (.ndjson/.jsonl) file with one episode per row: title, channel_id or channel_name, optional episode attributes and a resources JSON array.")
+@click.option("--results", default=None, help="File mapping manifest rows to created IDs (default: <manifest>.results.csv or .ndjson).")
+@click.option("--concurrency", default=DEFAULT_CONCURRENCY, show_default=True, type=click.IntRange(min=1), help="Rows to create concurrently (all share one rate budget).")
+@click.option("--resume", is_flag=True, help="Reuse episodes and resources already recorded in the journal by a previous run.")
+@click.option("--journal", default=None, help="Journal file recording created IDs (default: the manifest name with .journal).")
+def cli_create_episodes(manifest, results, concurrency, resume, journal):
+    """Create many publishing episodes and their resources from a manifest."""
+    from pco_workflows.workflows.create_episodes import create_episodes_from_manifest
+    create_episodes_from_manifest(manifest, results_path=results, concurrency=concurrency, resume=resume,
+                                  journal_path=journal)
+
+@cli.command(name="sync-episode-resources")
+@click.option("--desired", required=True, type=click.Path(exists=True, dir_okay=False), help="Desired state: NDJSON ({\"episode_id\": ..., \"resources\": [...]} per line) or CSV (episode_id plus attribute columns, one resource per row).")
+@click.option("--key", default="url", show_default=True, help="Resource attribute that identifies the same resource on both sides.")
+@click.option("--concurrency", default=DEFAULT_CONCURRENCY, show_default=True, type=click.IntRange(min=1), help="Requests to run concurrently (all share one rate budget).")
+@click.option("--dry-run", is_flag=True, help="Print the creates, updates and deletes without sending them.")
+def cli_sync_episode_resources(desired, key, concurrency, dry_run):
+    """Create, update and delete episode resources until they match a desired-state file."""
+    from pco_workflows.workflows.sync_episode_resources import sync_episode_resources
+    sync_episode_resources(desired, key=key, concurrency=concurrency, dry_run=dry_run)
+
 @cli.command(name="delete-all")
 @click.option("--skip-id", multiple=True, help="Person IDs to skip (can be used multiple times).")
-def cli_delete_all(skip_id):
+@click.option("--concurrency", default=DEFAULT_CONCURRENCY, show_default=True, type=click.IntRange(min=1), help="Number of deletes to run concurrently (all share one rate budget).")
+@click.option("--resume", is_flag=True, help="Skip IDs already recorded in the journal by a previous run.")
+@click.option("--journal", default=None, help="Journal file recording completed deletes (default: delete-all.journal).")
+def cli_delete_all(skip_id, concurrency, resume, journal):
     """Delete all people (with skips)."""
-    delete_all_people(list(skip_id))
+    from pco_workflows.workflows.delete_all import delete_all_people
+    delete_all_people(list(skip_id), concurrency=concurrency, resume=resume, journal_path=journal)
 
 @cli.command(name="delete-field")
 @click.option("--field", required=True, help="Field name to delete data for.")
-def cli_delete_field(field):
+@click.option("--concurrency", default=DEFAULT_CONCURRENCY, show_default=True, type=click.IntRange(min=1), help="Number of deletes to run concurrently (all share one rate budget).")
+@click.option("--resume", is_flag=True, help="Skip IDs already recorded in the journal by a previous run.")
+@click.option("--journal", default=None, help="Journal file recording completed deletes (default: delete-field-<field id>.journal).")
+def cli_delete_field(field, concurrency, resume, journal):
     """Delete all data for a specific field."""
-    delete_field_data(field)
+    from pco_workflows.workflows.delete_field import delete_field_data
+    delete_field_data(field, concurrency=concurrency, resume=resume, journal_path=journal)
 
 @cli.command(name="get-field-data")
-@click.option("--field", required=True, help="Field name to get data for.")
-def cli_get_field_data(field):
-    """Get data for a specific field."""
-    get_field_definition_data(field)
+@click.option("--field", default=None, help="Field name to get data for.")
+@click.option("--fields", default=None, help="Comma-separated field names to export together, one row per person.")
+@click.option("--format", "fmt", type=click.Choice(EXPORT_FORMATS), default="csv", show_default=True, help="Output format for --fields.")
+@click.option("--output", default=None, help="Output file for --fields (default: stdout; required for parquet).")
+@click.option("--workers", default=1, show_default=True, type=click.IntRange(min=1), help="Pages to fetch concurrently (uses offset-based prefetching when > 1).")
+@click.option("--from-cache", is_flag=True, help="Read from the local mirror instead of the API (run 'sync' first).")
+@click.option("--cache-db", default=DEFAULT_MIRROR_PATH, show_default=True, help="Local mirror database path.")
+def cli_get_field_data(field, fields, fmt, output, workers, from_cache, cache_db):
+    """Get data for a specific field, or export several fields at once with --fields."""
+    if bool(field) == bool(fields):
+        raise click.UsageError("Provide exactly one of --field or --fields.")
+    from pco_workflows.workflows.get_field_data import export_field_data, get_field_definition_data
+    if fields:
+        field_names = [name.strip() for name in fields.split(",") if name.strip()]
+        export_field_data(field_names, output=output, fmt=fmt, workers=workers, from_cache=from_cache, cache_db=cache_db)
+    else:
+        get_field_definition_data(field, workers=workers, from_cache=from_cache, cache_db=cache_db)
 
 @cli.command(name="list-fields")
-def cli_list_fields():
+@click.option("--from-cache", is_flag=True, help="Read from the local mirror instead of the API (run 'sync' first).")
+@click.option("--cache-db", default=DEFAULT_MIRROR_PATH, show_default=True, help="Local mirror database path.")
+def cli_list_fields(from_cache, cache_db):
     """List all available field definitions."""
-    list_field_definitions()
+    from pco_workflows.workflows.list_fields import list_field_definitions
+    list_field_definitions(from_cache=from_cache, cache_db=cache_db)
+
+@cli.command(name="sync")
+@click.option("--cache-db", default=DEFAULT_MIRROR_PATH, show_default=True, help="Local mirror database path.")
+@click.option("--full", is_flag=True, help="Re-download everything instead of only records changed since the last sync.")
+@click.option("--workers", default=1, show_default=True, type=click.IntRange(min=1), help="Pages to fetch concurrently.")
+def cli_sync(cache_db, full, workers):
+    """Sync people, contacts, households and field data into the local mirror."""
+    from pco_workflows.workflows.sync_mirror import sync_people_mirror
+    sync_people_mirror(cache_db, full=full, workers=workers)
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,117 @@
+# pco_workflows/export.py
+# Pivots people and their field data into one row per person and writes the rows in batches.
+# The rows come from a single pass over people with their field data sideloaded; each row is
+# built from a precomputed column plan instead of looking up every requested field per record.
+import csv
+import json
+import click
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+DEFAULT_BATCH_SIZE = 1000
+MULTI_VALUE_SEPARATOR = "|"
+
+class FieldPivot:
+    """Turns person records (with ``included["field_data"]``) into ``[person_id, value, ...]`` rows."""
+
+    def __init__(self, registry, field_names):
+        self.definitions = [registry.resolve(name) for name in field_names]
+        self.columns = ["person_id"] + [d["attributes"]["name"] for d in self.definitions]
+        # Per column: the person attribute to read for built-ins, or the definition ID to match
+        self._plan = [
+            ("attribute", d["attributes"]["slug"]) if registry.is_built_in(d) else ("field_data", str(d["id"]))
+            for d in self.definitions
+        ]
+        self._custom_columns = {key: i for i, (kind, key) in enumerate(self._plan) if kind == "field_data"}
+        self.needs_field_data = bool(self._custom_columns)
+
+    @property
+    def fields(self):
+        # Sparse fieldsets covering exactly what row() reads
+        person = [key for kind, key in self._plan if kind == "attribute"]
+        if not self.needs_field_data:
+            return {"Person": person}
+        return {"Person": person + ["field_data"], "FieldDatum": ["value", "field_definition"]}
+
+    def row(self, person):
+        attributes = person.get("attributes") or {}
+        values = [attributes.get(key) if kind == "attribute" else None for kind, key in self._plan]
+        if self._custom_columns:
+            for datum in (person.get("included") or {}).get("field_data", []):
+                definition_id = datum["relationships"]["field_definition"]["data"]["id"]
+                column = self._custom_columns.get(definition_id)
+                if column is None:
+                    continue
+                value = datum["attributes"].get("value")
+                # Multi-select fields have one datum per selected option
+                values[column] = value if values[column] is None else f"{values[column]}{MULTI_VALUE_SEPARATOR}{value}"
+        return [person["id"]] + values
+
+class _TextExportWriter:
+    def __init__(self, path):
+        self.to_stdout = path in (None, "-")
+        self.file = click.get_text_stream("stdout") if self.to_stdout else open(path, "w", encoding="utf-8", newline="")
+
+    def close(self):
+        if self.to_stdout:
+            self.file.flush()
+        else:
+            self.file.close()
+
+class CsvExportWriter(_TextExportWriter):
+    def __init__(self, path, columns):
+        super().__init__(path)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write_batch(self, rows):
+        self.writer.writerows(["" if v is None else v for v in row] for row in rows)
+
+class NdjsonExportWriter(_TextExportWriter):
+    def __init__(self, path, columns):
+        super().__init__(path)
+        self.columns = columns
+
+    def write_batch(self, rows):
+        self.file.write("".join(json.dumps(dict(zip(self.columns, row))) + "\n" for row in rows))
+
+class ParquetExportWriter:
+    def __init__(self, path, columns):
+        # Optional and slow to import, so only loaded when parquet is actually requested
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise click.UsageError("--format parquet needs pyarrow (pip install pyarrow).")
+        self.pyarrow = pyarrow
+        if path in (None, "-"):
+            raise click.UsageError("--format parquet needs an --output file.")
+        # Values are written as strings: PCO field data is untyped text and built-ins vary by person
+        self.schema = pyarrow.schema([(name, pyarrow.string()) for name in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write_batch(self, rows):
+        columns = [[None if v is None else str(v) for v in column] for column in zip(*rows)]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+WRITERS = {"csv": CsvExportWriter, "ndjson": NdjsonExportWriter, "parquet": ParquetExportWriter}
+
+def write_rows(rows, path, columns, fmt="csv", batch_size=DEFAULT_BATCH_SIZE):
+    writer = WRITERS[fmt](path, columns)
+    count = 0
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
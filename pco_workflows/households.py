@@ -0,0 +1,110 @@
+# pco_workflows/households.py
+# Groups create-csv input rows into households by shared address, phone, or email.
+# Each normalized value is hashed into an index that maps it to the first row seen with it;
+# any later row carrying the same value is merged into that row's set with union-find, so the
+# whole pass is linear in the number of rows and never compares rows pairwise.
+import re
+
+STREET_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "drive": "dr", "lane": "ln", "boulevard": "blvd",
+    "court": "ct", "place": "pl", "circle": "cir", "parkway": "pkwy", "highway": "hwy", "terrace": "ter",
+    "north": "n", "south": "s", "east": "e", "west": "w", "apartment": "apt", "suite": "ste", "unit": "apt",
+}
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+# Input columns (create-csv's source export) that identify a household
+ADDRESS_COLUMNS = ("Address", "City", "State", "Zip Code")
+PHONE_COLUMNS = ("Home Phone", "Cell Phone")  # Work phones are shared by unrelated coworkers
+EMAIL_COLUMNS = ("E-Mail",)
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = []
+        self.size = []
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # Path halving keeps trees flat
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+def normalize_address(street, city, state, zip_code):
+    street = _NON_ALNUM.sub(" ", (street or "").lower())
+    words = [STREET_ABBREVIATIONS.get(word, word) for word in street.split()]
+    if not words:
+        return None
+    zip5 = "".join(c for c in (zip_code or "") if c.isdigit())[:5]
+    # A street alone is ambiguous across towns; pin it with the ZIP, or city/state without one
+    locality = zip5 or " ".join(_NON_ALNUM.sub(" ", f"{city or ''} {state or ''}".lower()).split())
+    return "a:" + " ".join(words) + "|" + locality
+
+
+def normalize_phone(phone):
+    digits = "".join(c for c in (phone or "") if c.isdigit())
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return "p:" + digits if len(digits) == 10 else None
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    return "e:" + email if "@" in email else None
+
+
+def row_keys(get):
+    keys = [normalize_address(*(get(column, "") for column in ADDRESS_COLUMNS))]
+    keys.extend(normalize_phone(get(column, "")) for column in PHONE_COLUMNS)
+    keys.extend(normalize_email(get(column, "")) for column in EMAIL_COLUMNS)
+    return [key for key in keys if key]
+
+
+class Householder:
+    """Assigns household numbers and names to rows fed in order via ``add``."""
+
+    def __init__(self):
+        self.sets = UnionFind()
+        self.index = {}
+        self.last_names = []
+
+    def add(self, keys, last_name=""):
+        row = self.sets.add()
+        self.last_names.append(last_name)
+        for key in keys:
+            first = self.index.setdefault(key, row)
+            if first != row:
+                self.sets.union(first, row)
+        return row
+
+    def assign(self):
+        # Households are numbered by first appearance and named after their first member with a last name
+        numbers = {}
+        names = {}
+        household_ids = []
+        household_names = []
+        for row, last_name in enumerate(self.last_names):
+            root = self.sets.find(row)
+            if root not in numbers:
+                numbers[root] = str(len(numbers) + 1)
+            if last_name and root not in names:
+                names[root] = f"{last_name} Household"
+            household_ids.append(numbers[root])
+        for row in range(len(self.last_names)):
+            household_names.append(names.get(self.sets.find(row), ""))
+        return household_ids, household_names
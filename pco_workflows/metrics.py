@@ -0,0 +1,239 @@
+# pco_workflows/metrics.py
+# Request-level instrumentation shared by every client in the process: per-endpoint request
+# counts, statuses, response bytes (decoded and on the wire) and latency histograms, retries,
+# rate-limit waits, and timing spans around workflow phases. `run.py --metrics ...` reports it
+# when a command ends.
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Histogram upper bounds in seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+def endpoint_for(url):
+    # "https://api.../people/v2/people/123/emails?x=1" -> "people/v2/people/{id}/emails"
+    return _ID_SEGMENT.sub("/{id}", urlsplit(url).path).strip("/")
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.statuses = defaultdict(int)
+        self.bytes = 0
+        self.wire_bytes = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.parse_seconds = 0.0
+        self.retries = 0
+        self.wait_seconds = 0.0
+        self.waits = 0
+        self.cache = defaultdict(int)
+        self.coalesced = 0
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th request; max_seconds for the +Inf bucket
+        target = q * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (None,), self.buckets):
+            seen += count
+            if count and seen >= target:
+                return bound if bound is not None else self.max_seconds
+        return 0.0
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "bytes": self.bytes,
+            "wire_bytes": self.wire_bytes,
+            "seconds": round(self.seconds, 6),
+            "max_seconds": round(self.max_seconds, 6),
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+            "parse_seconds": round(self.parse_seconds, 6),
+            "retries": self.retries,
+            "rate_limit_waits": self.waits,
+            "rate_limit_wait_seconds": round(self.wait_seconds, 6),
+            "cache": dict(self.cache),
+            "coalesced": self.coalesced,
+        }
+
+class Metrics:
+    """Thread-safe counters keyed by "<METHOD> <endpoint>", plus named phase spans."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = defaultdict(EndpointStats)
+        self.spans = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        self.started = time.perf_counter()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+            self.spans.clear()
+            self.started = time.perf_counter()
+
+    @staticmethod
+    def _key(method, url):
+        return f"{method.upper()} {endpoint_for(url)}"
+
+    def record_request(self, method, url, status, seconds, nbytes, wire_bytes=None):
+        # nbytes is the decoded body; wire_bytes what crossed the network (smaller when compressed)
+        with self._lock:
+            stats = self.endpoints[self._key(method, url)]
+            stats.requests += 1
+            stats.statuses[str(status)] += 1
+            stats.bytes += nbytes
+            stats.wire_bytes += nbytes if wire_bytes is None else wire_bytes
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+            else:
+                stats.buckets[-1] += 1
+
+    def record_parse(self, method, url, seconds):
+        with self._lock:
+            self.endpoints[self._key(method, url)].parse_seconds += seconds
+
+    def record_retry(self, method, url):
+        with self._lock:
+            self.endpoints[self._key(method, url)].retries += 1
+
+    def record_cache(self, method, url, outcome):
+        # outcome: "hit" (served without a request), "revalidated" (304) or "miss"
+        with self._lock:
+            self.endpoints[self._key(method, url)].cache[outcome] += 1
+
+    def record_coalesced(self, method, url):
+        # A call that shared an identical in-flight request's response instead of sending its own
+        with self._lock:
+            self.endpoints[self._key(method, url)].coalesced += 1
+
+    def record_wait(self, method, url, seconds):
+        with self._lock:
+            stats = self.endpoints[self._key(method, url)]
+            stats.waits += 1
+            stats.wait_seconds += seconds
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.spans[name]["count"] += 1
+                self.spans[name]["seconds"] += elapsed
+
+    def to_dict(self):
+        with self._lock:
+            endpoints = {key: stats.to_dict() for key, stats in sorted(self.endpoints.items())}
+            spans = {name: {"count": s["count"], "seconds": round(s["seconds"], 6)} for name, s in self.spans.items()}
+        totals = {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "requests": sum(e["requests"] for e in endpoints.values()),
+            "bytes": sum(e["bytes"] for e in endpoints.values()),
+            "wire_bytes": sum(e["wire_bytes"] for e in endpoints.values()),
+            "request_seconds": round(sum(e["seconds"] for e in endpoints.values()), 6),
+            "parse_seconds": round(sum(e["parse_seconds"] for e in endpoints.values()), 6),
+            "retries": sum(e["retries"] for e in endpoints.values()),
+            "rate_limit_wait_seconds": round(sum(e["rate_limit_wait_seconds"] for e in endpoints.values()), 6),
+            "cache": {outcome: sum(e["cache"].get(outcome, 0) for e in endpoints.values())
+                      for outcome in ("hit", "revalidated", "miss")},
+            "coalesced": sum(e["coalesced"] for e in endpoints.values()),
+        }
+        return {"totals": totals, "endpoints": endpoints, "spans": spans}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def summary(self):
+        data = self.to_dict()
+        totals = data["totals"]
+        lines = [
+            f"Wall time {totals['wall_seconds']:.2f}s: {totals['requests']} requests, "
+            f"{totals['wire_bytes'] / 1024:.1f} KiB on the wire ({totals['bytes'] / 1024:.1f} KiB decoded), "
+            f"{totals['request_seconds']:.2f}s in requests (summed across threads), "
+            f"{totals['parse_seconds']:.2f}s parsing JSON, {totals['rate_limit_wait_seconds']:.2f}s rate-limit waits, "
+            f"{totals['retries']} retries",
+        ]
+        cache = totals["cache"]
+        if any(cache.values()):
+            lines.append(f"HTTP cache: {cache['hit']} hits, {cache['revalidated']} revalidated (304), "
+                         f"{cache['miss']} misses")
+        if totals["coalesced"]:
+            lines.append(f"Coalesced {totals['coalesced']} duplicate GETs into requests already in flight")
+        if data["endpoints"]:
+            lines.append(f"{'endpoint':<52}{'reqs':>7}{'wire KiB':>10}{'KiB':>9}{'mean ms':>9}{'p95 ms':>8}"
+                         f"{'retry':>7}{'wait s':>8}")
+            for key, e in data["endpoints"].items():
+                mean = e["seconds"] / e["requests"] * 1000 if e["requests"] else 0.0
+                lines.append(f"{key:<52}{e['requests']:>7}{e['wire_bytes'] / 1024:>10.1f}{e['bytes'] / 1024:>9.1f}"
+                             f"{mean:>9.1f}{e['p95_seconds'] * 1000:>8.0f}{e['retries']:>7}{e['rate_limit_wait_seconds']:>8.2f}")
+        for name, span in data["spans"].items():
+            lines.append(f"span {name}: {span['seconds']:.3f}s over {span['count']} call(s)")
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        def labels(key, **extra):
+            method, endpoint = key.split(" ", 1)
+            pairs = {"method": method, "endpoint": endpoint, **extra}
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs.items()) + "}"
+
+        data = self.to_dict()
+        endpoints = data["endpoints"].items()
+        # Each metric family's samples have to be contiguous, so loop per family
+        lines = ["# TYPE pco_requests_total counter"]
+        lines += [f"pco_requests_total{labels(key, status=status)} {count}"
+                  for key, e in endpoints for status, count in e["statuses"].items()]
+        lines.append("# TYPE pco_response_bytes_total counter")
+        lines += [f"pco_response_bytes_total{labels(key)} {e['bytes']}" for key, e in endpoints]
+        lines.append("# TYPE pco_response_wire_bytes_total counter")
+        lines += [f"pco_response_wire_bytes_total{labels(key)} {e['wire_bytes']}" for key, e in endpoints]
+        lines.append("# TYPE pco_request_duration_seconds histogram")
+        for key, e in endpoints:
+            cumulative = 0
+            for bound, count in e["buckets"].items():
+                cumulative += count
+                lines.append(f"pco_request_duration_seconds_bucket{labels(key, le=bound)} {cumulative}")
+            lines.append(f"pco_request_duration_seconds_sum{labels(key)} {e['seconds']}")
+            lines.append(f"pco_request_duration_seconds_count{labels(key)} {e['requests']}")
+        lines.append("# TYPE pco_json_parse_seconds_total counter")
+        lines += [f"pco_json_parse_seconds_total{labels(key)} {e['parse_seconds']}" for key, e in endpoints]
+        lines.append("# TYPE pco_retries_total counter")
+        lines += [f"pco_retries_total{labels(key)} {e['retries']}" for key, e in endpoints]
+        lines.append("# TYPE pco_rate_limit_wait_seconds_total counter")
+        lines += [f"pco_rate_limit_wait_seconds_total{labels(key)} {e['rate_limit_wait_seconds']}" for key, e in endpoints]
+        lines.append("# TYPE pco_http_cache_total counter")
+        lines += [f"pco_http_cache_total{labels(key, outcome=outcome)} {count}"
+                  for key, e in endpoints for outcome, count in e["cache"].items()]
+        lines.append("# TYPE pco_coalesced_requests_total counter")
+        lines += [f"pco_coalesced_requests_total{labels(key)} {e['coalesced']}" for key, e in endpoints]
+        lines.append("# TYPE pco_span_seconds_total counter")
+        lines += [f'pco_span_seconds_total{{span="{name}"}} {s["seconds"]}' for name, s in data["spans"].items()]
+        lines.append("# TYPE pco_span_count_total counter")
+        lines += [f'pco_span_count_total{{span="{name}"}} {s["count"]}' for name, s in data["spans"].items()]
+        return "\n".join(lines) + "\n"
+
+    def render(self, fmt):
+        return {"summary": self.summary, "json": self.to_json, "prometheus": self.to_prometheus}[fmt]()
+
+_default_metrics = Metrics()
+
+def get_metrics():
+    # One registry per process, so every client and workflow phase lands in the same report
+    return _default_metrics
+
+def span(name):
+    return _default_metrics.span(name)
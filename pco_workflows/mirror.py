@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import time
+from pco_workflows.api.fields import BUILT_IN_FIELDS, FieldRegistry
+
+DEFAULT_MIRROR_PATH = "pco_mirror.sqlite3"
+
+# Resources mirrored from people/v2. Whether a sync can be incremental is decided per
+# resource from the data itself: if its records carry updated_at, later syncs only ask for
+# records changed since the newest one stored; otherwise the table is refreshed in full.
+MIRRORED_RESOURCES = ["field_definitions", "people", "emails", "phone_numbers", "households", "field_data"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    resource TEXT NOT NULL,
+    id TEXT NOT NULL,
+    type TEXT,
+    updated_at TEXT,
+    person_id TEXT,
+    field_definition_id TEXT,
+    attributes TEXT NOT NULL,
+    relationships TEXT NOT NULL,
+    PRIMARY KEY (resource, id)
+);
+CREATE INDEX IF NOT EXISTS records_person ON records (resource, person_id);
+CREATE INDEX IF NOT EXISTS records_field_definition ON records (resource, field_definition_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    last_updated_at TEXT,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def _related_id(relationships, *names):
+    for name in names:
+        data = (relationships.get(name) or {}).get("data")
+        if isinstance(data, dict):
+            return data.get("id")
+    return None
+
+
+def _row(resource, record):
+    attributes = record.get("attributes") or {}
+    relationships = record.get("relationships") or {}
+    return (
+        resource,
+        record["id"],
+        record.get("type"),
+        attributes.get("updated_at"),
+        _related_id(relationships, "person", "customizable"),
+        _related_id(relationships, "field_definition"),
+        json.dumps(attributes),
+        json.dumps(relationships),
+    )
+
+
+def _record(row):
+    record_id, record_type, attributes, relationships = row
+    return {"type": record_type, "id": record_id,
+            "attributes": json.loads(attributes), "relationships": json.loads(relationships)}
+
+
+class PeopleMirror:
+    """Local SQLite copy of PCO People data.
+
+    ``sync`` pulls from a PeopleClient; the read helpers mirror the PeopleClient methods the
+    read-only workflows use, so a mirror can be passed wherever those workflows expect a client.
+    """
+
+    def __init__(self, path=DEFAULT_MIRROR_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._field_registry = None
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Sync
+    def sync_state(self, resource):
+        return self.conn.execute(
+            "SELECT last_updated_at, synced_at FROM sync_state WHERE resource = ?", (resource,)
+        ).fetchone()
+
+    def sync_resource(self, client, resource, full=False, max_workers=None):
+        state = None if full else self.sync_state(resource)
+        since = state[0] if state else None
+        params = {"per_page": 100}
+        if since:
+            params.update({"where[updated_at][gte]": since, "order": "updated_at"})
+
+        count = 0
+        newest = since
+        with self.conn:
+            if not since:
+                self.conn.execute("DELETE FROM records WHERE resource = ?", (resource,))
+            else:
+                self._prune(client, resource, max_workers)
+            batch = []
+            for record in client.iter_paginate(resource, params=params, max_workers=max_workers):
+                row = _row(resource, record)
+                if row[3] and (newest is None or row[3] > newest):
+                    newest = row[3]
+                batch.append(row)
+                if len(batch) >= 500:
+                    self._upsert(batch)
+                    count += len(batch)
+                    batch = []
+            self._upsert(batch)
+            count += len(batch)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (resource, last_updated_at, synced_at) VALUES (?, ?, ?)",
+                (resource, newest, time.time()),
+            )
+        return count, "incremental" if since else "full"
+
+    def _prune(self, client, resource, max_workers=None):
+        # Records deleted in PCO never show up as changed, so an incremental sync also lists every
+        # current ID (an empty sparse fieldset keeps those pages small) and drops the rest
+        row = self.conn.execute("SELECT type FROM records WHERE resource = ? LIMIT 1", (resource,)).fetchone()
+        if row is None:
+            return
+        params = {"per_page": 100, f"fields[{row[0]}]": ""}
+        current = {record["id"] for record in client.iter_paginate(resource, params=params, max_workers=max_workers)}
+        stored = [stored_id for (stored_id,) in
+                  self.conn.execute("SELECT id FROM records WHERE resource = ?", (resource,))]
+        self.conn.executemany("DELETE FROM records WHERE resource = ? AND id = ?",
+                              [(resource, stored_id) for stored_id in stored if stored_id not in current])
+
+    def _upsert(self, rows):
+        self.conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def sync(self, client, resources=None, full=False, max_workers=None):
+        self._field_registry = None
+        return {resource: self.sync_resource(client, resource, full=full, max_workers=max_workers)
+                for resource in resources or MIRRORED_RESOURCES}
+
+    # Reads
+    def _require(self, resource):
+        if self.sync_state(resource) is None:
+            raise RuntimeError(f"'{resource}' has not been synced into {self.path}; run the sync command first.")
+
+    def iter_records(self, resource, where="", args=()):
+        self._require(resource)
+        cursor = self.conn.execute(
+            f"SELECT id, type, attributes, relationships FROM records WHERE resource = ? {where} ORDER BY rowid",
+            (resource, *args),
+        )
+        for row in cursor:
+            yield _record(row)
+
+    def iter_people(self, params=None, include=None, **kwargs):
+        if not include or "field_data" not in include:
+            return self.iter_records("people")
+        return self._iter_people_with_field_data()
+
+    def _iter_people_with_field_data(self):
+        # Same shape as the API's include=field_data, from one grouped scan instead of a query per person
+        by_person = {}
+        for datum in self.iter_records("field_data"):
+            person_id = (datum["relationships"].get("customizable") or {}).get("data", {}).get("id")
+            by_person.setdefault(person_id, []).append(datum)
+        for person in self.iter_records("people"):
+            person["included"] = {"field_data": by_person.get(person["id"], [])}
+            yield person
+
+    def get_people(self, params=None):
+        return list(self.iter_people(params))
+
+    def get_field_definitions(self, params=None):
+        definitions = list(self.iter_records("field_definitions"))
+        name = (params or {}).get("where[name]")
+        if name is not None:
+            definitions = [d for d in definitions if d["attributes"].get("name") == name]
+        return definitions
+
+    def field_registry(self, refresh=False):
+        # The mirror is already local, so there is no separate cache file to keep current
+        if self._field_registry is None or refresh:
+            self._field_registry = FieldRegistry(self.get_field_definitions(), BUILT_IN_FIELDS)
+        return self._field_registry
+
+    def get_field_definition_id(self, field_name):
+        return self.field_registry().id_for(field_name)
+
+    def iter_field_data_by_definition(self, field_definition_id, **kwargs):
+        return self.iter_records("field_data", "AND field_definition_id = ?", (str(field_definition_id),))
+
+    def get_field_data_by_definition(self, field_definition_id):
+        return list(self.iter_field_data_by_definition(field_definition_id))
+
+    def get_field_data_for_person(self, person_id, params=None):
+        field_definition_id = (params or {}).get("where[field_definition_id]")
+        where, args = "AND person_id = ?", [str(person_id)]
+        if field_definition_id is not None:
+            where += " AND field_definition_id = ?"
+            args.append(str(field_definition_id))
+        return list(self.iter_records("field_data", where, args))
+
+    def get_emails_for_person(self, person_id, params=None):
+        return list(self.iter_records("emails", "AND person_id = ?", (str(person_id),)))
+
+    def get_phone_numbers_for_person(self, person_id, params=None):
+        return list(self.iter_records("phone_numbers", "AND person_id = ?", (str(person_id),)))
+
+    def get_households(self, params=None):
+        return list(self.iter_records("households"))
@@ -0,0 +1,81 @@
+# pco_workflows/normalize.py
+# Drop-in, faster equivalents of the normalizers in pco_workflows.utils, used on the
+# create-csv hot path. Every function returns exactly what its utils counterpart returns;
+# tests/test_normalize.py checks that, and benchmarks/bench_normalizers.py measures the gain.
+from datetime import datetime
+from functools import lru_cache
+# get_status_and_membership is already constant-time; re-exported so callers need one import
+from pco_workflows.utils import get_status_and_membership  # noqa: F401
+
+# Deletes every ASCII character that str.isdigit() rejects
+_ASCII_NON_DIGITS = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+_YES_NO = {"yes": "TRUE", "no": "FALSE"}
+
+# Checked in this order, matching the reference grade_map iteration order
+_GRADE_WORDS = (
+    ("kindergarten", 0), ("first", 1), ("second", 2), ("third", 3), ("fourth", 4),
+    ("fifth", 5), ("sixth", 6), ("seventh", 7), ("eighth", 8), ("ninth", 9),
+    ("tenth", 10), ("eleventh", 11), ("twelfth", 12),
+)
+
+def _digits(value):
+    if value.isascii():
+        return value.translate(_ASCII_NON_DIGITS)
+    # Non-ASCII digits (e.g. superscripts) follow str.isdigit exactly like the reference
+    return ''.join(filter(str.isdigit, value))
+
+def format_phone(phone):
+    if not phone:
+        return ""
+    digits = _digits(phone)
+    if len(digits) == 10:
+        return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    return phone
+
+def yes_no_to_true_false(value):
+    if not value:
+        return ""
+    return _YES_NO.get(value.lower(), "")
+
+@lru_cache(maxsize=4096)
+def map_grade(grade):
+    if not grade:
+        return ""
+    grade_lower = grade.lower()
+    if "graduated" in grade_lower:
+        return ""
+    if "pre-school" in grade_lower or "pre-k" in grade_lower:
+        return -1
+    for key, value in _GRADE_WORDS:
+        if key in grade_lower:
+            return value
+    try:
+        num = int(_digits(grade))
+        if 1 <= num <= 12:
+            return num
+    except ValueError:
+        return ""
+    return ""
+
+@lru_cache(maxsize=65536)
+def _format_month_day(month_day, year):
+    # Only ~366 month/day strings times a century of birth years ever reach strptime
+    try:
+        return datetime.strptime(month_day, "%m/%d").replace(year=year).strftime("%m/%d/%Y")
+    except ValueError:
+        return ""
+
+def format_birthdate(birth_month_day, age, current_year=2025):
+    if not birth_month_day:
+        return ""
+    try:
+        birth_year = current_year - int(age) if age and age.isdigit() else 1885
+    except ValueError:
+        return ""
+    return _format_month_day(birth_month_day, birth_year)
+
+def format_anniversary(wedding_month_day):
+    if not wedding_month_day:
+        return ""
+    return _format_month_day(wedding_month_day, 1885)
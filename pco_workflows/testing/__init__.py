@@ -0,0 +1,2 @@
+from .fake_server import FakePCOServer
+from .record_replay import RecordingAdapter, ReplayAdapter, use_cassette
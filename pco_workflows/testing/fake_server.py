@@ -0,0 +1,393 @@
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# JSON:API type for each collection served
+RESOURCE_TYPES = {
+    "people": "Person",
+    "emails": "Email",
+    "phone_numbers": "PhoneNumber",
+    "addresses": "Address",
+    "households": "Household",
+    "household_memberships": "HouseholdMembership",
+    "field_definitions": "FieldDefinition",
+    "field_data": "FieldDatum",
+    "channels": "Channel",
+    "episodes": "Episode",
+    "episode_resources": "EpisodeResource",
+}
+
+FIRST_NAMES = ("Ada", "Ben", "Cora", "Dan", "Eve", "Finn", "Gia", "Hal", "Ivy", "Jon", "Kai", "Lea")
+LAST_NAMES = ("Smith", "Jones", "Garcia", "Brown", "Lee", "Walker", "Young", "King", "Scott", "Green", "Hall")
+
+# Bodies smaller than this go out uncompressed, as real servers tend to do
+GZIP_MIN_BYTES = 512
+
+# (parent collection, child collection) -> relationship on the child that points at the parent
+PARENT_LINKS = {
+    ("people", "emails"): "person",
+    ("people", "phone_numbers"): "person",
+    ("people", "addresses"): "person",
+    ("people", "field_data"): "customizable",
+    ("households", "household_memberships"): "household",
+    ("channels", "episodes"): "channel",
+    ("episodes", "episode_resources"): "episode",
+}
+
+
+class FakePCOServer:
+    """In-process stand-in for the PCO People and Publishing APIs, for tests and benchmarks.
+
+    Serves JSON:API collections from memory with ``per_page``/``offset`` pagination,
+    ``links.next``, ``meta.total_count``, ``where[...]``/``order`` filters, ``include``
+    sideloading, ``fields[Type]`` sparse fieldsets, gzip when the client accepts it, ETags
+    with ``If-None-Match`` 304s and nested ``people/{id}/emails``-style routes. Latency,
+    rate limiting (with PCO's headers and 429 + Retry-After) and random 5xx faults are
+    configurable.
+    Point clients at it with ``PCO_API_ROOT=server.url`` or ``api_root=server.url``.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=None, rate_period=20.0, fault_rate=0.0,
+                 fault_statuses=(500, 502, 503), seed=0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.fault_rate = fault_rate
+        self.fault_statuses = tuple(fault_statuses)
+        self.random = random.Random(seed)
+        self.store = {name: OrderedDict() for name in RESOURCE_TYPES}
+        # (collection, relationship, related id) -> {id: record}, so nested routes, include and
+        # where[..._id] stay cheap at 100k-person scale
+        self._related = defaultdict(OrderedDict)
+        self.request_log = []
+        self._ids = count(1)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # Data
+    def add(self, collection, attributes=None, relationships=None, record_id=None):
+        with self._lock:
+            record_id = str(record_id or next(self._ids))
+            record = {
+                "type": RESOURCE_TYPES[collection],
+                "id": record_id,
+                "attributes": dict(attributes or {}),
+                "relationships": dict(relationships or {}),
+            }
+            self.store[collection][record_id] = record
+            self._index(collection, record)
+            return record
+
+    def _index(self, collection, record, remove=False):
+        for name, relationship in record["relationships"].items():
+            linkage = (relationship or {}).get("data")
+            for link in linkage if isinstance(linkage, list) else [linkage]:
+                if isinstance(link, dict):
+                    bucket = self._related[(collection, name, str(link["id"]))]
+                    if remove:
+                        bucket.pop(record["id"], None)
+                    else:
+                        bucket[record["id"]] = record
+
+    def link(self, collection, record, name, resource_type, resource_id):
+        """Adds ``resource_id`` to a to-many relationship on an existing record."""
+        with self._lock:
+            relationship = record["relationships"].setdefault(name, {"data": []})
+            relationship["data"].append({"type": resource_type, "id": str(resource_id)})
+            self._related[(collection, name, str(resource_id))][record["id"]] = record
+
+    def add_person(self, first_name, last_name, email=None, phone=None, **attributes):
+        person = self.add("people", {"first_name": first_name, "last_name": last_name,
+                                     "name": f"{first_name} {last_name}", **attributes})
+        if email:
+            self.add("emails", {"address": email, "location": "Home", "primary": True}, _link("person", "Person", person["id"]))
+        if phone:
+            self.add("phone_numbers", {"number": phone, "location": "Mobile"}, _link("person", "Person", person["id"]))
+        return person
+
+    def add_field_datum(self, person_id, field_definition_id, value):
+        relationships = {**_link("customizable", "Person", person_id),
+                         **_link("field_definition", "FieldDefinition", field_definition_id)}
+        return self.add("field_data", {"value": value}, relationships)
+
+    def seed_people(self, count, field_definitions=("Authorized Pickups",), households_every=3):
+        """Populate ``count`` synthetic people with contact info, custom field data and households."""
+        definitions = [self.add("field_definitions", {"name": name, "slug": name.lower().replace(" ", "_"),
+                                                      "data_type": "text"}) for name in field_definitions]
+        people = []
+        household = None
+        for i in range(count):
+            first, last = FIRST_NAMES[i % len(FIRST_NAMES)], LAST_NAMES[(i // households_every) % len(LAST_NAMES)]
+            person = self.add_person(first, last, email=f"{first}.{last}.{i}@example.com".lower(),
+                                     phone=f"555{i:07d}"[-10:], remote_id=i + 1,
+                                     updated_at=f"2025-01-01T00:00:{i % 60:02d}Z")
+            people.append(person)
+            for definition in definitions:
+                self.add_field_datum(person["id"], definition["id"], f"{FIRST_NAMES[(i + 1) % len(FIRST_NAMES)]} {last}")
+            if i % households_every == 0:
+                household = self.add("households", {"name": f"{last} Household", "primary_contact_id": person["id"]},
+                                     {"people": {"data": []}})
+            self.link("households", household, "people", "Person", person["id"])
+        return people
+
+    def count_requests(self, method=None, path_contains=None):
+        with self._lock:
+            return sum(1 for entry in self.request_log
+                       if (method is None or entry["method"] == method)
+                       and (path_contains is None or path_contains in entry["path"]))
+
+    # Request handling
+    def _throttle(self):
+        # Fixed window like PCO's; returns (status override or None, rate-limit headers)
+        if not self.rate_limit:
+            return None, {}
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.rate_period:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            headers = {
+                "X-PCO-API-Request-Rate-Limit": str(self.rate_limit),
+                "X-PCO-API-Request-Rate-Count": str(min(self._window_count, self.rate_limit)),
+                "X-PCO-API-Request-Rate-Period": str(int(self.rate_period)),
+            }
+            if self._window_count > self.rate_limit:
+                retry_after = max(self.rate_period - (now - self._window_start), 0.01)
+                headers["Retry-After"] = f"{retry_after:.2f}"
+                return 429, headers
+            return None, headers
+
+    def handle(self, method, path, query, body):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self.random.uniform(0, self.jitter))
+        status, headers = self._throttle()
+        if status:
+            return status, headers, {"errors": [{"status": "429", "title": "Too Many Requests"}]}
+        if self.fault_rate and self.random.random() < self.fault_rate:
+            status = self.random.choice(self.fault_statuses)
+            return status, headers, {"errors": [{"status": str(status), "title": "Injected fault"}]}
+
+        parts = [p for p in path.split("/") if p]
+        # Drop the "<app>/v2" prefix; collections are shared across People and Publishing
+        if len(parts) >= 2 and parts[1] == "v2":
+            parts = parts[2:]
+        try:
+            if len(parts) == 1:
+                return self._collection(method, path, parts[0], None, query, body, headers)
+            if len(parts) == 2:
+                return self._member(method, parts[0], parts[1], query, body, headers)
+            if len(parts) == 3:
+                return self._collection(method, path, parts[2], (parts[0], parts[1]), query, body, headers)
+        except KeyError:
+            pass
+        return 404, headers, {"errors": [{"status": "404", "title": "Not Found"}]}
+
+    def _collection(self, method, path, collection, parent, query, body, headers):
+        if collection not in self.store:
+            raise KeyError(collection)
+        link = PARENT_LINKS.get((parent[0], collection)) if parent else None
+        if parent and link is None:
+            raise KeyError(collection)
+        if method == "POST":
+            data = (body or {}).get("data", {})
+            relationships = dict(data.get("relationships") or {})
+            if parent:
+                parent_type = RESOURCE_TYPES[parent[0]]
+                relationships.update(_link(link, parent_type, parent[1]))
+            attributes = dict(data.get("attributes") or {})
+            if collection == "field_data" and "field_definition_id" in attributes:
+                relationships.update(_link("field_definition", "FieldDefinition", attributes.pop("field_definition_id")))
+            record = self.add(collection, attributes, relationships)
+            if collection == "household_memberships":
+                # A membership is how PCO adds someone to an existing household
+                person_id = relationships["person"]["data"]["id"]
+                self.link("households", self.store["households"][parent[1]], "people", "Person", person_id)
+            return 201, headers, {"data": record}
+        if method != "GET":
+            return 405, headers, {"errors": [{"status": "405"}]}
+
+        with self._lock:
+            if parent:
+                records = list(self._related[(collection, link, parent[1])].values())
+            else:
+                records = list(self.store[collection].values())
+        records = self._filter(collection, records, query)
+        total = len(records)
+        per_page = max(1, min(int(query.get("per_page", 25)), 100))
+        offset = int(query.get("offset", 0))
+        page = records[offset:offset + per_page]
+        document = {"data": [self._render(collection, r, query) for r in page], "meta": {"total_count": total, "count": len(page)},
+                    "links": {}}
+        if offset + per_page < total:
+            next_query = {**query, "offset": str(offset + per_page), "per_page": str(per_page)}
+            document["links"]["next"] = f"{self.url}{path}?{urlencode(next_query)}"
+        included = self._included(collection, page, query)
+        if included is not None:
+            document["included"] = included
+        return 200, headers, document
+
+    def _member(self, method, collection, record_id, query, body, headers):
+        store = self.store[collection]
+        if method == "DELETE":
+            with self._lock:
+                record = store.pop(record_id, None)
+                if record is None:
+                    raise KeyError(record_id)
+                self._index(collection, record, remove=True)
+            return 204, headers, None
+        record = store[record_id]
+        if method == "PATCH":
+            with self._lock:
+                record["attributes"].update((body or {}).get("data", {}).get("attributes") or {})
+            return 200, headers, {"data": record}
+        if method == "GET":
+            document = {"data": self._render(collection, record, query)}
+            included = self._included(collection, [record], query)
+            if included is not None:
+                document["included"] = included
+            return 200, headers, document
+        return 405, headers, {"errors": [{"status": "405"}]}
+
+    def _filter(self, collection, records, query):
+        for key, value in query.items():
+            if not key.startswith("where["):
+                continue
+            field = key[len("where["):].split("]")[0]
+            if field == "search_name":
+                needle = value.lower()
+                records = [r for r in records if needle in
+                           f"{r['attributes'].get('first_name', '')} {r['attributes'].get('last_name', '')}".lower()]
+            elif key.endswith("[gte]"):
+                records = [r for r in records if str(r["attributes"].get(field, "")) >= value]
+            elif field.endswith("_id") and field[:-3] in (records[0]["relationships"] if records else {}):
+                with self._lock:
+                    matches = self._related[(collection, field[:-3], value)]
+                records = [r for r in records if r["id"] in matches]
+            else:
+                records = [r for r in records if str(r["attributes"].get(field)) == value]
+        order = query.get("order")
+        if order:
+            reverse = order.startswith("-")
+            field = order.lstrip("-")
+            records = sorted(records, key=lambda r: str(r["attributes"].get(field) or ""), reverse=reverse)
+        return records
+
+    def _children(self, collection, record_id, child):
+        link = PARENT_LINKS.get((collection, child))
+        if child == "households" and collection == "people":
+            link = "people"
+        if link is None:
+            return []
+        with self._lock:
+            return list(self._related[(child, link, record_id)].values())
+
+    def _render(self, collection, record, query):
+        includes = [name for name in query.get("include", "").split(",") if name]
+        if not includes:
+            return _sparse(record, query)
+        rendered = {**record, "relationships": dict(record["relationships"])}
+        for name in includes:
+            children = self._children(collection, record["id"], name)
+            rendered["relationships"][name] = {"data": [{"type": c["type"], "id": c["id"]} for c in children]}
+        return _sparse(rendered, query)
+
+    def _included(self, collection, records, query):
+        includes = [name for name in query.get("include", "").split(",") if name]
+        if not includes:
+            return None
+        included = []
+        for record in records:
+            for name in includes:
+                included.extend(_sparse(child, query) for child in self._children(collection, record["id"], name))
+        return included
+
+
+def _sparse(record, query):
+    # fields[Type]=a,b keeps only those attributes and relationships; an empty list keeps neither
+    names = query.get(f"fields[{record['type']}]")
+    if names is None:
+        return record
+    names = set(filter(None, names.split(",")))
+    return {**record,
+            "attributes": {k: v for k, v in record["attributes"].items() if k in names},
+            "relationships": {k: v for k, v in record["relationships"].items() if k in names}}
+
+
+def _link(name, resource_type, resource_id):
+    return {name: {"data": {"type": resource_type, "id": str(resource_id)}}}
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+        def _dispatch(self):
+            start = time.perf_counter()
+            split = urlsplit(self.path)
+            query = dict(parse_qsl(split.query, keep_blank_values=True))
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            status, headers, document = server.handle(self.command, split.path, query, body)
+            payload = json.dumps(document).encode() if document is not None else b""
+            if self.command == "GET" and status == 200:
+                etag = f'"{hashlib.sha1(payload).hexdigest()[:20]}"'
+                headers = {**headers, "ETag": etag}
+                if self.headers.get("If-None-Match") == etag:
+                    status, payload = 304, b""
+            encoding = None
+            if len(payload) > GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+                payload, encoding = gzip.compress(payload, compresslevel=6), "gzip"
+            # Logged before replying so a client that has its response always sees its request logged
+            with server._lock:
+                server.request_log.append({"method": self.command, "path": split.path, "status": status,
+                                           "seconds": time.perf_counter() - start, "bytes": len(payload)})
+            self.send_response(status)
+            self.send_header("Content-Type", "application/vnd.api+json")
+            self.send_header("Content-Length", str(len(payload)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -1,6 +1,11 @@
 import csv
+import time
+from collections import deque
+from itertools import islice
 import click
-from pco_workflows.utils import (
+from pco_workflows.households import Householder, row_keys
+from pco_workflows.metrics import span
+from pco_workflows.normalize import (
     format_phone, yes_no_to_true_false, map_grade, get_status_and_membership,
     format_birthdate, format_anniversary
 )
@@ -15,98 +20,174 @@ OUTPUT_HEADERS = [
     "Emergency Contact", "Emergency Phone", "Allergies", "Authorized Pickup"
 ]
 
-def create_import_csv(input_file, output_file, current_year=2025):
-    try:
-        with open(input_file, 'r', encoding='utf-8') as infile, open(output_file, 'w', encoding='utf-8', newline='') as outfile:
-            reader = csv.DictReader(infile)
-            writer = csv.DictWriter(outfile, fieldnames=OUTPUT_HEADERS)
-            writer.writeheader()
+DEFAULT_CHUNK_SIZE = 5000
+
+def transform_row(row, remote_id, household_id, current_year=2025, household_name=None):
+    last_name = row.get("Last Name", "").strip()
+    birthdate = format_birthdate(row.get("Birth Month and Day", ""), row.get("Age", ""), current_year)
+    anniversary = format_anniversary(row.get("Wedding Month and Day", ""))
+
+    medical_notes = row.get("Allergy", "").lower()
+    if medical_notes == "no":
+        medical_notes = ""
+
+    grade = map_grade(row.get("School Grade", ""))
+
+    mobile_phone = format_phone(row.get("Cell Phone", ""))
+    home_phone = format_phone(row.get("Home Phone", ""))
+    work_phone = format_phone(row.get("Work Phone", ""))
+
+    baptized = yes_no_to_true_false(row.get("Baptized", ""))
+
+    status, membership = get_status_and_membership(row.get("Member Status", ""))
+
+    authorized_pickup = "|".join(filter(None, [row.get(f"Authorized Pick up {i}", "") for i in range(1, 9)]))
 
-            family_id = 1
-            previous_last_name = None
-            remote_id_counter = 1
+    relationship = row.get("Relationship", "").lower()
+    household_primary_contact = "TRUE" if "head of household" in relationship or row.get("Primary Contact", "").lower() == "yes" else ""
 
-            for row in reader:
-                last_name = row.get("Last Name", "").strip()
+    emergency_contact = row.get("Emergency Contact", "")
+    if not emergency_contact:
+        primary_contact = row.get("Primary Contact", "")
+        first_name = row.get("First Name", "").lower()
+        if primary_contact:
+            primary_first_name = primary_contact.split()[0].lower() if primary_contact.split() else ""
+            if primary_first_name != first_name:
+                emergency_contact = primary_contact
+            else:
+                emergency_contact = row.get("Secondary Contact", "")
+        else:
+            emergency_contact = row.get("Secondary Contact", "")
+
+    output_row = {
+        "remote_id": remote_id,
+        "First Name": row.get("First Name", ""),
+        "Middle Name": row.get("Middle Name", ""),
+        "Last Name": last_name,
+        "Birthdate": birthdate,
+        "Anniversary": anniversary,
+        "Gender": row.get("Gender", ""),
+        "Grade": str(grade) if grade != "" else "",
+        "Medical Notes": medical_notes,
+        "Marital Status": row.get("Marital Status", ""),
+        "Status": status,
+        "Membership": membership,
+        "Home Address Street Line 1": row.get("Address", ""),
+        "Home Address City": row.get("City", ""),
+        "Home Address State": row.get("State", ""),
+        "Home Address Zip Code": row.get("Zip Code", ""),
+        "Mobile Phone Number": mobile_phone,
+        "Home Phone Number": home_phone,
+        "Work Phone Number": work_phone,
+        "Home Email": row.get("E-Mail", ""),
+        "Household ID": household_id,
+        "Household Name": household_name if household_name is not None else (f"{last_name} Household" if last_name else ""),
+        "Household Primary Contact": household_primary_contact,
+        "Baptized": baptized,
+        "Baptism Date": row.get("Baptized Date", ""),
+        "Member By": row.get("How Joined", ""),
+        "Membership Date": row.get("Date Joined", ""),
+        "Sunday School": row.get("Sunday School", ""),
+        "Small Group": row.get("Activities", ""),
+        "Emergency Contact": emergency_contact,
+        "Emergency Phone": format_phone(row.get("Emergency Phone", "")),
+        "Allergies": row.get("Allergy", ""),
+        "Authorized Pickup": authorized_pickup
+    }
+    return [output_row[header] for header in OUTPUT_HEADERS]
+
+def transform_chunk(chunk):
+    # Runs in worker processes: rows arrive as plain lists to keep pickling cheap
+    input_headers, rows, first_remote_id, household_ids, household_names, current_year = chunk
+    return [
+        transform_row(dict(zip(input_headers, row)), str(first_remote_id + offset), household_ids[offset], current_year,
+                      household_names[offset] if household_names else None)
+        for offset, row in enumerate(rows)
+    ]
+
+def cluster_households(input_file):
+    # First pass for --households cluster: only the normalized keys are kept per row
+    householder = Householder()
+    with open(input_file, 'r', encoding='utf-8') as infile:
+        reader = csv.reader(infile)
+        input_headers = next(reader, [])
+        for row in reader:
+            if not row:
+                continue
+            get = dict(zip(input_headers, row)).get
+            householder.add(row_keys(get), get("Last Name", "").strip())
+    return householder.assign()
+
+def iter_chunks(reader, input_headers, chunk_size, current_year, households=None):
+    # Household and remote IDs depend on the rows before them, so they are assigned here,
+    # sequentially, before any chunk is handed to a worker
+    last_name_index = input_headers.index("Last Name") if "Last Name" in input_headers else None
+    family_id = 1
+    previous_last_name = None
+    remote_id_counter = 1
+    row_index = 0
+    # csv.DictReader skips blank lines; do the same so remote_ids match
+    rows = (row for row in reader if row)
+    while True:
+        rows_chunk = list(islice(rows, chunk_size))
+        if not rows_chunk:
+            return
+        household_names = None
+        if households:
+            end = row_index + len(rows_chunk)
+            household_ids = households[0][row_index:end]
+            household_names = households[1][row_index:end]
+            row_index = end
+        else:
+            # Legacy grouping: a new household whenever the last name changes from the row before
+            household_ids = []
+            for row in rows_chunk:
+                last_name = row[last_name_index].strip() if last_name_index is not None and last_name_index < len(row) else ""
                 if last_name and last_name != previous_last_name:
                     family_id += 1
                     previous_last_name = last_name
-                household_id = str(family_id) if last_name else "1"
-
-                remote_id = str(remote_id_counter)
-                remote_id_counter += 1
-
-                birthdate = format_birthdate(row.get("Birth Month and Day", ""), row.get("Age", ""), current_year)
-                anniversary = format_anniversary(row.get("Wedding Month and Day", ""))
-
-                medical_notes = row.get("Allergy", "").lower()
-                if medical_notes == "no":
-                    medical_notes = ""
-
-                grade = map_grade(row.get("School Grade", ""))
-
-                mobile_phone = format_phone(row.get("Cell Phone", ""))
-                home_phone = format_phone(row.get("Home Phone", ""))
-                work_phone = format_phone(row.get("Work Phone", ""))
-
-                baptized = yes_no_to_true_false(row.get("Baptized", ""))
-
-                status, membership = get_status_and_membership(row.get("Member Status", ""))
-
-                authorized_pickup = "|".join(filter(None, [row.get(f"Authorized Pick up {i}", "") for i in range(1, 9)]))
-
-                relationship = row.get("Relationship", "").lower()
-                household_primary_contact = "TRUE" if "head of household" in relationship or row.get("Primary Contact", "").lower() == "yes" else ""
-
-                emergency_contact = row.get("Emergency Contact", "")
-                if not emergency_contact:
-                    primary_contact = row.get("Primary Contact", "")
-                    first_name = row.get("First Name", "").lower()
-                    if primary_contact:
-                        primary_first_name = primary_contact.split()[0].lower() if primary_contact.split() else ""
-                        if primary_first_name != first_name:
-                            emergency_contact = primary_contact
-                        else:
-                            emergency_contact = row.get("Secondary Contact", "")
-                    else:
-                        emergency_contact = row.get("Secondary Contact", "")
-
-                output_row = {
-                    "remote_id": remote_id,
-                    "First Name": row.get("First Name", ""),
-                    "Middle Name": row.get("Middle Name", ""),
-                    "Last Name": last_name,
-                    "Birthdate": birthdate,
-                    "Anniversary": anniversary,
-                    "Gender": row.get("Gender", ""),
-                    "Grade": str(grade) if grade != "" else "",
-                    "Medical Notes": medical_notes,
-                    "Marital Status": row.get("Marital Status", ""),
-                    "Status": status,
-                    "Membership": membership,
-                    "Home Address Street Line 1": row.get("Address", ""),
-                    "Home Address City": row.get("City", ""),
-                    "Home Address State": row.get("State", ""),
-                    "Home Address Zip Code": row.get("Zip Code", ""),
-                    "Mobile Phone Number": mobile_phone,
-                    "Home Phone Number": home_phone,
-                    "Work Phone Number": work_phone,
-                    "Home Email": row.get("E-Mail", ""),
-                    "Household ID": household_id,
-                    "Household Name": f"{last_name} Household" if last_name else "",
-                    "Household Primary Contact": household_primary_contact,
-                    "Baptized": baptized,
-                    "Baptism Date": row.get("Baptized Date", ""),
-                    "Member By": row.get("How Joined", ""),
-                    "Membership Date": row.get("Date Joined", ""),
-                    "Sunday School": row.get("Sunday School", ""),
-                    "Small Group": row.get("Activities", ""),
-                    "Emergency Contact": emergency_contact,
-                    "Emergency Phone": format_phone(row.get("Emergency Phone", "")),
-                    "Allergies": row.get("Allergy", ""),
-                    "Authorized Pickup": authorized_pickup
-                }
-                writer.writerow(output_row)
+                household_ids.append(str(family_id) if last_name else "1")
+        yield (input_headers, rows_chunk, remote_id_counter, household_ids, household_names, current_year)
+        remote_id_counter += len(rows_chunk)
+
+def iter_transformed_chunks(chunks, workers):
+    if workers <= 1:
+        for chunk in chunks:
+            yield transform_chunk(chunk)
+        return
+    # Imported here: loading the process pool machinery costs more than a small single-worker run
+    from concurrent.futures import ProcessPoolExecutor
+    # Bounded window of chunks in flight keeps memory flat; results are yielded in input order
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(transform_chunk, chunk) for chunk in islice(chunks, workers * 2))
+        while pending:
+            rows = pending.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(executor.submit(transform_chunk, chunk))
+            yield rows
+
+def create_import_csv(input_file, output_file, current_year=2025, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                      households="last-name"):
+    try:
+        start = time.monotonic()
+        total = 0
+        with span("create-csv.households"):
+            household_assignments = cluster_households(input_file) if households == "cluster" else None
+        with open(input_file, 'r', encoding='utf-8') as infile, open(output_file, 'w', encoding='utf-8', newline='') as outfile:
+            reader = csv.reader(infile)
+            input_headers = next(reader, [])
+            writer = csv.writer(outfile)
+            writer.writerow(OUTPUT_HEADERS)
+
+            chunks = iter_chunks(reader, input_headers, chunk_size, current_year, household_assignments)
+            with span("create-csv.transform"):
+                for rows in iter_transformed_chunks(chunks, workers):
+                    writer.writerows(rows)
+                    total += len(rows)
+        elapsed = time.monotonic() - start
+        rate = total / elapsed if elapsed else 0.0
         click.echo(f"CSV transformation complete. Output saved to {output_file}")
+        click.echo(f"Transformed {total} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
     except Exception as e:
         click.echo(f"Error in create_import_csv: {e}", err=True)
@@ -1,6 +1,27 @@
 import click
 from pco_workflows.api import PublishingClient
 
+# Optional episode attributes, in the order the CLI lists them
+EPISODE_ATTRIBUTES = ("art", "series_id", "description", "sermon_audio", "stream_type", "video_url",
+                      "published_to_library_at", "library_audio_url", "library_video_url")
+
+def episode_attributes(title, channel_id, art=None, series_id=None, description=None, sermon_audio=None,
+                       stream_type=None, video_url=None, published_to_library_at=None, library_audio_url=None,
+                       library_video_url=None):
+    options = {"art": art, "series_id": series_id, "description": description, "sermon_audio": sermon_audio,
+               "stream_type": stream_type, "video_url": video_url, "published_to_library_at": published_to_library_at,
+               "library_audio_url": library_audio_url, "library_video_url": library_video_url}
+    attributes = {
+        "channel_id": channel_id,
+        "title": title
+    }
+    for name in EPISODE_ATTRIBUTES:
+        value = options[name]
+        if value is None or value == "":
+            continue
+        attributes[name] = int(value) if name == "series_id" else value
+    return attributes
+
 def create_publishing_episode(title, channel_id=None, channel_name=None, art=None, series_id=None, description=None, sermon_audio=None, stream_type=None, video_url=None, published_to_library_at=None, library_audio_url=None, library_video_url=None):
     client = PublishingClient()
     try:
@@ -8,29 +29,13 @@ def create_publishing_episode(title, channel_id=None, channel_name=None, art=Non
             channel_id = client.get_channel_id_by_name(channel_name)
         elif channel_id is None:
             channel_id = client.get_first_channel_id()
-        attributes = {
-            "channel_id": channel_id,
-            "title": title
-        }
-        if art:
-            attributes["art"] = art
-        if series_id is not None:
-            attributes["series_id"] = int(series_id)
-        if description:
-            attributes["description"] = description
-        if sermon_audio:
-            attributes["sermon_audio"] = sermon_audio
-        if stream_type:
-            attributes["stream_type"] = stream_type
-        if video_url:
-            attributes["video_url"] = video_url
-        if published_to_library_at:
-            attributes["published_to_library_at"] = published_to_library_at
-        if library_audio_url:
-            attributes["library_audio_url"] = library_audio_url
-        if library_video_url:
-            attributes["library_video_url"] = library_video_url
+        attributes = episode_attributes(
+            title, channel_id, art=art, series_id=series_id, description=description, sermon_audio=sermon_audio,
+            stream_type=stream_type, video_url=video_url, published_to_library_at=published_to_library_at,
+            library_audio_url=library_audio_url, library_video_url=library_video_url)
         response = client.create_episode(attributes=attributes)
         click.echo(f"Created episode: {response}")
     except Exception as e:
         click.echo(f"Error in create_publishing_episode: {e}", err=True)
+    finally:
+        client.close()
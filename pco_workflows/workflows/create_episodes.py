@@ -0,0 +1,140 @@
+# Creates many episodes (and their episode resources) from a CSV or NDJSON manifest in one
+# process: channels are resolved once through a name -> ID map, rows run concurrently under the
+# client's shared rate limiter, and every created ID is journaled so a rerun with --resume only
+# does what is left. A result file maps each manifest row to what was created for it.
+import csv
+import json
+import os
+import click
+from pco_workflows.api import PublishingClient
+from pco_workflows.api.bulk import BulkRunner, DEFAULT_CONCURRENCY, Journal
+from pco_workflows.api.client import DEFAULT_POOL_SIZE
+from pco_workflows.export import write_rows
+from pco_workflows.metrics import span
+from pco_workflows.workflows.create_episode import EPISODE_ATTRIBUTES, episode_attributes
+
+RESULT_COLUMNS = ["row", "title", "channel_id", "episode_id", "resource_ids", "error"]
+MANIFEST_COLUMNS = ("title", "channel_name", "channel_id", *EPISODE_ATTRIBUTES, "resources")
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+def _format_for(path):
+    return "ndjson" if path.lower().endswith(NDJSON_EXTENSIONS) else "csv"
+
+def read_manifest(path):
+    """Rows as dicts. ``resources`` is a list of episode resource attribute dicts; in CSV it is a JSON array."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if _format_for(path) == "ndjson":
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    for number, row in enumerate(rows, start=1):
+        # A misspelled column would otherwise be dropped silently, leaving that attribute unset
+        unknown = [name for name in row if name is not None and name not in MANIFEST_COLUMNS]
+        if unknown:
+            raise click.UsageError(f"{path} row {number}: unknown column(s) {', '.join(unknown)}; "
+                                   f"expected any of {', '.join(MANIFEST_COLUMNS)}.")
+        if not row.get("title"):
+            raise click.UsageError(f"{path} row {number}: every episode needs a title.")
+        resources = row.get("resources") or []
+        if isinstance(resources, str):
+            try:
+                resources = json.loads(resources)
+            except ValueError as e:
+                raise click.UsageError(f"{path} row {number}: resources must be a JSON array ({e}).")
+        row["resources"] = resources
+    return rows
+
+class EpisodeCreator:
+    """Creates one manifest row's episode and resources, journaling each ID as soon as it exists."""
+
+    def __init__(self, client, journal):
+        self.client = client
+        self.journal = journal
+
+    def is_done(self, item):
+        number, row, _ = item
+        keys = [f"episode:{number}"] + [f"resource:{number}:{i}" for i in range(len(row["resources"]))]
+        return all(key in self.journal.completed for key in keys)
+
+    def create(self, item):
+        number, row, channel_id = item
+        episode_key = f"episode:{number}"
+        episode_id = self.journal.values.get(episode_key)
+        if episode_id is None:
+            options = {name: value for name, value in row.items() if name in EPISODE_ATTRIBUTES}
+            episode = self.client.create_episode(attributes=episode_attributes(row["title"], channel_id, **options))
+            episode_id = episode["id"]
+            self.journal.record(episode_key, episode_id)
+        resource_ids = []
+        for index, attributes in enumerate(row["resources"]):
+            resource_key = f"resource:{number}:{index}"
+            resource_id = self.journal.values.get(resource_key)
+            if resource_id is None:
+                resource_id = self.client.create_episode_resource(episode_id, attributes)["id"]
+                self.journal.record(resource_key, resource_id)
+            resource_ids.append(resource_id)
+        return episode_id, resource_ids
+
+def create_episodes_from_manifest(manifest, results_path=None, concurrency=DEFAULT_CONCURRENCY, resume=False,
+                                  journal_path=None):
+    rows = read_manifest(manifest)
+    stem = os.path.splitext(manifest)[0]
+    results_path = results_path or f"{stem}.results.{_format_for(manifest)}"
+    # Journal keys are row numbers, so each manifest gets its own journal; a --resume against
+    # another manifest's journal would skip rows it never created
+    journal_path = journal_path or f"{stem}.journal"
+    client = PublishingClient(pool_size=max(concurrency, DEFAULT_POOL_SIZE))
+    try:
+        # Every row's channel is known before the first POST, so a bad name stops nothing half-way
+        results = {}
+        items = []
+        for number, row in enumerate(rows, start=1):
+            results[number] = {"row": number, "title": row["title"], "channel_id": None, "episode_id": None,
+                               "resource_ids": "", "error": None}
+            try:
+                channel_id = client.resolve_channel_id(row.get("channel_id"), row.get("channel_name"))
+            except ValueError as e:
+                results[number]["error"] = str(e)
+                continue
+            results[number]["channel_id"] = channel_id
+            items.append((number, row, channel_id))
+
+        with Journal(journal_path, resume=resume) as journal:
+            def on_progress(i, total, key, error, value=None):
+                if error is None:
+                    click.echo(f"[{i}/{total}] Row {key}: created episode {value[0]} with {len(value[1])} resources")
+                else:
+                    click.echo(f"[{i}/{total}] Row {key} failed: {error}", err=True)
+
+            # The creator journals each episode and resource itself, so a row that failed half-way
+            # resumes from its last created resource rather than creating the episode again
+            creator = EpisodeCreator(client, journal)
+            runner = BulkRunner(client, creator.create, concurrency=concurrency, on_progress=on_progress,
+                                key=lambda item: item[0], verb="Created episodes for")
+            pending = [item for item in items if not creator.is_done(item)]
+            if len(pending) < len(items):
+                click.echo(f"Resuming from {journal_path}: {len(items) - len(pending)} rows already created.")
+            with span("create-episodes.create"):
+                result = runner.run(pending, skipped=len(items) - len(pending))
+            click.echo(result.summary())
+
+            for number, error in result.errors.items():
+                results[number]["error"] = str(error)
+            for number, _, _ in items:
+                entry = results[number]
+                entry["episode_id"] = journal.values.get(f"episode:{number}")
+                entry["resource_ids"] = "|".join(
+                    journal.values[f"resource:{number}:{i}"] for i in range(len(rows[number - 1]["resources"]))
+                    if f"resource:{number}:{i}" in journal.values)
+
+        write_rows(([entry[c] for c in RESULT_COLUMNS] for entry in results.values()), results_path, RESULT_COLUMNS,
+                   fmt=_format_for(results_path))
+        failed = sum(1 for entry in results.values() if entry["error"])
+        click.echo(f"Wrote {len(results)} results to {results_path}")
+        if failed:
+            click.echo(f"{failed} rows failed; fix them and rerun with --resume to create only what is missing.",
+                       err=True)
+    except Exception as e:
+        click.echo(f"Error in create_episodes_from_manifest: {e}", err=True)
+    finally:
+        client.close()
@@ -1,28 +1,53 @@
 import click
-import time
 from pco_workflows.api import PeopleClient
+from pco_workflows.api.bulk import BulkDeleter, DEFAULT_CONCURRENCY, Journal
+from pco_workflows.api.client import DEFAULT_POOL_SIZE
+from pco_workflows.metrics import span
 
-def delete_all_people(skip_ids):
-    client = PeopleClient()
+DEFAULT_JOURNAL = "delete-all.journal"
+
+def echo_delete_progress(label):
+    def on_progress(i, total, item_id, error, value=None):
+        if error is None:
+            click.echo(f"[{i}/{total}] Deleted {label} ID {item_id}")
+        else:
+            click.echo(f"[{i}/{total}] Failed to delete {label} ID {item_id}: {error}", err=True)
+    return on_progress
+
+def delete_all_people(skip_ids, concurrency=DEFAULT_CONCURRENCY, resume=False, journal_path=None):
+    journal_path = journal_path or DEFAULT_JOURNAL
+    client = PeopleClient(pool_size=max(concurrency, DEFAULT_POOL_SIZE))
     try:
-        people_ids = client.get_all_people_ids()
         skip_set = set(skip_ids)
-        to_delete = [pid for pid in people_ids if pid not in skip_set]
-        total = len(to_delete)
-        
-        if total == 0:
-            click.echo("No people to delete.")
-            return
-        
-        click.echo(f"Found {total} people to delete (skipping {len(skip_set)}).")
-        
-        if not click.confirm("Are you sure you want to delete these people? This operation is irreversible and dangerous!"):
-            click.echo("Aborted.")
-            return
-        
-        for i, pid in enumerate(to_delete, 1):
-            client.delete(f"people/{pid}")
-            click.echo(f"[{i}/{total}] Deleted person ID {pid}")
-            time.sleep(0.2)
+        # Only IDs are kept in memory; deleting has to wait until paging is done or offsets would shift
+        with span("delete-all.list"):
+            candidates = [pid for pid in client.iter_all_people_ids() if pid not in skip_set]
+
+        with Journal(journal_path, resume=resume) as journal:
+            deleter = BulkDeleter(client, "people/{id}", concurrency=concurrency, journal=journal,
+                                  on_progress=echo_delete_progress("person"))
+            to_delete = deleter.pending(candidates)
+            already_done = len(candidates) - len(to_delete)
+            total = len(to_delete)
+
+            if total == 0:
+                click.echo("No people to delete.")
+                return
+
+            click.echo(f"Found {total} people to delete (skipping {len(skip_set)}).")
+            if already_done:
+                click.echo(f"Resuming from {journal_path}: {already_done} already deleted.")
+
+            if not click.confirm("Are you sure you want to delete these people? This operation is irreversible and dangerous!"):
+                click.echo("Aborted.")
+                return
+
+            with span("delete-all.delete"):
+                result = deleter.run(to_delete, skipped=already_done)
+            click.echo(result.summary())
+            if result.failed:
+                click.echo(f"{result.failed} deletes failed; rerun with --resume to retry them.", err=True)
     except Exception as e:
         click.echo(f"Error in delete_all_people: {e}", err=True)
+    finally:
+        client.close()
@@ -1,26 +1,44 @@
 import click
 from pco_workflows.api import PeopleClient
+from pco_workflows.api.bulk import BulkDeleter, DEFAULT_CONCURRENCY, Journal
+from pco_workflows.api.client import DEFAULT_POOL_SIZE
+from pco_workflows.metrics import span
+from pco_workflows.workflows.delete_all import echo_delete_progress
 
-def delete_field_data(field_name):
-    client = PeopleClient()
+def delete_field_data(field_name, concurrency=DEFAULT_CONCURRENCY, resume=False, journal_path=None):
+    client = PeopleClient(pool_size=max(concurrency, DEFAULT_POOL_SIZE))
     try:
-        field_id = client.get_field_definition_id(field_name)
-        params = {"where[field_definition_id]": field_id}
-        field_data = client.get_field_data(params=params)
-        total = len(field_data)
-        
-        if total == 0:
-            click.echo(f"No data to delete for field '{field_name}'.")
-            return
-        
-        click.echo(f"Found {total} field data entries to delete for '{field_name}'.")
-        
-        if not click.confirm(f"Are you sure you want to delete all data for field '{field_name}'? This operation is irreversible and dangerous!"):
-            click.echo("Aborted.")
-            return
-        
-        for i, entry in enumerate(field_data, 1):
-            client.delete(f"field_data/{entry['id']}")
-            click.echo(f"[{i}/{total}] Deleted field data ID {entry['id']}")
+        with span("delete-field.list"):
+            field_id = client.get_field_definition_id(field_name)
+            # Only IDs are kept in memory; deleting has to wait until paging is done or offsets would shift
+            candidates = [entry["id"] for entry in client.iter_field_data_by_definition(field_id, fields={"FieldDatum": []})]
+        journal_path = journal_path or f"delete-field-{field_id}.journal"
+
+        with Journal(journal_path, resume=resume) as journal:
+            deleter = BulkDeleter(client, "field_data/{id}", concurrency=concurrency, journal=journal,
+                                  on_progress=echo_delete_progress("field data"))
+            field_data_ids = deleter.pending(candidates)
+            already_done = len(candidates) - len(field_data_ids)
+            total = len(field_data_ids)
+
+            if total == 0:
+                click.echo(f"No data to delete for field '{field_name}'.")
+                return
+
+            click.echo(f"Found {total} field data entries to delete for '{field_name}'.")
+            if already_done:
+                click.echo(f"Resuming from {journal_path}: {already_done} already deleted.")
+
+            if not click.confirm(f"Are you sure you want to delete all data for field '{field_name}'? This operation is irreversible and dangerous!"):
+                click.echo("Aborted.")
+                return
+
+            with span("delete-field.delete"):
+                result = deleter.run(field_data_ids, skipped=already_done)
+            click.echo(result.summary())
+            if result.failed:
+                click.echo(f"{result.failed} deletes failed; rerun with --resume to retry them.", err=True)
     except Exception as e:
         click.echo(f"Error in delete_field_data: {e}", err=True)
+    finally:
+        client.close()
@@ -1,31 +1,64 @@
+import time
 import click
 from pco_workflows.api import PeopleClient
-from pco_workflows.api.people import get_built_in_field_by_name
+from pco_workflows.api.client import DEFAULT_POOL_SIZE
+from pco_workflows.export import DEFAULT_BATCH_SIZE, FieldPivot, write_rows
+from pco_workflows.metrics import span
+from pco_workflows.mirror import DEFAULT_MIRROR_PATH, PeopleMirror
 
-def get_field_definition_data(field_name):
-    client = PeopleClient()
+def get_field_definition_data(field_name, workers=1, from_cache=False, cache_db=DEFAULT_MIRROR_PATH):
+    client = PeopleMirror(cache_db) if from_cache else PeopleClient(pool_size=max(workers, DEFAULT_POOL_SIZE))
     try:
-        built_in_field = get_built_in_field_by_name(field_name)
-        if built_in_field:
-            slug = built_in_field['attributes']['slug']
-            click.echo(f"Built-in field '{field_name}' (slug: {slug})")
-            people = client.get_people()
-            click.echo(f"Data for built-in field '{field_name}':")
-            for person in people:
-                value = person['attributes'].get(slug, None)
-                person_id = person['id']
-                click.echo(f"Person ID: {person_id}, Value: {value}")
-        else:
-            field_id = client.get_field_definition_id(field_name)
-            click.echo(f"Custom field definition ID for '{field_name}': {field_id}")
-            field_data = client.get_field_data_by_definition(field_id)
-            click.echo(f"Data for custom field '{field_name}':")
-            for entry in field_data:
-                value = entry['attributes']['value']
-                person_id = entry['relationships']['customizable']['data']['id']
-                data_id = entry['id']
-                click.echo(f"Person ID: {person_id}, Value: {value}, Field Data ID: {data_id}")
+        with span("get-field-data.fetch"):
+            registry = client.field_registry()
+            definition = registry.resolve(field_name)
+            if registry.is_built_in(definition):
+                slug = definition['attributes']['slug']
+                click.echo(f"Built-in field '{field_name}' (slug: {slug})")
+                click.echo(f"Data for built-in field '{field_name}':")
+                for person in client.iter_people(fields={"Person": [slug]}, max_workers=workers):
+                    value = person['attributes'].get(slug, None)
+                    person_id = person['id']
+                    click.echo(f"Person ID: {person_id}, Value: {value}")
+            else:
+                field_id = definition['id']
+                click.echo(f"Custom field definition ID for '{field_name}': {field_id}")
+                click.echo(f"Data for custom field '{field_name}':")
+                entries = client.iter_field_data_by_definition(
+                    field_id, fields={"FieldDatum": ["value", "customizable"]}, max_workers=workers)
+                for entry in entries:
+                    value = entry['attributes']['value']
+                    person_id = entry['relationships']['customizable']['data']['id']
+                    data_id = entry['id']
+                    click.echo(f"Person ID: {person_id}, Value: {value}, Field Data ID: {data_id}")
     except ValueError as ve:
         click.echo(f"Field '{field_name}' not found as built-in or custom: {ve}", err=True)
     except Exception as e:
         click.echo(f"Error in get_field_definition_data: {e}", err=True)
+    finally:
+        client.close()
+
+def export_field_data(field_names, output=None, fmt="csv", workers=1, from_cache=False, cache_db=DEFAULT_MIRROR_PATH,
+                      batch_size=DEFAULT_BATCH_SIZE):
+    client = PeopleMirror(cache_db) if from_cache else PeopleClient(pool_size=max(workers, DEFAULT_POOL_SIZE))
+    try:
+        pivot = FieldPivot(client.field_registry(), field_names)
+        start = time.monotonic()
+        # One pass over people with their field data sideloaded, however many fields are asked for
+        include = ["field_data"] if pivot.needs_field_data else None
+        people = client.iter_people(params={"per_page": 100}, include=include, fields=pivot.fields,
+                                    max_workers=workers)
+        with span("get-field-data.export"):
+            count = write_rows((pivot.row(person) for person in people), output, pivot.columns, fmt=fmt,
+                               batch_size=batch_size)
+        # The data may be going to stdout, so the summary goes to stderr
+        click.echo(f"Exported {count} people x {len(field_names)} fields as {fmt} "
+                   f"in {time.monotonic() - start:.2f}s", err=True)
+    except click.UsageError:
+        raise
+    except ValueError as ve:
+        click.echo(f"Field not found as built-in or custom: {ve}", err=True)
+    except Exception as e:
+        click.echo(f"Error in export_field_data: {e}", err=True)
+    finally:
+        client.close()
@@ -0,0 +1,229 @@
+import csv
+from collections import Counter, OrderedDict
+from datetime import datetime
+import click
+from pco_workflows.api import PeopleClient
+from pco_workflows.api.bulk import BulkRunner, DEFAULT_CONCURRENCY, Journal
+from pco_workflows.api.client import DEFAULT_POOL_SIZE, attach_included
+from pco_workflows.metrics import span
+
+DEFAULT_JOURNAL = "import-csv.journal"
+
+def _date(value):
+    # create-csv writes MM/DD/YYYY; the API wants ISO dates
+    return datetime.strptime(value, "%m/%d/%Y").strftime("%Y-%m-%d")
+
+PERSON_ATTRIBUTES = {
+    "First Name": ("first_name", str),
+    "Middle Name": ("middle_name", str),
+    "Last Name": ("last_name", str),
+    "Birthdate": ("birthdate", _date),
+    "Anniversary": ("anniversary", _date),
+    "Gender": ("gender", str),
+    "Grade": ("grade", int),
+    "Medical Notes": ("medical_notes", str),
+    "Status": ("status", str.lower),
+    "Membership": ("membership", str),
+}
+EMAIL_COLUMNS = {"Home Email": "Home"}
+PHONE_COLUMNS = {"Mobile Phone Number": "Mobile", "Home Phone Number": "Home", "Work Phone Number": "Work"}
+ADDRESS_COLUMNS = {
+    "Home Address Street Line 1": "street_line_1",
+    "Home Address City": "city",
+    "Home Address State": "state",
+    "Home Address Zip Code": "zip",
+}
+HOUSEHOLD_COLUMNS = {"Household ID", "Household Name", "Household Primary Contact"}
+# Everything else in OUTPUT_HEADERS (e.g. "Baptized", "Allergies") is written as custom field data
+RESERVED_COLUMNS = ({"remote_id"} | set(PERSON_ATTRIBUTES) | set(EMAIL_COLUMNS) | set(PHONE_COLUMNS)
+                    | set(ADDRESS_COLUMNS) | HOUSEHOLD_COLUMNS)
+PERSON_INCLUDES = ["emails", "phone_numbers", "addresses", "field_data", "households"]
+
+def _digits(value):
+    return "".join(c for c in value if c.isdigit())
+
+def person_attributes(row):
+    attributes = {"remote_id": int(row["remote_id"])}
+    for column, (attribute, convert) in PERSON_ATTRIBUTES.items():
+        value = (row.get(column) or "").strip()
+        if value:
+            attributes[attribute] = convert(value)
+    return attributes
+
+class PersonImporter:
+    """Upserts one create-csv row into PCO, keyed on remote_id so reruns update rather than duplicate."""
+
+    def __init__(self, client, custom_fields):
+        self.client = client
+        self.custom_fields = custom_fields
+        self.households_by_person = {}
+
+    def _find(self, remote_id):
+        # Only the sideloaded records are compared, so the person itself comes back as links alone
+        params = {"where[remote_id]": remote_id, "per_page": 1, "include": ",".join(PERSON_INCLUDES),
+                  "fields[Person]": ",".join(PERSON_INCLUDES)}
+        people = attach_included(self.client.get("people", params=params))
+        return people[0] if people else None
+
+    def households_of(self, person_id):
+        # People skipped on --resume were never upserted in this run, so theirs are fetched here
+        households = self.households_by_person.get(person_id)
+        if households is None:
+            params = {"include": "households", "fields[Person]": "households"}
+            person = attach_included(self.client.get(f"people/{person_id}", params=params))
+            households = {h["id"] for h in person.get("included", {}).get("households", [])}
+            self.households_by_person[person_id] = households
+        return households
+
+    def upsert(self, row):
+        client = self.client
+        existing = self._find(row["remote_id"])
+        payload = {"data": {"attributes": person_attributes(row)}}
+        if existing:
+            person_id = existing["id"]
+            client.patch(f"people/{person_id}", payload)
+            included = existing.get("included", {})
+        else:
+            person_id = client.post("people", payload)["data"]["id"]
+            included = {}
+        self.households_by_person[person_id] = {h["id"] for h in included.get("households", [])}
+
+        known_emails = {e["attributes"]["address"].lower() for e in included.get("emails", [])}
+        for column, location in EMAIL_COLUMNS.items():
+            address = (row.get(column) or "").strip()
+            if address and address.lower() not in known_emails:
+                client.post(f"people/{person_id}/emails", {"data": {"attributes": {
+                    "address": address, "location": location, "primary": not known_emails}}})
+                known_emails.add(address.lower())
+
+        known_phones = {_digits(p["attributes"]["number"]) for p in included.get("phone_numbers", [])}
+        for column, location in PHONE_COLUMNS.items():
+            number = (row.get(column) or "").strip()
+            if number and _digits(number) not in known_phones:
+                client.post(f"people/{person_id}/phone_numbers", {"data": {"attributes": {
+                    "number": number, "location": location}}})
+                known_phones.add(_digits(number))
+
+        address = {attribute: (row.get(column) or "").strip() for column, attribute in ADDRESS_COLUMNS.items()}
+        known_streets = {(a["attributes"].get("street_line_1") or "").lower() for a in included.get("addresses", [])}
+        if address["street_line_1"] and address["street_line_1"].lower() not in known_streets:
+            client.post(f"people/{person_id}/addresses", {"data": {"attributes": {**address, "location": "Home"}}})
+
+        field_data = {f["relationships"]["field_definition"]["data"]["id"]: f for f in included.get("field_data", [])}
+        for column, field_definition_id in self.custom_fields.items():
+            value = (row.get(column) or "").strip()
+            if not value:
+                continue
+            current = field_data.get(field_definition_id)
+            payload = {"data": {"attributes": {"field_definition_id": field_definition_id, "value": value}}}
+            if current is None:
+                client.post(f"people/{person_id}/field_data", payload)
+            elif current["attributes"].get("value") != value:
+                client.patch(f"field_data/{current['id']}", payload)
+        return person_id
+
+def group_households(rows, person_ids):
+    households = OrderedDict()
+    for row in rows:
+        person_id = person_ids.get(row["remote_id"])
+        household_id = row.get("Household ID")
+        # Rows without a household name were never grouped by create-csv (e.g. no last name)
+        if not person_id or not household_id or not row.get("Household Name"):
+            continue
+        household = households.setdefault(household_id, {"name": row.get("Household Name") or "", "people": [], "primary": None})
+        household["people"].append(person_id)
+        if row.get("Household Primary Contact") == "TRUE" and household["primary"] is None:
+            household["primary"] = person_id
+    return households
+
+def create_household(client, importer, household, household_id=None, linked=()):
+    """PCO ID of the household holding ``household["people"]``, created or completed as needed.
+
+    ``household_id`` and ``linked`` come from the journal of an earlier run: the household made
+    for this group and the people already added to it. Anyone else is checked against PCO.
+    """
+    people = household["people"]
+    memberships = {pid: importer.households_of(pid) for pid in people if pid not in linked}
+    if household_id is None:
+        # Reuse the household most of the group is already in, e.g. from an earlier run
+        counts = Counter(h for households in memberships.values() for h in households)
+        if counts:
+            household_id = min(counts, key=lambda h: (-counts[h], h))
+    if household_id is None:
+        payload = {
+            "data": {
+                "attributes": {"name": household["name"], "primary_contact_id": household["primary"] or people[0]},
+                "relationships": {"people": {"data": [{"type": "Person", "id": pid} for pid in people]}},
+            }
+        }
+        return client.post("households", payload)["data"]["id"]
+    for pid, households in memberships.items():
+        if household_id not in households:
+            client.post(f"households/{household_id}/household_memberships", {"data": {
+                "attributes": {"pending": False},
+                "relationships": {"person": {"data": {"type": "Person", "id": pid}}}}})
+            households.add(household_id)
+    return household_id
+
+def import_people_csv(input_file, concurrency=DEFAULT_CONCURRENCY, resume=False, journal_path=None):
+    journal_path = journal_path or DEFAULT_JOURNAL
+    client = PeopleClient(pool_size=max(concurrency, DEFAULT_POOL_SIZE))
+    try:
+        with open(input_file, 'r', encoding='utf-8') as infile:
+            rows = [row for row in csv.DictReader(infile) if row.get("remote_id")]
+
+        # Resolve custom field columns to definition IDs once, up front
+        registry = client.field_registry()
+        columns = [c for c in (rows[0].keys() if rows else []) if c not in RESERVED_COLUMNS]
+        definitions = {c: registry.get(c) for c in columns}
+        custom_fields = {c: d["id"] for c, d in definitions.items() if d is not None and d.get("id") is not None}
+        skipped_columns = [c for c in columns if c not in custom_fields]
+        if skipped_columns:
+            click.echo(f"No field definition found for columns (skipped): {', '.join(skipped_columns)}")
+
+        importer = PersonImporter(client, custom_fields)
+        with Journal(journal_path, resume=resume) as journal:
+            def on_progress(i, total, key, error, value=None):
+                if error is None:
+                    click.echo(f"[{i}/{total}] Upserted remote_id {key.split(':', 1)[1]} as person {value}")
+                else:
+                    click.echo(f"[{i}/{total}] Failed to import {key}: {error}", err=True)
+
+            people_runner = BulkRunner(client, importer.upsert, concurrency=concurrency, journal=journal,
+                                       on_progress=on_progress, key=lambda row: f"person:{row['remote_id']}",
+                                       verb="Imported people")
+            pending = people_runner.pending(rows)
+            with span("import-csv.people"):
+                result = people_runner.run(pending, skipped=len(rows) - len(pending))
+            click.echo(result.summary())
+
+            person_ids = {key.split(":", 1)[1]: value for key, value in journal.values.items() if key.startswith("person:")}
+            households = list(group_households(rows, person_ids).items())
+
+            def complete_household(item):
+                key, household = item
+                linked = {pid for pid in household["people"] if f"member:{pid}" in journal.completed}
+                household_id = create_household(client, importer, household,
+                                                journal.values.get(f"household:{key}"), linked)
+                for pid in household["people"]:
+                    if pid not in linked:
+                        journal.record(f"member:{pid}", household_id)
+                return household_id
+
+            household_runner = BulkRunner(client, complete_household, concurrency=concurrency, journal=journal,
+                                          key=lambda item: f"household:{item[0]}", verb="Created households")
+            # A household is done once all of its people are in it; new rows can add people to one
+            pending = [item for item in households
+                       if any(f"member:{pid}" not in journal.completed for pid in item[1]["people"])]
+            with span("import-csv.households"):
+                household_result = household_runner.run(pending, skipped=len(households) - len(pending))
+            click.echo(household_result.summary())
+            for key, error in household_result.errors.items():
+                click.echo(f"Failed to create {key}: {error}", err=True)
+
+            if result.failed or household_result.failed:
+                click.echo("Some rows failed; rerun with --resume to retry only those.", err=True)
+    except Exception as e:
+        click.echo(f"Error in import_people_csv: {e}", err=True)
+    finally:
+        client.close()
@@ -1,16 +1,17 @@
 import click
 from pco_workflows.api import PeopleClient
-from pco_workflows.api.people import BUILT_IN_FIELDS
+from pco_workflows.mirror import DEFAULT_MIRROR_PATH, PeopleMirror
 
-def list_field_definitions():
-    client = PeopleClient()
+def list_field_definitions(from_cache=False, cache_db=DEFAULT_MIRROR_PATH):
+    client = PeopleMirror(cache_db) if from_cache else PeopleClient()
     try:
-        custom_fields = client.get_field_definitions()
-        
+        registry = client.field_registry()
+        custom_fields = registry.custom
+
         click.echo("Built-in Field Definitions:")
         click.echo("{:<10} {:<30} {:<20} {:<15} {:<10}".format("ID", "Name", "Slug", "Data Type", "Sequence"))
         click.echo("-" * 85)
-        for f in sorted(BUILT_IN_FIELDS, key=lambda x: x['attributes']['name']):
+        for f in sorted(registry.built_in, key=lambda x: x['attributes']['name']):
             attrs = f['attributes']
             click.echo("{:<10} {:<30} {:<20} {:<15} {:<10}".format(
                 f.get('id', 'N/A'),
@@ -37,3 +38,5 @@ def list_field_definitions():
                 ))
     except Exception as e:
         click.echo(f"Error listing field definitions: {e}", err=True)
+    finally:
+        client.close()
@@ -1,55 +1,191 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import click
 from pco_workflows.api import PeopleClient
+from pco_workflows.api.bulk import DEFAULT_CONCURRENCY
+from pco_workflows.api.client import DEFAULT_POOL_SIZE
+from pco_workflows.metrics import span
+
+# Saved lookups older than this are looked up again, so changed contact details get picked up
+DEFAULT_INDEX_MAX_AGE = 24 * 3600
+
+class PersonLookupIndex:
+    """Memoized name -> (email, phone) lookups shared by every worker thread.
+
+    Concurrent requests for the same name wait on the first caller's lookup instead of
+    repeating it. The index can be saved and reloaded so later runs skip names already seen.
+    """
+
+    def __init__(self, client, entries=None):
+        self.client = client
+        self._results = {}
+        self._fetched_at = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        for key, (email, phone, fetched_at) in (entries or {}).items():
+            future = Future()
+            future.set_result((email, phone))
+            self._results[key] = future
+            self._fetched_at[key] = fetched_at
+
+    @staticmethod
+    def _key(name):
+        return " ".join(name.lower().split())
+
+    @classmethod
+    def load(cls, client, path, max_age=DEFAULT_INDEX_MAX_AGE):
+        """Index from ``path``, keeping only entries looked up within ``max_age`` seconds."""
+        entries = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        oldest = time.time() - max_age
+        # Entries without a lookup time predate it and count as stale
+        return cls(client, {key: value for key, value in entries.items() if len(value) == 3 and value[2] >= oldest})
+
+    def save(self, path):
+        with self._lock:
+            entries = {key: [*future.result(), self._fetched_at[key]] for key, future in self._results.items()
+                       if future.done() and future.exception() is None}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+
+    def lookup(self, name):
+        key = self._key(name)
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._results[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                # Names sharing a key share a result, so search by the spelling the key stands for
+                # rather than whichever one happened to arrive first
+                result = self.client.search_person_by_name(" ".join(name.split()))
+                with self._lock:
+                    self._fetched_at[key] = time.time()
+                future.set_result(result)
+            except Exception as e:
+                # Don't cache failures; the next caller gets a fresh attempt
+                with self._lock:
+                    self._results.pop(key, None)
+                future.set_exception(e)
+        return future.result()
+
+def field_data_for_definition(field_data, field_definition_id):
+    return [entry for entry in field_data
+            if entry["relationships"]["field_definition"]["data"]["id"] == str(field_definition_id)]
+
+def build_parsed_value(index, raw_value):
+    values = [v.strip() for v in raw_value.split(",") if v.strip()]
+    processed_values = []
+    for name in values:
+        email, phone = index.lookup(name)
+        processed_values.append(f"{name};{email};{phone}")
+    entry_value = '|'.join(processed_values)
+    if entry_value and not entry_value.endswith('|'):
+        entry_value += '|'
+    return entry_value
+
+def write_parsed_value(client, person_id, parsed_data_id, auth_pickup_parsed_id, entry_value):
+    payload = {
+        "data": {
+            "attributes": {
+                "field_definition_id": auth_pickup_parsed_id,
+                "value": entry_value
+            }
+        }
+    }
+    if parsed_data_id:
+        # Update existing (assume single entry)
+        client.patch(f"field_data/{parsed_data_id}", payload)
+        click.echo(f"Updated existing parsed entry for person {person_id}: {entry_value}")
+        return parsed_data_id
+    # Create new
+    created = client.post(f"people/{person_id}/field_data", payload)
+    click.echo(f"Created parsed entry for person {person_id}: {entry_value}")
+    return (created or {}).get("data", {}).get("id")
+
+def process_person(client, index, person_id, entries, parsed_data_id, auth_pickup_parsed_id):
+    for entry in entries:
+        entry_value = build_parsed_value(index, entry["attributes"]["value"] or "")
+        parsed_data_id = write_parsed_value(client, person_id, parsed_data_id, auth_pickup_parsed_id, entry_value)
 
 def parse_authorized_pickups(person_name):
     client = PeopleClient()
     try:
         auth_pickup_id = client.get_field_definition_id("Authorized Pickups")
         auth_pickup_parsed_id = client.get_field_definition_id("Authorized Pickups Parsed")
-        
-        # Search for the person
-        people = client.get_people({"where[search_name]": person_name, "per_page": 1})
-        if not people:
+
+        # Search for the person, sideloading their field data instead of fetching it separately
+        person = client.find_person(person_name, include=["field_data"], fields={"Person": ["field_data"]})
+        if not person:
             click.echo(f"No person found with name '{person_name}'")
             return
-        person_id = people[0]["id"]
-        
-        # Get field data for the person
-        field_data = client.get_field_data_for_person(person_id, {"where[field_definition_id]": auth_pickup_id})
+        person_id = person["id"]
+        person_field_data = person.get("included", {}).get("field_data", [])
+
+        field_data = field_data_for_definition(person_field_data, auth_pickup_id)
         if not field_data:
             click.echo(f"No 'Authorized Pickups' data found for person '{person_name}' (ID: {person_id})")
             return
-        
-        for entry in field_data:
-            values = [v.strip() for v in entry["attributes"]["value"].split(",") if v.strip()]
-            processed_values = []
-            for name in values:
-                email, phone = client.search_person_by_name(name)
-                processed_values.append(f"{name};{email};{phone}")
-            entry_value = '|'.join(processed_values)
-            if entry_value and not entry_value.endswith('|'):
-                entry_value += '|'
-            
-            # Check for existing parsed field data
-            existing_parsed = client.get_field_data_for_person(person_id, {"where[field_definition_id]": auth_pickup_parsed_id})
-            payload = {
-                "data": {
-                    "attributes": {
-                        "field_definition_id": auth_pickup_parsed_id,
-                        "value": entry_value
-                    }
-                }
-            }
-            if existing_parsed:
-                # Update existing (assume single entry)
-                field_data_id = existing_parsed[0]["id"]
-                url = f"field_data/{field_data_id}"
-                client.patch(url, payload)
-                click.echo(f"Updated existing parsed entry for person {person_id}: {entry_value}")
-            else:
-                # Create new
-                url = f"people/{person_id}/field_data"
-                client.post(url, payload)
-                click.echo(f"Created parsed entry for person {person_id}: {entry_value}")
+
+        # process_person tracks any parsed entry it creates for later entries
+        existing_parsed = field_data_for_definition(person_field_data, auth_pickup_parsed_id)
+        parsed_data_id = existing_parsed[0]["id"] if existing_parsed else None
+        process_person(client, PersonLookupIndex(client), person_id, field_data, parsed_data_id, auth_pickup_parsed_id)
     except Exception as e:
         click.echo(f"Error in clean_authorized_pickups: {e}", err=True)
+    finally:
+        client.close()
+
+def parse_all_authorized_pickups(concurrency=DEFAULT_CONCURRENCY, index_file=None, index_max_age=DEFAULT_INDEX_MAX_AGE):
+    client = PeopleClient(pool_size=max(concurrency, DEFAULT_POOL_SIZE))
+    index = PersonLookupIndex.load(client, index_file, max_age=index_max_age)
+    try:
+        auth_pickup_id = client.get_field_definition_id("Authorized Pickups")
+        auth_pickup_parsed_id = client.get_field_definition_id("Authorized Pickups Parsed")
+
+        # One sweep per field instead of two requests per person
+        entries_by_person = defaultdict(list)
+        parsed_by_person = {}
+        with span("parse-authorized-pickups.fetch"):
+            for entry in client.iter_field_data_by_definition(auth_pickup_id, fields={"FieldDatum": ["value", "customizable"]}):
+                entries_by_person[entry["relationships"]["customizable"]["data"]["id"]].append(entry)
+            for entry in client.iter_field_data_by_definition(auth_pickup_parsed_id, fields={"FieldDatum": ["customizable"]}):
+                parsed_by_person.setdefault(entry["relationships"]["customizable"]["data"]["id"], entry["id"])
+
+        total = len(entries_by_person)
+        if total == 0:
+            click.echo("No 'Authorized Pickups' data found.")
+            return
+        click.echo(f"Processing authorized pickups for {total} people.")
+
+        failed = 0
+        with span("parse-authorized-pickups.process"), ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(process_person, client, index, person_id, entries,
+                                parsed_by_person.get(person_id), auth_pickup_parsed_id): person_id
+                for person_id, entries in entries_by_person.items()
+            }
+            for future in as_completed(futures):
+                if future.exception() is not None:
+                    failed += 1
+                    click.echo(f"Failed to process person {futures[future]}: {future.exception()}", err=True)
+        click.echo(f"Processed {total - failed}/{total} people ({failed} failed); "
+                   f"name lookups: {index.misses} fetched, {index.hits} reused.")
+    except Exception as e:
+        click.echo(f"Error in parse_all_authorized_pickups: {e}", err=True)
+    finally:
+        if index_file:
+            index.save(index_file)
+        client.close()
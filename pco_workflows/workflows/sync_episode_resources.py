@@ -0,0 +1,144 @@
+# Reconciles episode resources with a desired-state file. Current resources for every listed
+# episode are fetched concurrently, each episode is diffed against its desired list by a key
+# attribute (url by default), and only the creates, patches and deletes that diff calls for
+# are sent, concurrently under the shared rate budget. Rerunning after a partial failure just
+# computes a smaller diff, so no journal is needed.
+import csv
+import json
+from collections import defaultdict
+import click
+from pco_workflows.api import PublishingClient
+from pco_workflows.api.bulk import BulkRunner, DEFAULT_CONCURRENCY
+from pco_workflows.api.client import DEFAULT_POOL_SIZE
+from pco_workflows.metrics import span
+from pco_workflows.workflows.create_episodes import NDJSON_EXTENSIONS
+
+DEFAULT_KEY = "url"
+
+def read_desired_state(path):
+    """episode ID -> list of resource attribute dicts.
+
+    NDJSON has one ``{"episode_id": ..., "resources": [...]}`` object per line (an empty list
+    removes every resource). CSV has one resource per row: ``episode_id`` plus attribute columns,
+    with empty cells left out.
+    """
+    desired = defaultdict(list)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(NDJSON_EXTENSIONS):
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if not entry.get("episode_id"):
+                    raise click.UsageError(f"{path} line {number}: episode_id is required.")
+                desired[str(entry["episode_id"])].extend(entry.get("resources") or [])
+        else:
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                episode_id = row.pop("episode_id", None)
+                if not episode_id:
+                    raise click.UsageError(f"{path} row {number}: episode_id is required.")
+                desired[str(episode_id)].append({k: v for k, v in row.items() if v not in (None, "")})
+    return dict(desired)
+
+def _same(current, wanted):
+    # CSV values are text, so "true" matches True and "3" matches 3
+    if current == wanted:
+        return True
+    if isinstance(wanted, str) and not isinstance(current, str):
+        text = "" if current is None else str(current).lower() if isinstance(current, bool) else str(current)
+        return text == wanted
+    return False
+
+def diff_resources(episode_id, current, desired, key=DEFAULT_KEY):
+    """Operations turning ``current`` resource records into ``desired`` attribute dicts.
+
+    Returns ``("create", episode_id, attributes)``, ``("update", resource_id, changed_attributes)``
+    and ``("delete", resource_id, None)`` tuples; resources that already match produce nothing.
+    """
+    existing = defaultdict(list)
+    for resource in current:
+        existing[(resource.get("attributes") or {}).get(key)].append(resource)
+    operations = []
+    for attributes in desired:
+        matches = existing.get(attributes.get(key))
+        if not matches:
+            operations.append(("create", episode_id, attributes))
+            continue
+        resource = matches.pop(0)
+        have = resource.get("attributes") or {}
+        changed = {name: value for name, value in attributes.items() if not _same(have.get(name), value)}
+        if changed:
+            operations.append(("update", resource["id"], changed))
+    # Whatever no desired entry claimed, including duplicates of one that did
+    operations.extend(("delete", resource["id"], None) for resources in existing.values() for resource in resources)
+    return operations
+
+def _apply(client, operation):
+    action, target, attributes = operation
+    if action == "create":
+        return client.create_episode_resource(target, attributes)["id"]
+    if action == "update":
+        client.update_episode_resource(target, attributes)
+    else:
+        client.delete_episode_resource(target)
+    return target
+
+def _describe(operation):
+    action, target, attributes = operation
+    if action == "create":
+        return f"create on episode {target}: {json.dumps(attributes, sort_keys=True)}"
+    if action == "update":
+        return f"update resource {target}: {json.dumps(attributes, sort_keys=True)}"
+    return f"delete resource {target}"
+
+def sync_episode_resources(desired_file, key=DEFAULT_KEY, concurrency=DEFAULT_CONCURRENCY, dry_run=False):
+    desired = read_desired_state(desired_file)
+    client = PublishingClient(pool_size=max(concurrency, DEFAULT_POOL_SIZE))
+    try:
+        current = {}
+
+        def collect(i, total, episode_id, error, value=None):
+            if error is None:
+                current[episode_id] = value
+            else:
+                click.echo(f"Could not fetch resources for episode {episode_id} (skipped): {error}", err=True)
+
+        fetcher = BulkRunner(client, client.get_episode_resources, concurrency=concurrency, on_progress=collect)
+        with span("sync-episode-resources.fetch"):
+            fetcher.run(desired)
+
+        operations = []
+        for episode_id, resources in desired.items():
+            if episode_id in current:
+                operations.extend(diff_resources(episode_id, current[episode_id], resources, key=key))
+        counts = {action: sum(1 for op in operations if op[0] == action) for action in ("create", "update", "delete")}
+        unchanged = sum(len(r) for r in current.values()) - counts["update"] - counts["delete"]
+        click.echo(f"{len(current)} episodes checked: {counts['create']} to create, {counts['update']} to update, "
+                   f"{counts['delete']} to delete, {unchanged} unchanged.")
+        if dry_run:
+            for operation in operations:
+                click.echo(f"Would {_describe(operation)}")
+            return
+        if not operations:
+            return
+
+        def on_progress(i, total, index, error, value=None):
+            description = _describe(operations[index])
+            if error is None:
+                click.echo(f"[{i}/{total}] Done: {description}")
+            else:
+                click.echo(f"[{i}/{total}] Failed to {description}: {error}", err=True)
+
+        # Keyed by position: a desired list can repeat a resource, and identical operations must not
+        # share a key (and so an entry in result.errors)
+        runner = BulkRunner(client, lambda item: _apply(client, item[1]), concurrency=concurrency,
+                            on_progress=on_progress, key=lambda item: item[0], verb="Applied")
+        with span("sync-episode-resources.apply"):
+            result = runner.run(enumerate(operations))
+        click.echo(result.summary())
+        if result.failed or len(current) < len(desired):
+            click.echo("Some episodes were not fully synced; rerun to apply what is still different.", err=True)
+    except Exception as e:
+        click.echo(f"Error in sync_episode_resources: {e}", err=True)
+    finally:
+        client.close()
@@ -0,0 +1,22 @@
+import time
+import click
+from pco_workflows.api import PeopleClient
+from pco_workflows.api.client import DEFAULT_POOL_SIZE
+from pco_workflows.metrics import span
+from pco_workflows.mirror import PeopleMirror
+
+def sync_people_mirror(db_path, full=False, workers=1):
+    client = PeopleClient(pool_size=max(workers, DEFAULT_POOL_SIZE))
+    mirror = PeopleMirror(db_path)
+    try:
+        start = time.monotonic()
+        with span("sync.mirror"):
+            results = mirror.sync(client, full=full, max_workers=workers)
+        for name, (count, mode) in results.items():
+            click.echo(f"{name}: {count} records ({mode} sync)")
+        click.echo(f"Mirror {db_path} synced in {time.monotonic() - start:.1f}s")
+    except Exception as e:
+        click.echo(f"Error in sync_people_mirror: {e}", err=True)
+    finally:
+        mirror.close()
+        client.close()
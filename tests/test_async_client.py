@@ -0,0 +1,71 @@
+# tests/test_async_client.py
+import asyncio
+from pco_workflows.api import AsyncPeopleClient, RateLimiter, RetryPolicy
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.headers = {}
+        self.url = "https://example.test"
+        self.text = ""
+        self.content = b""
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+class FakeSession:
+    def __init__(self, total):
+        self.total = total
+        self.statuses = []
+
+    def request(self, method, url, params=None, **kwargs):
+        if self.statuses:
+            return FakeResponse(self.statuses.pop(0), {})
+        if "include" in (params or {}):
+            return FakeResponse(200, {
+                "data": [{
+                    "type": "Person", "id": "1",
+                    "relationships": {
+                        "emails": {"data": [{"type": "Email", "id": "2"}]},
+                        "phone_numbers": {"data": [{"type": "PhoneNumber", "id": "3"}]},
+                    },
+                }],
+                "included": [
+                    {"type": "Email", "id": "2", "attributes": {"address": "a@example.test"}},
+                    {"type": "PhoneNumber", "id": "3", "attributes": {"number": "555"}},
+                ],
+            })
+        offset = (params or {}).get("offset", 0)
+        per_page = (params or {}).get("per_page", 100)
+        ids = range(offset, min(offset + per_page, self.total))
+        return FakeResponse(200, {"data": [{"id": str(i)} for i in ids], "meta": {"total_count": self.total}})
+
+    def close(self):
+        pass
+
+def make_client(total=250):
+    client = AsyncPeopleClient(rate_limiter=RateLimiter(limit=1000, period=1), retry_policy=RetryPolicy(backoff_base=0))
+    client._client._session = FakeSession(total)
+    return client
+
+def test_async_parallel_pagination_preserves_order():
+    async def run():
+        async with make_client() as client:
+            return await client.get_all_people_ids(params={"per_page": 25}, max_workers=4)
+
+    assert asyncio.run(run()) == [str(i) for i in range(250)]
+
+def test_async_requests_retry_and_fan_out():
+    async def run():
+        async with make_client() as client:
+            client._client._session.statuses = [503]
+            results = await asyncio.gather(*(client.search_person_by_name(f"Name {i}") for i in range(20)))
+            return results, client.retry_stats
+
+    results, stats = asyncio.run(run())
+    assert results == [("a@example.test", "555")] * 20
+    assert stats["retries"] == 1
@@ -0,0 +1,147 @@
+# tests/test_authorized_pickups.py
+import json
+import threading
+import time
+from click.testing import CliRunner
+from pco_workflows.cli import cli
+from pco_workflows.testing import FakePCOServer
+from pco_workflows.workflows import parse_authorized_pickups as workflow
+
+class FakeClient:
+    """Just the PeopleClient surface parse_all_authorized_pickups uses, with two people to find."""
+
+    contacts = {"Ben Jones": ("ben@example.test", "2145550100"), "Cora Lee": ("cora@example.test", "")}
+
+    def __init__(self, field_data):
+        self.field_data = field_data
+        self.searches = []
+        self.writes = []
+        self._lock = threading.Lock()
+
+    def get_field_definition_id(self, name):
+        return {"Authorized Pickups": "1", "Authorized Pickups Parsed": "2"}[name]
+
+    def iter_field_data_by_definition(self, field_definition_id, **kwargs):
+        return [d for d in self.field_data if d["relationships"]["field_definition"]["data"]["id"] == field_definition_id]
+
+    def search_person_by_name(self, name):
+        with self._lock:
+            self.searches.append(name)
+        return self.contacts.get(name, ("", ""))
+
+    def post(self, url, payload):
+        with self._lock:
+            record_id = str(100 + len(self.field_data))
+            person_id = url.split("/")[1]
+            self.writes.append(("POST", person_id))
+            self.field_data.append(datum(record_id, person_id, "2", payload["data"]["attributes"]["value"]))
+        return {"data": {"id": record_id}}
+
+    def patch(self, url, payload):
+        with self._lock:
+            self.writes.append(("PATCH", url.split("/")[1]))
+            for d in self.field_data:
+                if d["id"] == url.split("/")[1]:
+                    d["attributes"]["value"] = payload["data"]["attributes"]["value"]
+
+    def close(self):
+        pass
+
+def datum(record_id, person_id, definition_id, value):
+    return {"id": record_id, "attributes": {"value": value}, "relationships": {
+        "customizable": {"data": {"type": "Person", "id": person_id}},
+        "field_definition": {"data": {"type": "FieldDefinition", "id": definition_id}}}}
+
+def test_all_mode_looks_each_name_up_once_and_reuses_the_index(monkeypatch, tmp_path):
+    field_data = [datum("10", "7", "1", "Ben Jones, Cora Lee"), datum("11", "8", "1", "ben jones"),
+                  datum("12", "9", "1", "Cora  Lee")]
+    clients = []
+
+    def make_client(**kwargs):
+        clients.append(FakeClient(field_data))
+        return clients[-1]
+
+    monkeypatch.setattr(workflow, "PeopleClient", make_client)
+    index_file = str(tmp_path / "index.json")
+
+    workflow.parse_all_authorized_pickups(concurrency=3, index_file=index_file)
+    # Two distinct names across three people, searched by their normalized spelling
+    assert sorted(clients[0].searches) == ["Ben Jones", "Cora Lee"]
+    assert sorted(clients[0].writes) == [("POST", "7"), ("POST", "8"), ("POST", "9")]
+    parsed = {d["relationships"]["customizable"]["data"]["id"]: d["attributes"]["value"]
+              for d in field_data if d["relationships"]["field_definition"]["data"]["id"] == "2"}
+    assert parsed["7"] == "Ben Jones;ben@example.test;2145550100|Cora Lee;cora@example.test;|"
+    assert parsed["9"] == "Cora  Lee;cora@example.test;|"
+    with open(index_file, encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ["ben jones", "cora lee"]
+
+    # The saved index answers every lookup, and the parsed entries are updated in place
+    workflow.parse_all_authorized_pickups(concurrency=3, index_file=index_file)
+    assert clients[1].searches == []
+    assert sorted(clients[1].writes) == sorted(("PATCH", d["id"]) for d in field_data
+                                               if d["relationships"]["field_definition"]["data"]["id"] == "2")
+    assert len(field_data) == 6
+
+def test_saved_lookups_expire_so_changed_contacts_are_picked_up(tmp_path):
+    index_file = str(tmp_path / "index.json")
+    client = FakeClient([])
+    index = workflow.PersonLookupIndex(client)
+    index.lookup("Ben Jones")
+    index.save(index_file)
+    with open(index_file, encoding="utf-8") as f:
+        entries = json.load(f)
+    entries["cora lee"] = ["old@example.test", "", time.time() - 2 * workflow.DEFAULT_INDEX_MAX_AGE]
+    entries["dan park"] = ["dan@example.test", ""]  # Saved before entries carried a lookup time
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+
+    client.contacts = {**FakeClient.contacts, "Ben Jones": ("ben@new.example.test", "")}
+    index = workflow.PersonLookupIndex.load(client, index_file)
+    assert index.lookup("Ben Jones") == ("ben@example.test", "2145550100")  # Still fresh
+    assert index.lookup("Cora Lee") == ("cora@example.test", "")
+    assert index.lookup("Dan Park") == ("", "")
+    assert client.searches == ["Ben Jones", "Cora Lee", "Dan Park"]
+
+    # A max age of 0 searches every name again
+    index = workflow.PersonLookupIndex.load(client, index_file, max_age=0)
+    assert index.lookup("Ben Jones") == ("ben@new.example.test", "")
+
+def run_all(*args):
+    result = CliRunner().invoke(cli, ["parse-authorized-pickups", "--all", "--concurrency", "3", *args])
+    assert result.exit_code == 0, result.output
+    assert "Failed" not in result.output, result.output
+    return result
+
+def test_all_mode_against_the_fake_server(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer() as server:
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        pickups = server.add("field_definitions", {"name": "Authorized Pickups", "slug": "authorized_pickups"})
+        parsed = server.add("field_definitions", {"name": "Authorized Pickups Parsed",
+                                                  "slug": "authorized_pickups_parsed"})
+        server.add_person("Ben", "Jones", email="ben@example.test", phone="2145550100")
+        server.add_person("Cora", "Lee", email="cora@example.test")
+        children = [server.add_person(first, "Kid")["id"] for first in ("Ada", "Dan", "Eve")]
+        for child, value in zip(children, ["Ben Jones, Cora Lee", "ben jones", "Cora  Lee"]):
+            server.add_field_datum(child, pickups["id"], value)
+
+        first = run_all("--index-file", "index.json")
+        # Two distinct names across three people, however they are spelled
+        assert server.count_requests("GET", "/v2/people") == 2
+        assert "name lookups: 2 fetched, 2 reused" in first.output
+        assert server.count_requests("POST", "/field_data") == 3
+        values = {d["relationships"]["customizable"]["data"]["id"]: d["attributes"]["value"]
+                  for d in server.store["field_data"].values()
+                  if d["relationships"]["field_definition"]["data"]["id"] == parsed["id"]}
+        assert values[children[0]] == "Ben Jones;ben@example.test;2145550100|Cora Lee;cora@example.test;|"
+        with open(tmp_path / "index.json", encoding="utf-8") as f:
+            assert sorted(json.load(f)) == ["ben jones", "cora lee"]
+
+        # The saved index answers every lookup, and existing parsed entries are updated in place
+        second = run_all("--index-file", "index.json")
+        assert server.count_requests("GET", "/v2/people") == 2
+        assert "name lookups: 0 fetched, 4 reused" in second.output
+        assert server.count_requests("POST", "/field_data") == 3
+        assert server.count_requests("PATCH", "/field_data") == 3
@@ -0,0 +1,39 @@
+# tests/test_bulk.py
+from pco_workflows.api.bulk import BulkDeleter, Journal
+
+class FakeClient:
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.deleted = []
+        self.retry_stats = {"retries": 0, "recovered": 0, "gave_up": 0}
+
+    def delete(self, url):
+        if url.rsplit("/", 1)[-1] in self.fail_ids:
+            raise RuntimeError("API DELETE failed")
+        self.deleted.append(url)
+
+def test_bulk_delete_journals_and_resumes(tmp_path):
+    journal_path = str(tmp_path / "delete.journal")
+    ids = [str(i) for i in range(50)]
+
+    with Journal(journal_path) as journal:
+        deleter = BulkDeleter(FakeClient(fail_ids={"7", "8"}), "people/{id}", concurrency=4, journal=journal)
+        result = deleter.run(ids)
+    assert result.succeeded == 48
+    assert set(result.errors) == {"7", "8"}
+
+    client = FakeClient()
+    with Journal(journal_path, resume=True) as journal:
+        deleter = BulkDeleter(client, "people/{id}", concurrency=4, journal=journal)
+        pending = deleter.pending(ids)
+        result = deleter.run(pending, skipped=len(ids) - len(pending))
+    assert sorted(client.deleted) == ["people/7", "people/8"]
+    assert result.skipped == 48
+    with open(journal_path) as f:
+        assert len(f.read().split()) == 50
+
+def test_journal_is_not_truncated_until_first_write(tmp_path):
+    journal_path = tmp_path / "delete.journal"
+    journal_path.write_text("1\n2\n")
+    Journal(str(journal_path)).close()
+    assert journal_path.read_text() == "1\n2\n"
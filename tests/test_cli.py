@@ -0,0 +1,27 @@
+# tests/test_cli.py
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def loaded_modules(*args):
+    # A fresh interpreter, so modules imported by other tests don't count
+    code = ("import sys\nfrom click.testing import CliRunner\nfrom pco_workflows.cli import cli\n"
+            f"result = CliRunner().invoke(cli, {list(args)!r})\nassert result.exit_code == 0, result.output\n"
+            "print(' '.join(sorted(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True, capture_output=True, text=True)
+    return set(out.stdout.split())
+
+def test_help_does_not_import_workflows_or_requests():
+    modules = loaded_modules("--help")
+    assert "requests" not in modules and "dotenv" not in modules
+    assert not any(m.startswith("pco_workflows.workflows") for m in modules)
+
+def test_create_csv_runs_without_requests(tmp_path):
+    source = tmp_path / "input.csv"
+    source.write_text("First Name,Last Name\nAda,Lovelace\n", encoding="utf-8")
+    modules = loaded_modules("create-csv", "--input", str(source), "--output", str(tmp_path / "output.csv"))
+    assert "pco_workflows.workflows.create_csv" in modules
+    assert "requests" not in modules
+    assert (tmp_path / "output.csv").exists()
@@ -0,0 +1,123 @@
+# tests/test_client.py
+import time
+from pco_workflows.api import PeopleClient, RateLimiter
+from pco_workflows.api.client import attach_included, with_fields, with_include
+from pco_workflows.testing import FakePCOServer
+
+def test_with_include_joins_relationship_names():
+    assert with_include({"per_page": 25}, ["emails", "phone_numbers"]) == {"per_page": 25, "include": "emails,phone_numbers"}
+    assert with_include(None, "emails") == {"per_page": 100, "include": "emails"}
+    assert with_include({"per_page": 25}, None) == {"per_page": 25}
+
+def test_with_fields_builds_sparse_fieldsets():
+    assert with_fields({"per_page": 25}, {"Person": ["first_name", "emails"], "Email": ("address",)}) == {
+        "per_page": 25, "fields[Person]": "first_name,emails", "fields[Email]": "address"}
+    assert with_fields(None, {"Person": ()}) == {"per_page": 100, "fields[Person]": ""}
+    assert with_fields({"per_page": 25}, None) == {"per_page": 25}
+
+def test_attach_included_resolves_to_one_and_to_many():
+    document = {
+        "data": [{
+            "type": "Person", "id": "1",
+            "relationships": {
+                "emails": {"data": [{"type": "Email", "id": "10"}, {"type": "Email", "id": "11"}]},
+                "primary_campus": {"data": {"type": "Campus", "id": "5"}},
+                "households": {"data": []},
+            },
+        }],
+        "included": [
+            {"type": "Email", "id": "10", "attributes": {"address": "a@example.test"}},
+            {"type": "Email", "id": "11", "attributes": {"address": "b@example.test"}},
+            {"type": "Campus", "id": "5", "attributes": {"name": "Main"}},
+        ],
+    }
+    person = attach_included(document)[0]
+    assert [e["id"] for e in person["included"]["emails"]] == ["10", "11"]
+    assert person["included"]["primary_campus"]["attributes"]["name"] == "Main"
+    assert person["included"]["households"] == []
+
+def make_client(server, **kwargs):
+    return PeopleClient(api_root=server.url, http_cache=False, rate_limiter=RateLimiter(limit=1000, period=1), **kwargs)
+
+def test_requests_share_one_pooled_session_until_closed(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer() as server:
+        person = server.add_person("Ada", "Lovelace")
+        with make_client(server) as client:
+            session = client.session
+            for _ in range(5):
+                client.get_person(person["id"])
+            assert client.session is session
+            # Every request went over the one kept-alive connection in the session's pool
+            pool_manager = session.get_adapter(server.url).poolmanager
+            assert [pool_manager.pools[key].num_connections for key in pool_manager.pools.keys()] == [1]
+        # Leaving the with-block closed the session and emptied its pool
+        assert client._session is None
+        assert len(session.get_adapter(server.url).poolmanager.pools) == 0
+
+        client = make_client(server)
+        client.get_person(person["id"])
+        session = client.session
+        client.close()
+        assert client._session is None and len(session.get_adapter(server.url).poolmanager.pools) == 0
+        # A closed client opens a fresh session if used again
+        client.get_person(person["id"])
+        assert client.session is not session
+        client.close()
+
+def test_iter_paginate_fetches_each_page_only_when_it_is_reached(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer() as server, make_client(server) as client:
+        people = [server.add_person(f"P{i}", "Smith")["id"] for i in range(5)]
+        records = client.iter_paginate("people", params={"per_page": 2})
+        assert len(server.request_log) == 0
+        seen = [next(records)["id"], next(records)["id"]]
+        assert len(server.request_log) == 1  # The second page waits until the first is used up
+        seen.append(next(records)["id"])
+        assert len(server.request_log) == 2
+        seen.extend(record["id"] for record in records)
+        # Three pages; the last one has no links.next, so nothing is requested after it
+        assert seen == people
+        assert len(server.request_log) == 3
+
+class SlowPageServer(FakePCOServer):
+    """Answers one offset of the people list late, so completion order differs from page order."""
+
+    slow_offset = "10"
+
+    def handle(self, method, path, query, body):
+        if query.get("offset") == self.slow_offset:
+            time.sleep(0.3)
+        return super().handle(method, path, query, body)
+
+def test_parallel_pages_in_page_order_or_completion_order(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with SlowPageServer(latency=0.01, jitter=0.02) as server, make_client(server) as client:
+        people = [server.add_person(f"P{i}", "Smith")["id"] for i in range(40)]
+        params = {"per_page": 5}
+        ordered = [r["id"] for r in client.iter_paginate("people", params=params, max_workers=4)]
+        unordered = [r["id"] for r in client.iter_paginate("people", params=params, max_workers=4, ordered=False)]
+    assert ordered == people
+    # Same records exactly once, but the slow page no longer holds back the pages after it
+    assert sorted(unordered) == sorted(people) and len(set(unordered)) == len(people)
+    assert unordered.index(people[10]) > unordered.index(people[15])
+
+def test_parallel_pages_stop_once_a_prefetched_offset_is_past_the_end(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer(latency=0.005, jitter=0.01) as server, make_client(server) as client:
+        people = [server.add_person(f"P{i}", "Smith")["id"] for i in range(100)]
+        records = client.iter_paginate("people", params={"per_page": 5}, max_workers=2)
+        seen = [next(records)["id"]]
+        # total_count said 100, but all but 20 are deleted before the prefetching starts
+        for person_id in people[20:]:
+            del server.store["people"][person_id]
+        seen.extend(record["id"] for record in records)
+        requests_made = len(server.request_log)
+    assert seen == people[:20]
+    # The first page, the four in the window, and at most one more per page still in flight;
+    # without the stop it would ask for all 19 remaining offsets
+    assert requests_made <= 9
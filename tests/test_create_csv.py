@@ -0,0 +1,37 @@
+# tests/test_create_csv.py
+import csv
+import pytest
+from pco_workflows.workflows.create_csv import create_import_csv
+
+INPUT_HEADERS = ["First Name", "Last Name", "Address", "Zip Code", "Cell Phone", "E-Mail", "Relationship",
+                 "Authorized Pick up 1"]
+
+def write_input(path):
+    families = [("Smith", "1 Oak Lane", "75001"), ("Jones", "9 Elm Road", "75002"), ("Smith", "77 Pine Ct", "75003"),
+                ("Brown", "", "")]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(INPUT_HEADERS)
+        for i in range(40):
+            family = (i // 4) % len(families)
+            last, address, zip_code = families[family]
+            writer.writerow([f"Person{i}", last, address, zip_code, f"214555{family:04d}",
+                             f"{last.lower()}{family}@example.test", "Head of Household" if i % 4 == 0 else "Child",
+                             f"Pickup {i % 5}"])
+            if i % 9 == 0:
+                writer.writerow([])
+
+@pytest.mark.parametrize("households", ["last-name", "cluster"])
+def test_output_does_not_depend_on_workers_or_chunking(tmp_path, households):
+    source = tmp_path / "input.csv"
+    write_input(source)
+    serial, parallel = tmp_path / "serial.csv", tmp_path / "parallel.csv"
+    create_import_csv(str(source), str(serial), workers=1, households=households)
+    # Chunks of three split every four-person household across chunks and workers
+    create_import_csv(str(source), str(parallel), workers=3, chunk_size=3, households=households)
+    assert parallel.read_bytes() == serial.read_bytes()
+    with open(serial, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["remote_id"] for row in rows] == [str(i) for i in range(1, 41)]
+    # At least one household per family, so there were households for chunking to split
+    assert len({row["Household ID"] for row in rows}) >= 4
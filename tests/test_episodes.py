@@ -0,0 +1,147 @@
+# tests/test_episodes.py
+import csv
+import json
+import pytest
+from click.testing import CliRunner
+from pco_workflows.cli import cli
+from pco_workflows.testing import FakePCOServer
+from pco_workflows.workflows.create_episode import episode_attributes
+from pco_workflows.workflows.sync_episode_resources import diff_resources
+
+def write_manifest(path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "channel_name", "channel_id", "description", "resources"])
+        writer.writerow(["Week 1", "Sermons", "", "First", json.dumps([{"kind": "link", "url": "https://a.test/1"}])])
+        writer.writerow(["Week 2", "", "", "", json.dumps([{"kind": "link", "url": "https://a.test/2"},
+                                                            {"kind": "link", "url": "https://a.test/3"}])])
+        writer.writerow(["Week 3", "Missing", "", "", ""])
+
+def test_create_episodes_from_manifest(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    write_manifest(tmp_path / "episodes.csv")
+    with FakePCOServer() as server:
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        archive = server.add("channels", {"name": "Archive"})
+        sermons = server.add("channels", {"name": "Sermons"})
+        result = CliRunner().invoke(cli, ["create-episodes", "--manifest", "episodes.csv", "--concurrency", "2"])
+        assert result.exit_code == 0, result.output
+        assert server.count_requests("GET", "/channels") == 1
+        assert server.count_requests("POST", "/episodes") == 5  # 2 episodes + 3 resources
+
+        rerun = CliRunner().invoke(cli, ["create-episodes", "--manifest", "episodes.csv", "--resume"])
+        assert rerun.exit_code == 0, rerun.output
+        assert server.count_requests("POST") == 5
+
+        # Another manifest never resumes from this one's journal
+        write_manifest(tmp_path / "more.csv")
+        other = CliRunner().invoke(cli, ["create-episodes", "--manifest", "more.csv", "--resume"])
+        assert other.exit_code == 0, other.output
+        assert server.count_requests("POST") == 10
+        episodes = server.store["episodes"]
+
+    with open(tmp_path / "episodes.results.csv", newline="", encoding="utf-8") as f:
+        results = list(csv.DictReader(f))
+    assert [r["channel_id"] for r in results] == [sermons["id"], archive["id"], ""]
+    assert results[2]["error"] == "No channel found with name 'Missing'" and not results[2]["episode_id"]
+    assert episodes[results[0]["episode_id"]]["attributes"]["description"] == "First"
+    assert len(results[1]["resource_ids"].split("|")) == 2
+
+def test_misspelled_episode_attributes_are_rejected(monkeypatch, tmp_path):
+    with pytest.raises(TypeError):
+        episode_attributes("Week 1", 1, descripton="First")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with open("episodes.ndjson", "w", encoding="utf-8") as f:
+        f.write(json.dumps({"title": "Week 1", "description": "First"}) + "\n")
+        f.write(json.dumps({"title": "Week 2", "descripton": "Second"}) + "\n")
+    with FakePCOServer() as server:
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        result = CliRunner().invoke(cli, ["create-episodes", "--manifest", "episodes.ndjson"])
+        assert server.request_log == []
+    assert result.exit_code == 2
+    assert "episodes.ndjson row 2: unknown column(s) descripton" in result.output
+
+def test_diff_resources_issues_only_needed_changes():
+    current = [
+        {"id": "1", "attributes": {"url": "https://a.test/keep", "title": "Keep", "featured": True}},
+        {"id": "2", "attributes": {"url": "https://a.test/retitle", "title": "Old"}},
+        {"id": "3", "attributes": {"url": "https://a.test/gone", "title": "Gone"}},
+        {"id": "4", "attributes": {"url": "https://a.test/keep", "title": "Duplicate"}},
+    ]
+    desired = [
+        {"url": "https://a.test/keep", "title": "Keep", "featured": "true"},
+        {"url": "https://a.test/retitle", "title": "New"},
+        {"url": "https://a.test/new", "title": "New one"},
+    ]
+    assert diff_resources("9", current, desired) == [
+        ("update", "2", {"title": "New"}),
+        ("create", "9", {"url": "https://a.test/new", "title": "New one"}),
+        ("delete", "4", None),
+        ("delete", "3", None),
+    ]
+
+def test_sync_episode_resources_reconciles_and_is_idempotent(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer() as server:
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        episodes = [server.add("episodes", {"title": f"Week {i}"}) for i in range(3)]
+        for episode in episodes:
+            for name in ("audio", "video"):
+                resource = server.add("episode_resources", {"url": f"https://m.test/{episode['id']}/{name}",
+                                                            "title": name})
+                server.link("episode_resources", resource, "episode", "Episode", episode["id"])
+        first = episodes[0]["id"]
+        with open("desired.ndjson", "w", encoding="utf-8") as f:
+            for episode in episodes:
+                resources = [{"url": f"https://m.test/{episode['id']}/audio", "title": "audio"},
+                             {"url": f"https://m.test/{episode['id']}/video", "title": "video"}]
+                if episode["id"] == first:
+                    resources = [{"url": f"https://m.test/{first}/audio", "title": "Audio (remastered)"},
+                                 {"url": f"https://m.test/{first}/notes", "title": "notes"}]
+                f.write(json.dumps({"episode_id": episode["id"], "resources": resources}) + "\n")
+
+        dry = CliRunner().invoke(cli, ["sync-episode-resources", "--desired", "desired.ndjson", "--dry-run"])
+        assert dry.exit_code == 0, dry.output
+        assert "1 to create, 1 to update, 1 to delete, 4 unchanged" in dry.output
+        assert server.count_requests("POST") + server.count_requests("PATCH") + server.count_requests("DELETE") == 0
+
+        result = CliRunner().invoke(cli, ["sync-episode-resources", "--desired", "desired.ndjson"])
+        assert result.exit_code == 0, result.output
+        writes = [e["method"] for e in server.request_log if e["method"] != "GET"]
+        assert sorted(writes) == ["DELETE", "PATCH", "POST"]
+
+        again = CliRunner().invoke(cli, ["sync-episode-resources", "--desired", "desired.ndjson"])
+        assert "0 to create, 0 to update, 0 to delete, 6 unchanged" in again.output
+        assert len([e for e in server.request_log if e["method"] != "GET"]) == 3
+        titles = sorted(r["attributes"]["title"] for r in server.store["episode_resources"].values())
+    assert titles == ["Audio (remastered)", "audio", "audio", "notes", "video", "video"]
+
+class RejectingResourcesServer(FakePCOServer):
+    """Refuses every new episode resource."""
+
+    def handle(self, method, path, query, body):
+        if method == "POST" and path.endswith("/episode_resources"):
+            return 422, {}, {"errors": [{"status": "422", "title": "Unprocessable Entity"}]}
+        return super().handle(method, path, query, body)
+
+def test_sync_counts_each_repeated_operation_separately(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with RejectingResourcesServer() as server:
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        episode = server.add("episodes", {"title": "Week 1"})
+        resource = {"url": "https://m.test/notes", "title": "notes"}
+        with open("desired.ndjson", "w", encoding="utf-8") as f:
+            f.write(json.dumps({"episode_id": episode["id"], "resources": [resource, resource]}) + "\n")
+        result = CliRunner().invoke(cli, ["sync-episode-resources", "--desired", "desired.ndjson"])
+    assert result.exit_code == 0, result.output
+    # Two identical creates, two failures, rather than one error overwriting the other
+    assert "Applied 0/2, failed 2" in result.output
+    assert result.output.count("Failed to create") == 2
@@ -0,0 +1,51 @@
+# tests/test_export.py
+import csv
+import json
+from click.testing import CliRunner
+from pco_workflows.api.fields import FieldRegistry
+from pco_workflows.api.people import BUILT_IN_FIELDS
+from pco_workflows.cli import cli
+from pco_workflows.export import FieldPivot, write_rows
+from pco_workflows.testing import FakePCOServer
+
+def datum(definition_id, value):
+    return {"attributes": {"value": value},
+            "relationships": {"field_definition": {"data": {"type": "FieldDefinition", "id": definition_id}}}}
+
+def test_pivot_reads_built_ins_and_joins_multi_value_custom_fields():
+    registry = FieldRegistry([{"id": "5", "attributes": {"name": "Allergies", "slug": "allergies"}}], BUILT_IN_FIELDS)
+    pivot = FieldPivot(registry, ["first name", "Allergies"])
+    person = {"id": "1", "attributes": {"first_name": "Ada"},
+              "included": {"field_data": [datum("5", "Nuts"), datum("6", "ignored"), datum("5", "Dairy")]}}
+    assert pivot.columns == ["person_id", "First Name", "Allergies"]
+    assert pivot.row(person) == ["1", "Ada", "Nuts|Dairy"]
+    assert pivot.row({"id": "2", "attributes": {}}) == ["2", None, None]
+
+def test_write_rows_batches_csv_and_ndjson(tmp_path):
+    rows = [[str(i), f"v{i}", None] for i in range(25)]
+    columns = ["person_id", "A", "B"]
+    assert write_rows(iter(rows), str(tmp_path / "out.csv"), columns, fmt="csv", batch_size=10) == 25
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        written = list(csv.reader(f))
+    assert written[0] == columns and written[-1] == ["24", "v24", ""]
+    write_rows(iter(rows), str(tmp_path / "out.ndjson"), columns, fmt="ndjson", batch_size=10)
+    lines = (tmp_path / "out.ndjson").read_text().splitlines()
+    assert json.loads(lines[3]) == {"person_id": "3", "A": "v3", "B": None}
+
+def test_cli_exports_several_fields_in_one_pass(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer() as server:
+        server.seed_people(250, field_definitions=("Authorized Pickups", "Allergies"))
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        result = CliRunner().invoke(cli, ["get-field-data", "--fields", "First Name,Authorized Pickups,Allergies",
+                                          "--format", "csv", "--output", "report.csv"])
+        people_pages = server.count_requests("GET", "/people/v2/people")
+        field_data_pages = server.count_requests("GET", "/people/v2/field_data")
+    assert result.exit_code == 0, result.output
+    with open(tmp_path / "report.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 250
+    assert rows[0]["First Name"] == "Ada" and rows[0]["Authorized Pickups"] and rows[0]["Allergies"]
+    assert people_pages == 3 and field_data_pages == 0
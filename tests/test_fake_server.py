@@ -0,0 +1,94 @@
+# tests/test_fake_server.py
+import pytest
+import requests
+from pco_workflows.api import PeopleClient, RateLimiter, RetryPolicy
+from pco_workflows.api.bulk import BulkDeleter
+from pco_workflows.metrics import Metrics
+from pco_workflows.testing import FakePCOServer, use_cassette
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+
+def make_client(server, **kwargs):
+    kwargs.setdefault("rate_limiter", RateLimiter(limit=10000, period=1))
+    kwargs.setdefault("retry_policy", RetryPolicy(backoff_base=0.001, backoff_max=0.01))
+    return PeopleClient(api_root=server.url, **kwargs)
+
+def test_pagination_follows_links_and_offsets():
+    with FakePCOServer() as server:
+        server.seed_people(250)
+        with make_client(server) as client:
+            ids = [p["id"] for p in client.iter_people()]
+            parallel = [p["id"] for p in client.iter_people(max_workers=4)]
+        assert len(ids) == 250
+        assert parallel == ids
+        assert server.count_requests("GET", "/people/v2/people") >= 3
+
+def test_include_and_nested_routes():
+    with FakePCOServer() as server:
+        person = server.add_person("Ada", "Lovelace", email="ada@example.com", phone="5551234567")
+        with make_client(server) as client:
+            assert client.search_person_by_name("Ada Lovelace") == ("ada@example.com", "5551234567")
+            emails = client.get_emails_for_person(person["id"])
+        assert [e["attributes"]["address"] for e in emails] == ["ada@example.com"]
+
+def test_sparse_fieldsets_and_gzip_shrink_pages():
+    metrics = Metrics()
+    with FakePCOServer() as server:
+        server.seed_people(200)
+        with make_client(server, metrics=metrics) as client:
+            ids = client.get_all_people_ids()
+            id_pages = len(server.request_log)
+            names = list(client.iter_people(fields={"Person": ["first_name"]}))
+            full = list(client.iter_people())
+    sent = [entry["bytes"] for entry in server.request_log]
+    assert ids == [p["id"] for p in full]
+    assert all(p["attributes"].keys() == {"first_name"} and not p["relationships"] for p in names)
+    assert sum(sent[:id_pages]) * 2 < sum(sent[-id_pages:])
+    stats = metrics.to_dict()["endpoints"]["GET people/v2/people"]
+    assert stats["wire_bytes"] < stats["bytes"] / 3
+
+def test_faults_are_retried():
+    with FakePCOServer(fault_rate=0.2, seed=3) as server:
+        server.seed_people(40)
+        with make_client(server) as client:
+            people = list(client.iter_people(params={"per_page": 5}))
+            stats = client.retry_stats
+        assert len(people) == 40
+        assert {entry["status"] for entry in server.request_log} & {500, 502, 503}
+        assert stats["recovered"] > 0 and stats["gave_up"] == 0
+
+def test_rate_limit_429_waits_for_retry_after():
+    with FakePCOServer(rate_limit=3, rate_period=0.3) as server:
+        server.seed_people(5)
+        # Another "process" spends the window before this client has seen any headers
+        for _ in range(3):
+            requests.get(f"{server.url}/people/v2/people")
+        with make_client(server) as client:
+            people = client.get_people()
+            stats = client.retry_stats
+        assert len(people) == 5
+        assert [entry["status"] for entry in server.request_log][3] == 429
+        assert stats["recovered"] == 1
+
+def test_bulk_delete_against_fake_server():
+    with FakePCOServer() as server:
+        ids = [p["id"] for p in server.seed_people(30)]
+        with make_client(server) as client:
+            result = BulkDeleter(client, "people/{id}", concurrency=4).run(ids)
+        assert result.succeeded == 30
+        assert not server.store["people"]
+
+def test_record_then_replay_without_server(tmp_path):
+    cassette = str(tmp_path / "people.jsonl")
+    with FakePCOServer() as server:
+        server.seed_people(120)
+        url = server.url
+        with make_client(server) as client, use_cassette(client, cassette, mode="record"):
+            recorded = [p["id"] for p in client.iter_people()]
+    with PeopleClient(api_root=url, rate_limiter=RateLimiter(limit=10000, period=1)) as client:
+        with use_cassette(client, cassette, mode="replay"):
+            replayed = [p["id"] for p in client.iter_people()]
+    assert replayed == recorded
@@ -0,0 +1,106 @@
+# tests/test_fields.py
+import os
+import pytest
+from pco_workflows.api import PeopleClient, RateLimiter
+from pco_workflows.api.fields import FieldRegistry
+from pco_workflows.api.people import BUILT_IN_FIELDS, get_built_in_field_by_name
+from pco_workflows.testing import FakePCOServer
+
+CUSTOM = [
+    {"type": "FieldDefinition", "id": "7", "attributes": {"name": "Authorized Pickups", "slug": "authorized_pickups"}},
+    {"type": "FieldDefinition", "id": "8", "attributes": {"name": "Allergies", "slug": "allergies"}},
+]
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+
+def test_registry_indexes_built_in_and_custom_fields():
+    registry = FieldRegistry(CUSTOM, BUILT_IN_FIELDS)
+    assert registry.get("AUTHORIZED PICKUPS")["id"] == "7"
+    assert registry.get("allergies")["id"] == "8"
+    assert registry.by_id(7)["attributes"]["name"] == "Authorized Pickups"
+    first_name = registry.resolve("first name")
+    assert registry.is_built_in(first_name) and registry.get("first_name") is first_name
+    assert registry.id_for("Authorized Pickups") == "7"
+    with pytest.raises(ValueError):
+        registry.id_for("First Name")
+    with pytest.raises(ValueError):
+        registry.resolve("Shoe Size")
+    assert get_built_in_field_by_name("LAST NAME")["attributes"]["slug"] == "last_name"
+
+def test_disk_cache_skips_and_revalidates_downloads(tmp_path):
+    cache = str(tmp_path / "fields.json")
+    with FakePCOServer() as server:
+        server.add("field_definitions", {"name": "Allergies", "slug": "allergies", "updated_at": "2025-01-01"})
+
+        def client(ttl):
+            return PeopleClient(api_root=server.url, field_cache=cache, field_cache_ttl=ttl,
+                                rate_limiter=RateLimiter(limit=1000, period=1))
+
+        with client(3600) as c:
+            assert c.get_field_definition_id("Allergies") == c.get_field_definition_id("allergies")
+        assert os.path.exists(cache)
+        first_run = len(server.request_log)
+        assert first_run == 2  # Signature probe and one page of definitions
+
+        with client(3600) as c:
+            c.get_field_definition_id("Allergies")
+        assert len(server.request_log) == first_run  # Fresh cache: no network at all
+
+        with client(0) as c:
+            c.get_field_definition_id("Allergies")
+        assert len(server.request_log) == first_run + 1  # Stale but unchanged: probe only
+
+        server.add("field_definitions", {"name": "Baptized", "slug": "baptized", "updated_at": "2025-02-01"})
+        with client(0) as c:
+            assert c.field_registry().get("Baptized") is not None
+        assert len(server.request_log) == first_run + 3  # Changed: probe plus a fresh download
+
+def test_disk_cache_written_under_other_credentials_is_ignored(tmp_path, monkeypatch):
+    cache = str(tmp_path / "fields.json")
+    with FakePCOServer() as server:
+        server.add("field_definitions", {"name": "Allergies", "slug": "allergies", "updated_at": "2025-01-01"})
+
+        def load():
+            with PeopleClient(api_root=server.url, field_cache=cache, field_cache_ttl=3600,
+                              rate_limiter=RateLimiter(limit=1000, period=1)) as c:
+                c.get_field_definition_id("Allergies")
+
+        load()
+        first_run = len(server.request_log)
+        # Another org on the same api_root must not be handed this org's definitions
+        monkeypatch.setenv("PCO_APPLICATION_ID", "other-app")
+        load()
+        assert len(server.request_log) == first_run * 2
+    with open(cache, encoding="utf-8") as f:
+        assert "other-app" not in f.read()
+
+def test_field_added_within_the_cache_ttl_is_found_after_one_reload(tmp_path):
+    cache = str(tmp_path / "fields.json")
+    with FakePCOServer() as server:
+        server.add("field_definitions", {"name": "Allergies", "slug": "allergies", "updated_at": "2025-01-01"})
+
+        def client():
+            return PeopleClient(api_root=server.url, field_cache=cache, field_cache_ttl=3600,
+                                rate_limiter=RateLimiter(limit=1000, period=1))
+
+        with client() as c:
+            c.get_field_definition_id("Allergies")
+        first_run = len(server.request_log)
+
+        server.add("field_definitions", {"name": "Baptized", "slug": "baptized", "updated_at": "2025-02-01"})
+        with client() as c:
+            assert c.get_field_definition_id("Allergies")
+            assert len(server.request_log) == first_run  # Known names still come from the cache
+            assert c.get_field_definition_id("Baptized") == c.field_registry().resolve("baptized")["id"]
+            reloaded = len(server.request_log)
+            assert reloaded == first_run + 2
+            # A name that really doesn't exist costs at most the one reload
+            with pytest.raises(ValueError, match="not found"):
+                c.field_registry().resolve("Shoe Size")
+            assert len(server.request_log) == reloaded
+        with client() as c:
+            assert c.get_field_definition_id("Baptized")  # The reload rewrote the cache file
+        assert len(server.request_log) == reloaded
@@ -0,0 +1,46 @@
+# tests/test_households.py
+from pco_workflows.households import Householder, UnionFind, normalize_address, normalize_phone, row_keys
+
+def assign(rows):
+    householder = Householder()
+    for row in rows:
+        householder.add(row_keys(row.get), row.get("Last Name", ""))
+    return householder.assign()
+
+def test_normalizers():
+    assert normalize_address("123 N. Main Street", "Dallas", "TX", "75001-1234") == normalize_address("123 north main st", "", "", "75001")
+    assert normalize_address("", "Dallas", "TX", "75001") is None
+    assert normalize_phone("+1 (214) 555-0100") == normalize_phone("214.555.0100")
+    assert normalize_phone("555-0100") is None
+
+def test_unsorted_rows_with_shared_contacts_are_grouped():
+    rows = [
+        {"Last Name": "Smith", "Address": "1 Oak Lane", "Zip Code": "75001"},
+        {"Last Name": "Jones", "Address": "9 Elm Road", "Zip Code": "75002"},
+        {"Last Name": "Smith", "Home Phone": "214-555-0100", "Address": "1 Oak Ln.", "Zip Code": "75001"},
+        {"Last Name": "Brown", "Cell Phone": "(214) 555-0100"},
+        {"Last Name": "Jones", "E-Mail": "JONES@example.test", "Address": "9 Elm Rd", "Zip Code": "75002"},
+        {"Last Name": "Jones", "E-Mail": "jones@example.test"},
+    ]
+    ids, names = assign(rows)
+    assert ids == ["1", "2", "1", "1", "2", "2"]
+    assert names == ["Smith Household", "Jones Household", "Smith Household", "Smith Household",
+                     "Jones Household", "Jones Household"]
+
+def test_adjacent_same_name_families_stay_separate():
+    rows = [
+        {"Last Name": "Smith", "Address": "1 Oak Lane", "Zip Code": "75001"},
+        {"Last Name": "Smith", "Address": "77 Pine Ct", "Zip Code": "75003"},
+        {"Last Name": ""},
+    ]
+    ids, names = assign(rows)
+    assert ids == ["1", "2", "3"]
+    assert names[2] == ""
+
+def test_union_find_merges_transitively():
+    sets = UnionFind()
+    a, b, c, d = (sets.add() for _ in range(4))
+    sets.union(a, b)
+    sets.union(c, b)
+    assert sets.find(a) == sets.find(c)
+    assert sets.find(d) != sets.find(a)
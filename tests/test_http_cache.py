@@ -0,0 +1,110 @@
+# tests/test_http_cache.py
+import asyncio
+import pytest
+from pco_workflows.api import AsyncPeopleClient, PeopleClient, RateLimiter
+from pco_workflows.api.http_cache import HttpCache
+from pco_workflows.metrics import Metrics
+from pco_workflows.testing import FakePCOServer
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+
+def make_client(server, cache, cls=PeopleClient, **kwargs):
+    return cls(api_root=server.url, http_cache=cache, rate_limiter=RateLimiter(limit=10000, period=1), **kwargs)
+
+def test_unchanged_reads_revalidate_with_304(tmp_path):
+    metrics = Metrics()
+    with FakePCOServer() as server:
+        server.seed_people(3, field_definitions=("Allergies", "Authorized Pickups"))
+        cache = HttpCache(str(tmp_path / "cache.sqlite3"))
+        with make_client(server, cache, metrics=metrics) as client:
+            first = client.get_field_definitions()
+        # A later run with a fresh client reuses the body on disk
+        with make_client(server, HttpCache(cache.path), metrics=metrics) as client:
+            second = client.get_field_definitions()
+        statuses = [entry["status"] for entry in server.request_log]
+    assert second == first
+    assert statuses == [200, 304]
+    assert metrics.to_dict()["totals"]["cache"] == {"hit": 0, "revalidated": 1, "miss": 1}
+
+def test_ttl_serves_without_a_request_until_a_write(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.sqlite3"), policies={"people/v2/people/{id}": 60})
+    with FakePCOServer() as server:
+        person = server.add_person("Ada", "Lovelace")
+        with make_client(server, cache) as client:
+            client.get_person(person["id"])
+            client.get_person(person["id"])
+            assert len(server.request_log) == 1
+            client.patch(f"people/{person['id']}", {"data": {"attributes": {"first_name": "Augusta"}}})
+            updated = client.get_person(person["id"])
+    assert updated["attributes"]["first_name"] == "Augusta"
+    assert [entry["method"] for entry in server.request_log] == ["GET", "PATCH", "GET"]
+
+def test_uncached_endpoints_and_eviction(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.sqlite3"), max_bytes=250, policies={"x/v2/things/{id}": 60})
+    assert cache.ttl_for("https://api.test/x/v2/people") is None
+    for key in ("a", "b", "c"):
+        cache.store(key, f"https://api.test/x/v2/things/{ord(key)}", {"ETag": '"1"'}, b"x" * 100, 60)
+    assert cache.lookup("a") is None and cache.lookup("c") is not None
+    cache.invalidate("https://api.test/x/v2/things/1")
+    assert cache.lookup("c") is None
+
+def test_async_client_uses_the_cache(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.sqlite3"))
+
+    async def fetch_twice(server):
+        async with make_client(server, cache, cls=AsyncPeopleClient) as client:
+            return [await client.get_field_definitions(), await client.get_field_definitions()]
+
+    with FakePCOServer() as server:
+        server.seed_people(1)
+        first, second = asyncio.run(fetch_twice(server))
+        statuses = [entry["status"] for entry in server.request_log]
+    assert first == second and statuses == [200, 304]
+
+def test_clients_with_different_credentials_never_share_entries(tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path / "cache.sqlite3"), policies={"people/v2/people/{id}": 60})
+    with FakePCOServer() as server:
+        person = server.add_person("Ada", "Lovelace")
+        with make_client(server, cache) as client:
+            client.get_person(person["id"])
+        monkeypatch.setenv("PCO_APPLICATION_ID", "other-app")
+        with make_client(server, cache) as client:
+            client.get_person(person["id"])
+            client.get_person(person["id"])
+        statuses = [entry["status"] for entry in server.request_log]
+    # Each org fetches its own copy in full; within one org the TTL still applies
+    assert statuses == [200, 200]
+
+class StrayNotModifiedServer(FakePCOServer):
+    """Answers the first GET with a 304, as a cache in between might for a copy the client no longer has."""
+
+    strays = 1
+
+    def handle(self, method, path, query, body):
+        if method == "GET" and self.strays:
+            self.strays -= 1
+            return 304, {}, None
+        return super().handle(method, path, query, body)
+
+@pytest.mark.parametrize("cls", [PeopleClient, AsyncPeopleClient])
+def test_304_without_a_cached_entry_asks_again_for_the_body(tmp_path, cls):
+    cache = HttpCache(str(tmp_path / "cache.sqlite3"))
+
+    async def fetch_twice_async(server):
+        async with make_client(server, cache, cls=cls) as client:
+            return [await client.get_field_definitions(), await client.get_field_definitions()]
+
+    with StrayNotModifiedServer() as server:
+        server.seed_people(1, field_definitions=("Allergies",))
+        if cls is PeopleClient:
+            with make_client(server, cache) as client:
+                first, second = client.get_field_definitions(), client.get_field_definitions()
+        else:
+            first, second = asyncio.run(fetch_twice_async(server))
+        statuses = [entry["status"] for entry in server.request_log]
+    assert [d["attributes"]["name"] for d in first] == ["Allergies"] and second == first
+    # The body fetched after the stray 304 was cached, so the next read revalidates normally
+    assert statuses == [304, 200, 304]
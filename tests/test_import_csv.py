@@ -0,0 +1,96 @@
+# tests/test_import_csv.py
+import csv
+import pytest
+from click.testing import CliRunner
+from pco_workflows.cli import cli
+from pco_workflows.testing import FakePCOServer
+
+COLUMNS = ["remote_id", "First Name", "Last Name", "Home Email", "Mobile Phone Number", "Home Address Street Line 1",
+           "Home Address City", "Home Address State", "Home Address Zip Code", "Household ID", "Household Name",
+           "Household Primary Contact", "Allergies"]
+ROWS = [
+    ["1", "Ada", "Smith", "ada@example.test", "(214) 555-0100", "1 Oak Lane", "Dallas", "TX", "75001", "2",
+     "Smith Household", "TRUE", "Peanuts"],
+    ["2", "Ben", "Smith", "", "(214) 555-0101", "1 Oak Lane", "Dallas", "TX", "75001", "2", "Smith Household", "",
+     "None"],
+    ["3", "Cora", "Jones", "cora@example.test", "", "", "", "", "", "3", "Jones Household", "TRUE", ""],
+]
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer() as server:
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        server.add("field_definitions", {"name": "Allergies", "slug": "allergies", "data_type": "text"})
+        yield server
+
+def write_rows(rows, path="people.csv"):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+def run_import(*args):
+    result = CliRunner().invoke(cli, ["import-csv", "--input", "people.csv", "--concurrency", "2", *args])
+    assert result.exit_code == 0, result.output
+    assert "Failed" not in result.output, result.output
+    return result
+
+def test_rerun_only_patches_what_changed(server):
+    write_rows(ROWS)
+    run_import()
+    assert len(server.store["people"]) == 3
+    assert server.count_requests("POST", "/emails") == 2
+    assert server.count_requests("POST", "/phone_numbers") == 2
+    assert server.count_requests("POST", "/addresses") == 2
+    assert server.count_requests("POST", "/field_data") == 2
+    assert server.count_requests("POST", "/households") == 2
+    posts = server.count_requests("POST")
+
+    changed = [list(row) for row in ROWS]
+    changed[0][-1] = "Shellfish"
+    write_rows(changed)
+    run_import()
+    assert server.count_requests("POST") == posts
+    assert server.count_requests("PATCH", "/field_data") == 1
+    assert sorted(d["attributes"]["value"] for d in server.store["field_data"].values()) == ["None", "Shellfish"]
+    # Households already holding their people are left alone
+    assert len(server.store["households"]) == 2
+
+def test_resume_skips_journaled_rows(server):
+    write_rows(ROWS[:2])
+    run_import()
+    people_requests = server.count_requests(path_contains="/v2/people")
+
+    write_rows(ROWS)
+    resumed = run_import("--resume")
+    assert "skipped 2 already completed" in resumed.output
+    # Only the new row is looked up and created, with its one email
+    assert server.count_requests(path_contains="/v2/people") == people_requests + 3
+    assert server.count_requests("PATCH") == 0
+    assert len(server.store["people"]) == 3
+    assert len(server.store["households"]) == 2
+
+NEW_MEMBER = ["4", "Dan", "Smith", "", "(214) 555-0102", "1 Oak Lane", "Dallas", "TX", "75001", "2", "Smith Household",
+              "", ""]
+
+@pytest.mark.parametrize("mode", ["rerun", "resume", "resume-without-household-entries"])
+def test_new_member_joins_the_existing_household(server, tmp_path, mode):
+    write_rows(ROWS)
+    run_import()
+    if mode == "resume-without-household-entries":
+        # As if the first run stopped after the people: PCO has the households, the journal doesn't
+        journal = tmp_path / "import-csv.journal"
+        lines = journal.read_text(encoding="utf-8").splitlines(keepends=True)
+        journal.write_text("".join(line for line in lines if line.startswith("person:")), encoding="utf-8")
+
+    write_rows(ROWS + [NEW_MEMBER])
+    run_import(*([] if mode == "rerun" else ["--resume"]))
+    assert len(server.store["households"]) == 2
+    assert server.count_requests("POST", "/household_memberships") == 1
+    smith = next(h for h in server.store["households"].values() if h["attributes"]["name"] == "Smith Household")
+    names = {server.store["people"][link["id"]]["attributes"]["first_name"]
+             for link in smith["relationships"]["people"]["data"]}
+    assert names == {"Ada", "Ben", "Dan"}
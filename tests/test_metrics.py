@@ -0,0 +1,48 @@
+# tests/test_metrics.py
+import json
+from click.testing import CliRunner
+from pco_workflows.api import PeopleClient, RateLimiter, RetryPolicy
+from pco_workflows.cli import cli
+from pco_workflows.metrics import Metrics, endpoint_for
+from pco_workflows.testing import FakePCOServer
+
+def test_endpoint_for_collapses_ids_and_query():
+    assert endpoint_for("https://x.test/people/v2/people/123/emails?per_page=100") == "people/v2/people/{id}/emails"
+
+def test_client_records_requests_retries_and_spans(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    metrics = Metrics()
+    with FakePCOServer(fault_rate=0.3, seed=1) as server:
+        server.seed_people(30)
+        client = PeopleClient(api_root=server.url, metrics=metrics, rate_limiter=RateLimiter(limit=1000, period=1),
+                              retry_policy=RetryPolicy(backoff_base=0.001, backoff_max=0.01))
+        with client, metrics.span("fetch"):
+            people = list(client.iter_people(params={"per_page": 5}))
+    data = metrics.to_dict()
+    stats = data["endpoints"]["GET people/v2/people"]
+    assert len(people) == 30
+    assert stats["requests"] == len(server.request_log)
+    assert stats["statuses"]["200"] == 6
+    assert stats["retries"] == stats["requests"] - 6
+    assert stats["bytes"] > 0 and sum(stats["buckets"].values()) == stats["requests"]
+    assert data["spans"]["fetch"]["count"] == 1
+
+    text = metrics.to_prometheus()
+    assert 'pco_requests_total{method="GET",endpoint="people/v2/people",status="200"} 6' in text
+    assert f'pco_request_duration_seconds_bucket{{method="GET",endpoint="people/v2/people",le="+Inf"}} {stats["requests"]}' in text
+
+def test_cli_metrics_option_writes_json(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # Keeps the field definition cache out of the repo
+    with FakePCOServer() as server:
+        server.seed_people(10)
+        monkeypatch.setenv("PCO_API_ROOT", server.url)
+        monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+        monkeypatch.setenv("PCO_SECRET", "secret")
+        report = tmp_path / "metrics.json"
+        result = CliRunner().invoke(cli, ["--metrics", "json", "--metrics-file", str(report),
+                                          "get-field-data", "--field", "Authorized Pickups"])
+    assert result.exit_code == 0, result.output
+    data = json.loads(report.read_text())
+    assert data["endpoints"]["GET people/v2/field_data"]["requests"] == 1
+    assert data["spans"]["get-field-data.fetch"]["count"] == 1
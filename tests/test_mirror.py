@@ -0,0 +1,65 @@
+# tests/test_mirror.py
+from pco_workflows.api import PeopleClient, RateLimiter
+from pco_workflows.mirror import PeopleMirror
+from pco_workflows.testing import FakePCOServer
+
+class FakeClient:
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def iter_paginate(self, resource, params=None, max_workers=None):
+        self.calls.append((resource, dict(params or {})))
+        since = (params or {}).get("where[updated_at][gte]")
+        for record in self.records.get(resource, []):
+            updated_at = record["attributes"].get("updated_at")
+            if since is None or (updated_at and updated_at >= since):
+                yield record
+
+def person(pid, name, updated_at):
+    return {"type": "Person", "id": pid, "attributes": {"first_name": name, "updated_at": updated_at}, "relationships": {}}
+
+def field_datum(fid, person_id, definition_id, value):
+    return {
+        "type": "FieldDatum", "id": fid, "attributes": {"value": value},
+        "relationships": {
+            "customizable": {"data": {"type": "Person", "id": person_id}},
+            "field_definition": {"data": {"type": "FieldDefinition", "id": definition_id}},
+        },
+    }
+
+def test_full_then_incremental_sync(tmp_path):
+    client = FakeClient({
+        "people": [person("1", "Ann", "2025-01-01T00:00:00Z"), person("2", "Bob", "2025-01-02T00:00:00Z")],
+        "field_definitions": [{"type": "FieldDefinition", "id": "9", "attributes": {"name": "Allergies"}, "relationships": {}}],
+        "field_data": [field_datum("100", "1", "9", "Peanuts")],
+    })
+    with PeopleMirror(str(tmp_path / "mirror.sqlite3")) as mirror:
+        results = mirror.sync(client, resources=["people", "field_definitions", "field_data"])
+        assert results["people"] == (2, "full")
+
+        client.records["people"].append(person("3", "Cat", "2025-01-03T00:00:00Z"))
+        results = mirror.sync(client, resources=["people", "field_definitions", "field_data"])
+        assert results["people"] == (2, "incremental")
+        assert results["field_data"] == (1, "full")
+        assert client.calls[-3][1]["where[updated_at][gte]"] == "2025-01-02T00:00:00Z"
+
+        assert [p["id"] for p in mirror.iter_people()] == ["1", "2", "3"]
+        assert mirror.get_field_definition_id("Allergies") == "9"
+        entries = mirror.get_field_data_by_definition("9")
+        assert entries[0]["relationships"]["customizable"]["data"]["id"] == "1"
+
+def test_incremental_sync_removes_records_deleted_upstream(tmp_path, monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with FakePCOServer() as server, PeopleMirror(str(tmp_path / "mirror.sqlite3")) as mirror:
+        people = [server.add_person(name, "Smith", updated_at=f"2025-01-0{i + 1}T00:00:00Z")
+                  for i, name in enumerate(["Ann", "Bob", "Cat"])]
+        with PeopleClient(api_root=server.url, http_cache=False,
+                          rate_limiter=RateLimiter(limit=1000, period=1)) as client:
+            mirror.sync(client, resources=["people"])
+            # A deletion leaves nothing behind with a newer updated_at for the next sync to see
+            del server.store["people"][people[1]["id"]]
+            results = mirror.sync(client, resources=["people"])
+        assert results["people"] == (1, "incremental")  # Only the newest person is refetched
+        assert [p["attributes"]["first_name"] for p in mirror.iter_people()] == ["Ann", "Cat"]
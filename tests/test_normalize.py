@@ -0,0 +1,32 @@
+# tests/test_normalize.py
+import itertools
+import pytest
+from pco_workflows import normalize, utils
+
+PHONES = ["", "1234567890", "(123) 456-7890", "123.456.7890 x", "abc", "12345", "+1 123 456 7890",
+          "١٢٣٤٥٦٧٨٩٠", "123456789²", "555 123 4567"]
+YES_NO = ["", "yes", "YES", "No", "no ", "maybe"]
+GRADES = ["", "First Grade", "Pre-K", "pre-school", "Graduated", "12th", "College", "Kindergarten", "0",
+          "13th", "Eleventh", "7", "grade ²", "Twelfth grade", "fifth/sixth"]
+MONTH_DAYS = ["", "01/01", "1/1", "12/31", "02/29", "13/01", "00/10", "invalid", "06/15 ", "٠١/٠١"]
+AGES = ["", "10", "0", "85", "2025", "3000", "abc", "²", None]
+
+@pytest.mark.parametrize("phone", PHONES)
+def test_format_phone_matches_reference(phone):
+    assert normalize.format_phone(phone) == utils.format_phone(phone)
+
+@pytest.mark.parametrize("value", YES_NO)
+def test_yes_no_matches_reference(value):
+    assert normalize.yes_no_to_true_false(value) == utils.yes_no_to_true_false(value)
+
+@pytest.mark.parametrize("grade", GRADES)
+def test_map_grade_matches_reference(grade):
+    assert normalize.map_grade(grade) == utils.map_grade(grade)
+
+def test_format_birthdate_matches_reference():
+    for month_day, age, year in itertools.product(MONTH_DAYS, AGES, [2025, 2024]):
+        assert normalize.format_birthdate(month_day, age, year) == utils.format_birthdate(month_day, age, year)
+
+@pytest.mark.parametrize("month_day", MONTH_DAYS)
+def test_format_anniversary_matches_reference(month_day):
+    assert normalize.format_anniversary(month_day) == utils.format_anniversary(month_day)
@@ -0,0 +1,50 @@
+# tests/test_rate_limit.py
+import asyncio
+import time
+from pco_workflows.api.rate_limit import RateLimiter
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+def test_acquire_within_budget_does_not_wait():
+    limiter = RateLimiter(limit=10, period=1)
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.05
+    assert limiter.waits == 0
+
+def test_acquire_waits_when_bucket_empty():
+    limiter = RateLimiter(limit=2, period=0.2)
+    for _ in range(3):
+        limiter.acquire()
+    assert limiter.waits >= 1
+    assert limiter.wait_seconds > 0
+
+def test_headers_clamp_remaining_tokens():
+    limiter = RateLimiter(limit=100, period=20)
+    limiter.update_from_headers({
+        "X-PCO-API-Request-Rate-Limit": "50",
+        "X-PCO-API-Request-Rate-Count": "50",
+        "X-PCO-API-Request-Rate-Period": "10",
+    })
+    assert limiter.limit == 50
+    assert limiter.period == 10
+    assert limiter._reserve() > 0
+
+def test_retry_after_blocks_all_callers():
+    limiter = RateLimiter(limit=100, period=20)
+    limiter.update_from_response(FakeResponse(429, {"Retry-After": "0.1"}))
+    wait = limiter._reserve()
+    assert 0 < wait <= 0.1
+
+def test_acquire_async_shares_budget():
+    limiter = RateLimiter(limit=3, period=0.3)
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(5)))
+
+    asyncio.run(run())
+    assert limiter.waits >= 1
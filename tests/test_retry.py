@@ -0,0 +1,109 @@
+# tests/test_retry.py
+import time
+import pytest
+from requests.exceptions import ConnectionError
+from pco_workflows.api import BaseClient, PeopleClient, RateLimiter, RetryPolicy
+from pco_workflows.testing import FakePCOServer
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.headers = {}
+        self.url = "https://example.test"
+        self.text = ""
+        self.content = b""
+        self._payload = payload or {}
+
+    def raise_for_status(self):
+        from requests.exceptions import HTTPError
+        if self.status_code >= 400:
+            raise HTTPError(f"{self.status_code} Error")
+
+    def json(self):
+        return self._payload
+
+class FakeSession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(method)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def close(self):
+        pass
+
+def make_client(outcomes, **policy_kwargs):
+    policy = RetryPolicy(backoff_base=0, **policy_kwargs)
+    client = BaseClient("people/v2", rate_limiter=RateLimiter(limit=1000, period=1), retry_policy=policy)
+    client._session = FakeSession(outcomes)
+    return client
+
+def test_get_retries_5xx_then_succeeds():
+    client = make_client([FakeResponse(502), FakeResponse(503), FakeResponse(200, {"data": []})])
+    assert client.get("people") == {"data": []}
+    assert client.retry_stats == {"retries": 2, "recovered": 1, "gave_up": 0}
+
+def test_post_is_not_retried_on_5xx():
+    client = make_client([FakeResponse(502), FakeResponse(200)])
+    with pytest.raises(RuntimeError):
+        client.post("people", {})
+    assert len(client._session.calls) == 1
+
+def test_post_is_retried_on_429():
+    client = make_client([FakeResponse(429), FakeResponse(200, {"data": {"id": "1"}})])
+    client.rate_limiter.block_for = lambda seconds: None
+    assert client.post("people", {}) == {"data": {"id": "1"}}
+
+def test_post_not_retried_after_connection_reset():
+    client = make_client([ConnectionError("reset"), FakeResponse(200)])
+    with pytest.raises(ConnectionError):
+        client.post("people", {})
+
+def test_delete_retries_connection_reset_and_treats_404_as_success():
+    client = make_client([ConnectionError("reset"), FakeResponse(404)])
+    assert client.delete("people/1") is None
+    assert client.retry_stats["recovered"] == 1
+
+def test_gives_up_after_max_attempts():
+    client = make_client([FakeResponse(500)] * 3, max_attempts=3)
+    with pytest.raises(RuntimeError):
+        client.get("people")
+    assert client.retry_stats["gave_up"] == 1
+
+def test_retry_ending_in_a_4xx_is_not_a_recovery():
+    client = make_client([FakeResponse(503), FakeResponse(422)])
+    with pytest.raises(RuntimeError):
+        client.patch("people/1", {})
+    assert client.retry_stats == {"retries": 1, "recovered": 0, "gave_up": 0}
+
+class StallingServer(FakePCOServer):
+    """Holds the first request past the client's read timeout, then answers normally."""
+
+    def __init__(self, stall, **kwargs):
+        super().__init__(**kwargs)
+        self.stall = stall
+        self.stalled = False
+
+    def handle(self, method, path, query, body):
+        if not self.stalled:
+            self.stalled = True
+            time.sleep(self.stall)
+        return super().handle(method, path, query, body)
+
+def test_stalled_response_times_out_and_is_retried(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+    with StallingServer(stall=1.0) as server:
+        person = server.add_person("Ada", "Lovelace")
+        with PeopleClient(api_root=server.url, http_cache=False, timeout=(1, 0.2),
+                          rate_limiter=RateLimiter(limit=1000, period=1),
+                          retry_policy=RetryPolicy(backoff_base=0)) as client:
+            start = time.monotonic()
+            assert client.get_person(person["id"])["id"] == person["id"]
+            assert time.monotonic() - start < 1.0
+            assert client.retry_stats == {"retries": 1, "recovered": 1, "gave_up": 0}
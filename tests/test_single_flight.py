@@ -0,0 +1,61 @@
+# tests/test_single_flight.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pco_workflows.api import AsyncPeopleClient, PeopleClient, RateLimiter
+from pco_workflows.api.single_flight import SingleFlight
+from pco_workflows.testing import FakePCOServer
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("PCO_APPLICATION_ID", "app")
+    monkeypatch.setenv("PCO_SECRET", "secret")
+
+def test_concurrent_identical_gets_share_one_request():
+    with FakePCOServer(latency=0.2) as server:
+        person = server.add_person("Ada", "Lovelace")
+        with PeopleClient(api_root=server.url, http_cache=False, rate_limiter=RateLimiter(limit=1000, period=1)) as client:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                people = list(executor.map(lambda _: client.get_person(person["id"]), range(8)))
+            stats = client.single_flight_stats
+            metrics = client.metrics.to_dict()["totals"]["coalesced"]
+    assert len(server.request_log) == 1
+    assert stats["misses"] == 1 and stats["hits"] == 7 and metrics >= 7
+    assert all(p == people[0] for p in people)
+    assert len({id(p) for p in people}) == 8  # Each caller may mutate its own copy
+
+def test_waiters_see_the_leaders_exception():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait()
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "k", failing)
+        started.wait()
+        waiter = executor.submit(flight.do, "k", failing)
+        while flight.hits == 0:
+            pass
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
+    assert flight.stats == {"hits": 1, "misses": 1}
+
+def test_async_gets_are_coalesced():
+    async def fetch(server, person_id):
+        async with AsyncPeopleClient(api_root=server.url, http_cache=False,
+                                     rate_limiter=RateLimiter(limit=1000, period=1)) as client:
+            people = await asyncio.gather(*(client.get_person(person_id) for _ in range(5)))
+            return people, client.single_flight_stats
+
+    with FakePCOServer(latency=0.1) as server:
+        person = server.add_person("Ada", "Lovelace")
+        people, stats = asyncio.run(fetch(server, person["id"]))
+    assert len(server.request_log) == 1
+    assert stats == {"hits": 4, "misses": 1}
+    assert all(p == people[0] for p in people)
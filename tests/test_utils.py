@@ -1,6 +1,6 @@
 # tests/test_utils.py
 import pytest
-from pco_tools.utils import format_phone, yes_no_to_true_false, map_grade, get_status_and_membership, format_birthdate, format_anniversary
+from pco_workflows.utils import format_phone, yes_no_to_true_false, map_grade, get_status_and_membership, format_birthdate, format_anniversary
 
 def test_format_phone():
     assert format_phone("1234567890") == "(123) 456-7890"